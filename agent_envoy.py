@@ -14,6 +14,8 @@ from dotenv import load_dotenv
 from tenacity import retry, stop_after_attempt, wait_exponential
 import google.generativeai as genai
 
+from llm_ledger import tracked_generate
+
 # Load API keys
 load_dotenv()
 if "GEMINI_API_KEY" not in os.environ:
@@ -146,7 +148,7 @@ Return ONLY the JSON array with exactly 3 companies. No other text or explanatio
         # Call Gemini API
         print("🔍 Searching for brand partnerships...")
         print("✍️  Generating personalized pitches with script samples...")
-        response = model.generate_content(master_prompt)
+        response = tracked_generate(model, master_prompt, agent="envoy")
         
         # Parse the JSON response
         response_text = response.text.strip()
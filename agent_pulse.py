@@ -11,13 +11,26 @@ Name: pulse - the heartbeat of engagement, pushing content into the world
 
 import os
 import json
+import time
+import pickle
+import threading
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 from typing import TypedDict, List, Dict, Any, Optional
 from dotenv import load_dotenv
 from tenacity import retry, stop_after_attempt, wait_exponential
 import google.generativeai as genai
 
+from rate_limiter import limited_call
+from upload_scheduler import UploadScheduler
+from reframe import reframe_crop
+from clip_cache import clip_cache, get_profile, clip_pass_args, sprite_layout, materialize, PLATFORM_PROFILES
+from twitter_media import TwitterMediaUploader
+from resumable_upload import UploadCheckpointStore, AdaptiveChunkSize, upload_key
+from ffmpeg_runner import run_ffmpeg, FFmpegCancelled, FFMPEG_THREADS
+from clip_planner import plan_clips, audio_energy
+
 # Load API keys
 load_dotenv()
 if "GEMINI_API_KEY" not in os.environ:
@@ -27,6 +40,10 @@ if "GEMINI_API_KEY" not in os.environ:
 genai.configure(api_key=os.environ.get("GEMINI_API_KEY"))
 
 
+# Output profile for the clips pulse writes (see clip_cache.OUTPUT_PROFILES)
+CLIP_PROFILE = os.getenv("PULSE_CLIP_PROFILE", "shorts")
+
+
 # --- GraphState Definition ---
 class GraphState(TypedDict):
     """
@@ -83,53 +100,76 @@ def clip_video_segment(
     input_path: str,
     output_path: str,
     start_time: float,
-    duration: float
+    duration: float,
+    profile: str = "source"
 ) -> bool:
     """
-    Clip a segment from video using FFmpeg
+    Clip a segment from video using FFmpeg. The same pass writes a poster
+    frame and a preview sprite sheet next to the clip (clip_cache.preview_paths).
     
     Args:
         input_path: Path to input video
         output_path: Path to save clipped video
         start_time: Start time in seconds
         duration: Duration of clip in seconds
+        profile: Output profile name (see clip_cache.OUTPUT_PROFILES)
     
     Returns:
         True if successful, False otherwise
     """
     try:
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-ss', str(start_time),
+        spec = get_profile(profile)
+        
+        # Vertical profiles follow the action instead of cropping the centre
+        crop = None
+        if spec.get('reframe') and spec.get('width') and spec.get('height'):
+            crop = reframe_crop(input_path, start_time, duration, (spec['width'], spec['height']))
+            if crop:
+                print(f"🎯 Reframed to {crop['crop_w']}x{crop['crop_h']} ({len(crop['keyframes'])} keyframes)")
+        
+        args = [
+            '-y',  # Overwrite output files
+            '-ss', str(start_time),  # Seek before decoding (accurate when re-encoding)
             '-t', str(duration),
-            '-c:v', 'libx264',  # Re-encode with H.264
-            '-c:a', 'aac',  # Re-encode audio
-            '-preset', 'fast',  # Fast encoding
-            '-y',  # Overwrite output file
-            output_path
+            '-threads', str(FFMPEG_THREADS),
+            '-i', input_path,
+            # Clip (H.264/AAC, crop/scale, bitrate caps, faststart) + poster + sprite sheet
+            *clip_pass_args(spec, output_path, duration, crop, threads=FFMPEG_THREADS)
         ]
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60  # 60 second timeout
-        )
+        # Supervised: progress reporting, cancellation, nice/affinity, duration-scaled timeout
+        run_ffmpeg(args, duration, fps=spec.get('fps'))
         
-        return result.returncode == 0 and os.path.exists(output_path)
+        return os.path.exists(output_path)
     
+    except FFmpegCancelled:
+        raise
     except Exception as e:
         print(f"⚠️  Error clipping video: {e}")
         return False
 
 
+def render_clip(video_path: str, start_time: float, duration: float, profile: str) -> Optional[Dict[str, Any]]:
+    """Encoded segment from the shared clip cache ({path, key, cache_hit}), or None on failure"""
+    return clip_cache.fetch(video_path, start_time, duration, profile, clip_video_segment)
+
+
+def clip_for_platform(video_path: str, clip: Dict[str, Any], platform: str) -> str:
+    """Path of the clip encoded with the platform's profile (cached), else the clip itself"""
+    profile = PLATFORM_PROFILES.get(platform, clip.get('profile'))
+    if profile == clip.get('profile') or not os.path.exists(video_path):
+        return clip['path']
+    rendition = render_clip(video_path, clip['start_time'], clip['duration'], profile)
+    return rendition['path'] if rendition else clip['path']
+
+
 def auto_clip_shorts(
     video_path: str,
     output_dir: str = "shorts",
     min_duration: int = 15,
     max_duration: int = 60,
-    num_clips: int = 3
+    num_clips: int = 3,
+    profile: str = CLIP_PROFILE
 ) -> List[Dict[str, Any]]:
     """
     Automatically clip video into short segments
@@ -140,6 +180,7 @@ def auto_clip_shorts(
         min_duration: Minimum clip duration in seconds
         max_duration: Maximum clip duration in seconds
         num_clips: Number of clips to create
+        profile: Output profile name; encodes are shared through the clip cache
     
     Returns:
         List of clip metadata dicts
@@ -160,25 +201,16 @@ def auto_clip_shorts(
     
     clips = []
     
-    # Strategy: Create evenly spaced clips
-    clip_duration = min(max_duration, total_duration / num_clips)
+    # Strategy: best non-overlapping windows by loudness, spread across the video
+    energy = audio_energy(video_path, total_duration)
+    windows = plan_clips(total_duration, min_duration, max_duration, num_clips, energy)
     
-    if clip_duration < min_duration:
-        print(f"⚠️  Video too short to create {num_clips} clips of {min_duration}s")
-        num_clips = int(total_duration / min_duration)
-        clip_duration = min_duration
+    if len(windows) < num_clips:
+        print(f"⚠️  Video fits {len(windows)} of {num_clips} clips of at least {min(min_duration, total_duration):.0f}s")
     
-    for i in range(num_clips):
-        # Calculate start time (evenly distribute)
-        start_time = i * (total_duration / num_clips)
-        
-        # Ensure we don't go past video end
-        if start_time + clip_duration > total_duration:
-            clip_duration = total_duration - start_time
-        
-        if clip_duration < min_duration:
-            print(f"⚠️  Skipping clip {i+1} (too short)")
-            continue
+    for i, window in enumerate(windows):
+        start_time = window['start']
+        clip_duration = window['duration']
         
         # Output filename
         output_filename = f"short_{i+1}_{int(clip_duration)}s.mp4"
@@ -186,25 +218,35 @@ def auto_clip_shorts(
         
         print(f"✂️  Clipping segment {i+1}: {start_time:.1f}s - {start_time+clip_duration:.1f}s")
         
-        success = clip_video_segment(
-            video_path,
-            output_path,
-            start_time,
-            clip_duration
-        )
+        rendition = render_clip(video_path, start_time, clip_duration, profile)
         
-        if success:
+        if rendition:
+            materialize(rendition['path'], output_path)
+            
+            # Gallery previews, so the frontend never needs the MP4 to show a clip
+            stem = os.path.splitext(output_path)[0]
+            poster_path = materialize(rendition['poster'], f"{stem}.jpg") if rendition['poster'] else None
+            sprite_path = materialize(rendition['sprite'], f"{stem}_sprite.jpg") if rendition['sprite'] else None
+            
             clip_metadata = {
                 "clip_id": i + 1,
                 "filename": output_filename,
                 "path": output_path,
                 "start_time": start_time,
                 "duration": clip_duration,
+                "score": round(window['score'], 3),
                 "size_bytes": os.path.getsize(output_path),
+                "profile": profile,
+                "cache_key": rendition['key'],
+                "cache_hit": rendition['cache_hit'],
+                "poster_path": poster_path,
+                "sprite_path": sprite_path,
+                "sprite": sprite_layout(clip_duration) if sprite_path else None,
                 "posted": False
             }
             clips.append(clip_metadata)
-            print(f"✅ Created clip: {output_filename} ({clip_duration:.1f}s)")
+            source = "cached" if rendition['cache_hit'] else "encoded"
+            print(f"✅ Created clip: {output_filename} ({clip_duration:.1f}s, {profile}, {source})")
         else:
             print(f"❌ Failed to create clip {i+1}")
     
@@ -212,6 +254,33 @@ def auto_clip_shorts(
 
 
 # --- Auto-Posting Function ---
+TWITTER_KEYS = (
+    'TWITTER_API_KEY',
+    'TWITTER_API_SECRET',
+    'TWITTER_ACCESS_TOKEN',
+    'TWITTER_ACCESS_SECRET'
+)
+
+
+@lru_cache(maxsize=4)
+def _twitter_clients(api_key: str, api_secret: str, access_token: str, access_secret: str):
+    """
+    Authenticated Twitter clients, built once per credential set and shared
+    by every upload: (chunked media uploader, API v2 Client for posting)
+    """
+    import tweepy
+    
+    auth = tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret)
+    
+    client = tweepy.Client(
+        consumer_key=api_key,
+        consumer_secret=api_secret,
+        access_token=access_token,
+        access_token_secret=access_secret
+    )
+    return TwitterMediaUploader(auth=auth.apply_auth()), client
+
+
 def post_to_twitter(clip_path: str, caption: str) -> bool:
     """
     Post video clip to Twitter/X using Tweepy
@@ -225,48 +294,23 @@ def post_to_twitter(clip_path: str, caption: str) -> bool:
     """
     try:
         # Check for Twitter API keys
-        twitter_keys = [
-            'TWITTER_API_KEY',
-            'TWITTER_API_SECRET',
-            'TWITTER_ACCESS_TOKEN',
-            'TWITTER_ACCESS_SECRET'
-        ]
-        
-        if not all(os.getenv(key) for key in twitter_keys):
+        if not all(os.getenv(key) for key in TWITTER_KEYS):
             print("⚠️  Twitter API keys not configured - skipping post")
             return False
         
-        import tweepy
-        
-        # Authenticate
-        auth = tweepy.OAuthHandler(
-            os.getenv('TWITTER_API_KEY'),
-            os.getenv('TWITTER_API_SECRET')
-        )
-        auth.set_access_token(
-            os.getenv('TWITTER_ACCESS_TOKEN'),
-            os.getenv('TWITTER_ACCESS_SECRET')
-        )
-        
-        # Create API v1.1 object for media upload
-        api = tweepy.API(auth)
+        uploader, client = _twitter_clients(*(os.getenv(key) for key in TWITTER_KEYS))
         
-        # Upload video
+        # Upload video (chunked; waits until Twitter has processed it)
         print(f"📤 Uploading video to Twitter: {clip_path}")
-        media = api.media_upload(clip_path)
-        
-        # Create API v2 client for posting
-        client = tweepy.Client(
-            consumer_key=os.getenv('TWITTER_API_KEY'),
-            consumer_secret=os.getenv('TWITTER_API_SECRET'),
-            access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-            access_token_secret=os.getenv('TWITTER_ACCESS_SECRET')
-        )
+        media_id = uploader.upload(clip_path)
         
         # Post tweet with video
-        response = client.create_tweet(
+        response = limited_call(
+            "twitter",
+            client.create_tweet,
             text=caption,
-            media_ids=[media.media_id]
+            media_ids=[media_id],
+            retry="throttle"
         )
         
         print(f"✅ Posted to Twitter! Tweet ID: {response.data['id']}")
@@ -281,6 +325,90 @@ def post_to_twitter(clip_path: str, caption: str) -> bool:
         return False
 
 
+YOUTUBE_SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
+YOUTUBE_TOKEN_PATH = 'youtube_token.pickle'
+
+_youtube_lock = threading.Lock()
+_youtube_creds = None
+_youtube_local = threading.local()
+
+
+def _youtube_credentials(credentials_path: str, token_path: str = YOUTUBE_TOKEN_PATH):
+    """OAuth credentials loaded once and shared; refreshed (or re-authorized) only when invalid"""
+    global _youtube_creds
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+    
+    with _youtube_lock:
+        creds = _youtube_creds
+        
+        # Load saved token if exists
+        if creds is None and os.path.exists(token_path):
+            with open(token_path, 'rb') as token:
+                creds = pickle.load(token)
+        
+        # If no valid credentials, authenticate
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    credentials_path, YOUTUBE_SCOPES)
+                creds = flow.run_local_server(port=0)
+            
+            # Save credentials for next time
+            with open(token_path, 'wb') as token:
+                pickle.dump(creds, token)
+        
+        _youtube_creds = creds
+        return creds
+
+
+def _youtube_service(credentials_path: str):
+    """
+    YouTube service for the calling thread. The underlying httplib2
+    transport is not thread-safe, so each upload worker keeps its own
+    service object; all of them share one set of credentials.
+    """
+    from googleapiclient.discovery import build
+    
+    creds = _youtube_credentials(credentials_path)
+    if getattr(_youtube_local, 'creds', None) is not creds:
+        _youtube_local.service = build('youtube', 'v3', credentials=creds)
+        _youtube_local.creds = creds
+    return _youtube_local.service
+
+
+# Resumable upload sessions survive restarts (upload_sessions table in nexus_data.db)
+upload_checkpoints = UploadCheckpointStore()
+
+# Consecutive failed chunks tolerated before an upload is abandoned (and left resumable)
+UPLOAD_CHUNK_RETRIES = int(os.getenv("UPLOAD_CHUNK_RETRIES", "3"))
+
+
+def _youtube_upload_offset(http, session_uri: str, total_bytes: int):
+    """
+    Query a resumable upload session (empty PUT with Content-Range: bytes */total).
+
+    Returns:
+        (bytes YouTube holds, None) while incomplete, or (total_bytes, video
+        resource) if the upload already finished. Raises HttpError otherwise
+        (404/410 = session expired).
+    """
+    from googleapiclient.errors import HttpError
+    
+    resp, content = http.request(
+        session_uri, method='PUT',
+        headers={'Content-Length': '0', 'Content-Range': f'bytes */{total_bytes}'}
+    )
+    if resp.status in (200, 201):
+        return total_bytes, json.loads(content)
+    if resp.status == 308:
+        received = resp.get('range')  # "bytes=0-<last byte held>", absent when nothing arrived
+        return (int(received.rsplit('-', 1)[1]) + 1 if received else 0), None
+    raise HttpError(resp, content, uri=session_uri)
+
+
 def upload_to_youtube(
     video_path: str,
     title: str,
@@ -302,16 +430,11 @@ def upload_to_youtube(
         Dict with upload result {'success': bool, 'video_id': str, 'url': str}
     """
     try:
-        from googleapiclient.discovery import build
         from googleapiclient.http import MediaFileUpload
-        from google.oauth2.credentials import Credentials
-        from google_auth_oauthlib.flow import InstalledAppFlow
-        from google.auth.transport.requests import Request
-        import pickle
+        from googleapiclient.errors import HttpError
         
         # Check for YouTube API credentials
         credentials_path = os.getenv('YOUTUBE_CREDENTIALS_PATH', 'youtube_credentials.json')
-        token_path = 'youtube_token.pickle'
         
         if not os.path.exists(credentials_path):
             print(f"⚠️  YouTube credentials not found at {credentials_path}")
@@ -323,29 +446,7 @@ def upload_to_youtube(
             print("   5. Set YOUTUBE_CREDENTIALS_PATH in .env")
             return {'success': False, 'error': 'No credentials file'}
         
-        SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
-        creds = None
-        
-        # Load saved token if exists
-        if os.path.exists(token_path):
-            with open(token_path, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If no valid credentials, authenticate
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-            
-            # Save credentials for next time
-            with open(token_path, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        # Build YouTube service
-        youtube = build('youtube', 'v3', credentials=creds)
+        youtube = _youtube_service(credentials_path)
         
         # Prepare video metadata
         body = {
@@ -366,25 +467,74 @@ def upload_to_youtube(
         print(f"   Title: {title}")
         print(f"   Privacy: {privacy_status}")
         
-        media = MediaFileUpload(
-            video_path,
-            mimetype='video/*',
-            resumable=True,
-            chunksize=1024*1024  # 1MB chunks
-        )
+        key = upload_key("youtube", video_path, title, description, category, privacy_status)
+        checkpoint = upload_checkpoints.get(key)
+        chunks = AdaptiveChunkSize(initial=checkpoint['chunk_size'] if checkpoint else None)
+        total_bytes = os.path.getsize(video_path)
         
-        request = youtube.videos().insert(
-            part='snippet,status',
-            body=body,
-            media_body=media
-        )
+        session_uri = checkpoint['session_uri'] if checkpoint else None
+        offset = checkpoint['bytes_sent'] if checkpoint else 0
+        if session_uri:
+            print(f"   Resuming upload at {offset / max(total_bytes, 1):.0%}")
+        else:
+            upload_checkpoints.start(key, "youtube", video_path, total_bytes, chunk_size=chunks.size)
         
+        # After a resume or a failed chunk, ask YouTube how many bytes it holds first
+        resync = bool(session_uri)
         response = None
+        failures = 0
         while response is None:
-            status, response = request.next_chunk()
+            # A fresh request per chunk carries the current adaptive chunk size; the
+            # session URI and offset are the client's public resume attributes
+            media = MediaFileUpload(video_path, mimetype='video/*', resumable=True, chunksize=chunks.size)
+            request = youtube.videos().insert(part='snippet,status', body=body, media_body=media)
+            started = time.monotonic()
+            try:
+                if resync:
+                    offset, response = limited_call(
+                        "youtube", _youtube_upload_offset, request.http, session_uri, total_bytes
+                    )
+                    resync = False
+                    if response is not None:
+                        break
+                request.resumable_uri = session_uri
+                request.resumable_progress = offset
+                status, response = limited_call("youtube", request.next_chunk)
+            except HttpError as e:
+                if session_uri and e.resp.status in (404, 410):
+                    # Session expired on YouTube's side - start a fresh one
+                    print("   Saved upload session expired - restarting upload")
+                    session_uri, offset, resync = None, 0, False
+                    upload_checkpoints.start(key, "youtube", video_path, total_bytes, chunk_size=chunks.size)
+                    continue
+                failures += 1
+                if e.resp.status < 500 and e.resp.status != 429:
+                    upload_checkpoints.discard(key)  # rejected (auth, quota, metadata) - not resumable
+                    raise
+                if failures > UPLOAD_CHUNK_RETRIES:
+                    raise
+                chunks.backoff()
+                resync = bool(session_uri)
+                continue
+            except (OSError, TimeoutError):
+                failures += 1
+                if failures > UPLOAD_CHUNK_RETRIES:
+                    raise
+                # Smaller chunks on a flaky link; re-sync the offset before the next one
+                chunks.backoff()
+                resync = bool(session_uri)
+                continue
+            finally:
+                media.stream().close()  # one file handle per request
+            
+            failures = 0
+            session_uri = request.resumable_uri
+            chunks.observe(request.resumable_progress - offset, time.monotonic() - started)
+            offset = request.resumable_progress
+            upload_checkpoints.checkpoint(key, session_uri, offset, chunks.size)
             if status:
                 progress = int(status.progress() * 100)
-                print(f"   Upload progress: {progress}%")
+                print(f"   Upload progress: {progress}% (next chunk {chunks.size // 1024} KB)")
         
         video_id = response['id']
         video_url = f"https://www.youtube.com/watch?v={video_id}"
@@ -393,12 +543,14 @@ def upload_to_youtube(
         print(f"   Video ID: {video_id}")
         print(f"   URL: {video_url}")
         
-        return {
+        result = {
             'success': True,
             'video_id': video_id,
             'url': video_url,
             'title': title
         }
+        upload_checkpoints.discard(key)
+        return result
     
     except ImportError as e:
         print(f"⚠️  Missing required library: {e}")
@@ -410,6 +562,20 @@ def upload_to_youtube(
         return {'success': False, 'error': str(e)}
 
 
+def _post_clip_to_twitter(video_path: str, clip: Dict[str, Any], caption: str) -> bool:
+    """Post the clip's X rendition (encoded on first use, then served from the clip cache)"""
+    if not all(os.getenv(key) for key in TWITTER_KEYS):
+        return post_to_twitter(clip['path'], caption)  # skips without encoding a rendition
+    return post_to_twitter(clip_for_platform(video_path, clip, "twitter"), caption)
+
+
+def _upload_clip_to_youtube(video_path: str, clip: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """Upload the clip's Shorts rendition to YouTube"""
+    if not os.path.exists(os.getenv('YOUTUBE_CREDENTIALS_PATH', 'youtube_credentials.json')):
+        return upload_to_youtube(video_path=clip['path'], **kwargs)  # reports missing credentials
+    return upload_to_youtube(video_path=clip_for_platform(video_path, clip, "youtube"), **kwargs)
+
+
 # --- pulse Agent Node ---
 def run_pulse(state: GraphState) -> GraphState:
     """
@@ -456,7 +622,9 @@ def run_pulse(state: GraphState) -> GraphState:
             if clipped_shorts:
                 print(f"✅ Created {len(clipped_shorts)} short clips")
                 
-                # Auto-post clips to platforms (optional - can be manual)
+                # Auto-post clips to platforms (optional - can be manual):
+                # every clip x platform upload runs concurrently, capped per platform
+                jobs = []
                 for idx, clip in enumerate(clipped_shorts):
                     # Generate caption for this clip
                     caption = f"🎬 {topic} | Clip {clip['clip_id']}\n\n"
@@ -464,22 +632,30 @@ def run_pulse(state: GraphState) -> GraphState:
                     caption += f"\n\n#{topic.replace(' ', '')} #Shorts"
                     
                     # Try to post to Twitter (will skip if no API keys)
-                    posted_twitter = post_to_twitter(clip['path'], caption)
-                    clip['posted_twitter'] = posted_twitter
+                    jobs.append((idx, "twitter", _post_clip_to_twitter, (video_path, clip, caption), {}))
                     
                     # Try to upload to YouTube (will skip if no credentials)
                     video_title = f"{topic} - Short #{idx + 1}"
                     video_description = f"{generated_script.get('full_script', '')}\n\nGenerated with Nexus AI"
                     
-                    youtube_result = upload_to_youtube(
-                        video_path=clip['path'],
-                        title=video_title,
-                        description=video_description,
-                        privacy_status='public'  # Change to 'unlisted' or 'private' if preferred
-                    )
+                    jobs.append((idx, "youtube", _upload_clip_to_youtube, (video_path, clip), {
+                        "title": video_title,
+                        "description": video_description,
+                        "privacy_status": 'public'  # Change to 'unlisted' or 'private' if preferred
+                    }))
+                
+                with UploadScheduler() as scheduler:
+                    results = scheduler.run(jobs)
+                
+                for idx, clip in enumerate(clipped_shorts):
+                    posted_twitter = results.get((idx, "twitter"))
+                    youtube_result = results.get((idx, "youtube"))
+                    if isinstance(youtube_result, Exception):
+                        youtube_result = {'success': False, 'error': str(youtube_result)}
                     
+                    clip['posted_twitter'] = posted_twitter is True
                     clip['youtube_upload'] = youtube_result
-                    clip['posted'] = posted_twitter or youtube_result.get('success', False)
+                    clip['posted'] = clip['posted_twitter'] or youtube_result.get('success', False)
             else:
                 print("⚠️  No clips created - using fallback")
         else:
@@ -11,9 +11,11 @@ import os
 import json
 from typing import TypedDict, List, Dict, Any
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential
 import google.generativeai as genai
 
+from llm_ledger import tracked_generate, record_prompt_compaction
+from prompt_context import build_trend_context
+
 # Load API keys
 load_dotenv()
 if "GEMINI_API_KEY" not in os.environ:
@@ -22,6 +24,9 @@ if "GEMINI_API_KEY" not in os.environ:
 # Configure Google GenAI SDK
 genai.configure(api_key=os.environ.get("GEMINI_API_KEY"))
 
+# Approximate token budget for the trend block in the quill prompt
+TREND_CONTEXT_TOKENS = int(os.getenv("QUILL_TREND_CONTEXT_TOKENS", "300"))
+
 
 # --- GraphState Definition ---
 class GraphState(TypedDict):
@@ -41,15 +46,10 @@ class GraphState(TypedDict):
     error: str
 
 
-# --- Retry Logic for API Calls ---
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    reraise=True
-)
+# --- Gemini Call ---
 def _call_gemini_api(model, prompt: str) -> str:
-    """Call Gemini API with retry logic"""
-    response = model.generate_content(prompt)
+    """Call Gemini API (rate-limited with 429/5xx retries, recorded in the LLM ledger)"""
+    response = tracked_generate(model, prompt, agent="quill")
     return response.text
 
 
@@ -89,7 +89,12 @@ def run_quill(state: GraphState) -> GraphState:
     )
 
     # Create the structured prompt for script generation
-    trends_text = json.dumps(scouted_trends, indent=2) if scouted_trends else "No specific trends available"
+    # Trends are deduped and compacted to a token budget instead of pretty-printed JSON
+    trends_text, compaction = build_trend_context(scouted_trends, token_budget=TREND_CONTEXT_TOKENS)
+    if scouted_trends:
+        record_prompt_compaction("quill", compaction)
+        print(f"🗜️  Trend context: {compaction['trends_kept']}/{compaction['trends_in']} trends, "
+              f"~{compaction['compact_tokens']} tokens (was ~{compaction['original_tokens']})")
     
     prompt = f"""
     You are the 'quill' agent, a world-class script writer for viral short-form content.
@@ -100,7 +105,8 @@ def run_quill(state: GraphState) -> GraphState:
     - Topic: {topic}
     - Niche: {niche}
     - Creator Vibe: {user_vibe}
-    - Trends to remix: {trends_text}
+    - Trends to remix:
+{trends_text}
     
     CRITICAL REQUIREMENTS:
     1. The script must be EXACTLY 15 seconds when spoken at normal pace
@@ -11,10 +11,14 @@ import json
 import requests
 from typing import TypedDict, List, Dict, Any
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential
 import google.generativeai as genai
 from datetime import datetime
 
+from llm_ledger import tracked_generate
+from rate_limiter import limited_call
+from trend_similarity import dedupe_similar_trends
+from trend_sources import registry, FunctionProvider
+
 # Load API keys
 load_dotenv()
 if "GEMINI_API_KEY" not in os.environ:
@@ -46,15 +50,10 @@ class GraphState(TypedDict):
     error: str
 
 
-# --- Retry Logic for API Calls ---
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    reraise=True
-)
+# --- Gemini Call ---
 def _call_gemini_api(model, prompt: str) -> str:
-    """Call Gemini API with retry logic"""
-    response = model.generate_content(prompt)
+    """Call Gemini API (rate-limited with 429/5xx retries, recorded in the LLM ledger)"""
+    response = tracked_generate(model, prompt, agent="ripple")
     return response.text
 
 
@@ -89,7 +88,9 @@ def fetch_viral_trends_serper(query: str, num_results: int = 10) -> List[Dict[st
             "hl": "en"   # Language
         }
         
-        response = requests.post(
+        response = limited_call(
+            "serper",
+            requests.post,
             SERPER_ENDPOINT,
             headers=headers,
             json=payload,
@@ -119,6 +120,90 @@ def fetch_viral_trends_serper(query: str, num_results: int = 10) -> List[Dict[st
         return []
 
 
+def simulate_trends_gemini(query: str, limit: int, niche: str = "", goals: str = "", **_) -> List[Dict[str, str]]:
+    """
+    Simulate trending content with Gemini (fallback when no real source returns trends)
+    
+    Returns:
+        List of trend dictionaries with title, url, summary
+    """
+    print("📝 Using Gemini to simulate trending content...")
+    
+    # Initialize the Gemini model
+    model = genai.GenerativeModel(
+        model_name='gemini-2.0-flash-exp',
+        generation_config={
+            "temperature": 0.7,
+            "response_mime_type": "application/json"
+        }
+    )
+
+    # Create the prompt
+    prompt = f"""
+You are the 'ripple' agent. Your job is to find the TOP {limit} most recent,
+relevant, and viral articles, Reddit threads, or social media discussions
+about the topic: {query}.
+
+Context:
+- Niche: {niche}
+- Creator goals: {goals}
+
+Based on your knowledge of current trends and viral discussions, simulate
+what the most likely trending articles and discussions would be about this topic.
+Create realistic-looking trend data with plausible titles, URLs, and summaries.
+
+Focus on trends that would help a creator in the "{niche}" niche achieve: {goals}
+
+Return ONLY a JSON array of objects, with 'title', 'url', and 'summary' for each.
+Format: [{{"title": "...", "url": "...", "summary": "..."}}, ...]
+
+Make the URLs look realistic (e.g., reddit.com/r/.../..., youtube.com/watch?v=..., 
+techcrunch.com/..., tiktok.com/@.../video/..., etc.) and the summaries informative 
+and trend-focused.
+
+Do not add any other text, markdown, or commentary. Just the JSON array.
+"""
+
+    try:
+        # Invoke the model with retry logic
+        response_text = _call_gemini_api(model, prompt)
+        
+        # Parse the JSON response
+        response_text = response_text.strip()
+        
+        # Remove markdown code blocks if present
+        if response_text.startswith("```json"):
+            response_text = response_text[7:]
+        if response_text.startswith("```"):
+            response_text = response_text[3:]
+        if response_text.endswith("```"):
+            response_text = response_text[:-3]
+        
+        response_text = response_text.strip()
+        
+        trends = json.loads(response_text)
+        
+    except Exception as e:
+        print(f"🚨 Error in Gemini fallback: {e}")
+        trends = []
+    
+    return trends
+
+
+# Ripple's sources, in rank order local feeds → Serper → Gemini simulation (cheapest first)
+registry.register(FunctionProvider(
+    "serper_search",
+    lambda query, limit, **_: fetch_viral_trends_serper(query, num_results=limit),
+    cost=1.0, latency=1.5, deadline=10.0,
+    available=lambda: bool(SERPER_API_KEY)
+))
+registry.register(FunctionProvider(
+    "gemini_simulation",
+    simulate_trends_gemini,
+    cost=10.0, latency=5.0, deadline=30.0, cache_ttl=3600.0
+))
+
+
 # --- ripple Agent Node ---
 def run_ripple(state: GraphState, num_trends: int = 5, use_serper: bool = True) -> GraphState:
     """
@@ -149,73 +234,14 @@ def run_ripple(state: GraphState, num_trends: int = 5, use_serper: bool = True)
     if goals:
         print(f"🎯 Creator goals: {goals}")
 
-    trends = []
+    # Over-fetch from real sources, then collapse near-duplicate headlines into one trend each
+    sources = ["local", "serper_search"] if use_serper else ["local"]
+    trends = registry.fetch_first(search_query, num_trends * 2, names=sources)
+    trends = dedupe_similar_trends(trends, limit=num_trends)
     
-    # Try Google Serper first if enabled
-    if use_serper:
-        trends = fetch_viral_trends_serper(search_query, num_results=num_trends)
-    
-    # Fallback to Gemini simulation if Serper unavailable or failed
+    # Fallback to Gemini simulation if no real source returned trends
     if not trends:
-        print("📝 Using Gemini to simulate trending content...")
-        
-        # Initialize the Gemini model
-        model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash-exp',
-            generation_config={
-                "temperature": 0.7,
-                "response_mime_type": "application/json"
-            }
-        )
-
-        # Create the prompt
-        prompt = f"""
-    You are the 'ripple' agent. Your job is to find the TOP {num_trends} most recent,
-    relevant, and viral articles, Reddit threads, or social media discussions
-    about the topic: {search_query}.
-    
-    Context:
-    - Niche: {niche}
-    - Creator goals: {goals}
-
-    Based on your knowledge of current trends and viral discussions, simulate
-    what the most likely trending articles and discussions would be about this topic.
-    Create realistic-looking trend data with plausible titles, URLs, and summaries.
-    
-    Focus on trends that would help a creator in the "{niche}" niche achieve: {goals}
-
-    Return ONLY a JSON array of objects, with 'title', 'url', and 'summary' for each.
-    Format: [{{"title": "...", "url": "...", "summary": "..."}}, ...]
-    
-    Make the URLs look realistic (e.g., reddit.com/r/.../..., youtube.com/watch?v=..., 
-    techcrunch.com/..., tiktok.com/@.../video/..., etc.) and the summaries informative 
-    and trend-focused.
-    
-    Do not add any other text, markdown, or commentary. Just the JSON array.
-    """
-
-        try:
-            # Invoke the model with retry logic
-            response_text = _call_gemini_api(model, prompt)
-            
-            # Parse the JSON response
-            response_text = response_text.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            
-            response_text = response_text.strip()
-            
-            trends = json.loads(response_text)
-            
-        except Exception as e:
-            print(f"🚨 Error in Gemini fallback: {e}")
-            trends = []
+        trends = registry.fetch("gemini_simulation", search_query, num_trends, niche=niche, goals=goals)
     
     if trends:
         print(f"✅ Scouted {len(trends)} trends successfully.")
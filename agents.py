@@ -16,6 +16,8 @@ from pydantic import BaseModel, Field
 import google.generativeai as genai
 
 from utils import build_vibe_prompt, extract_vibe_markers, get_api_key
+from vibe_markers import VibeStats, profile_drift, DRIFT_THRESHOLD
+from llm_ledger import tracked_generate
 
 
 # ==================== PYDANTIC MODELS ====================
@@ -36,6 +38,15 @@ class SponsorPitch(BaseModel):
     cta: str = Field(description="Call-to-action closing")
 
 
+# Platform-specific content requirements
+PLATFORM_SPECS = {
+    "tiktok": {"length": "15-30 seconds", "style": "fast-paced, hook in first 3 seconds"},
+    "instagram": {"length": "30-60 seconds", "style": "visually stunning, aesthetic"},
+    "twitter": {"length": "1 tweet (280 chars)", "style": "punchy, quotable"},
+    "youtube": {"length": "60 seconds", "style": "informative + entertaining"}
+}
+
+
 # ==================== BASE AGENT CLASS ====================
 
 class BaseAgent:
@@ -61,7 +72,7 @@ class BaseAgent:
                 prompt_parts.append(str(msg))
         
         prompt = "\n\n".join(prompt_parts)
-        response = self.model.generate_content(prompt)
+        response = tracked_generate(self.model, prompt, agent=self.__class__.__name__)
         return response.text
 
 
@@ -74,6 +85,12 @@ class VibeAnalyzerAgent(BaseAgent):
     Name: ripple - like ripples spreading outward, detecting the unique patterns in content
     """
     
+    # Keys produced by the LLM analysis (everything else is quantitative)
+    QUALITATIVE_KEYS = (
+        "tone", "humor_style", "language_quirks", "audience_relationship",
+        "signature_phrases", "content_formula", "authenticity_score", "analyzed_at"
+    )
+    
     def __init__(self):
         # Use Groq for vibe analysis
         super().__init__(temperature=0.3)  # Lower temp for consistent analysis
@@ -87,6 +104,78 @@ class VibeAnalyzerAgent(BaseAgent):
         quantitative_vibe = extract_vibe_markers(content_samples)
         
         # Then, use LLM for qualitative analysis
+        qualitative_vibe = self._qualitative_vibe(content_samples, quantitative_vibe)
+        
+        # Combine quantitative and qualitative analysis
+        full_vibe = {
+            **quantitative_vibe,
+            **qualitative_vibe,
+            "analyzed_at": datetime.now().isoformat(),
+            "sample_count": len(content_samples)
+        }
+        
+        return full_vibe
+    
+    def update_vibe(
+        self,
+        content_samples: List[str],
+        new_samples: List[str],
+        previous: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fold new samples into a stored profile instead of recomputing it
+        
+        Args:
+            content_samples: All samples submitted this run (sent to the LLM if it re-runs)
+            new_samples: Samples not yet counted in previous['stats']
+            previous: VibeDatabase.get_vibe_state() result, or None for a new user
+        
+        Returns:
+            {"vibe_profile", "stats", "baseline", "new_samples", "drift", "reanalyzed"} - the LLM
+            only runs when the quantitative profile drifts past DRIFT_THRESHOLD
+            from the baseline it last saw
+        """
+        previous = previous or {}
+        if previous.get('stats'):
+            stats = VibeStats.from_dict(previous['stats'])
+        else:
+            # No stored statistics - count everything submitted this run
+            stats, new_samples = VibeStats(), content_samples
+        
+        for sample in new_samples:
+            stats.add_sample(sample)
+        
+        quantitative_vibe = stats.profile()
+        baseline = previous.get('baseline')
+        previous_profile = previous.get('vibe_profile') or {}
+        drift = profile_drift(baseline, quantitative_vibe) if previous_profile else 1.0
+        
+        reanalyzed = drift >= DRIFT_THRESHOLD
+        if reanalyzed:
+            qualitative_vibe = self._qualitative_vibe(content_samples, quantitative_vibe)
+            qualitative_vibe["analyzed_at"] = datetime.now().isoformat()
+            baseline = quantitative_vibe
+        else:
+            qualitative_vibe = {key: previous_profile[key] for key in self.QUALITATIVE_KEYS if key in previous_profile}
+        
+        vibe_profile = {
+            **quantitative_vibe,
+            **qualitative_vibe,
+            "sample_count": stats.samples,
+            "vibe_drift": round(drift, 3)
+        }
+        
+        return {
+            "vibe_profile": vibe_profile,
+            "stats": stats.to_dict(),
+            "baseline": baseline,
+            "new_samples": new_samples,
+            "drift": drift,
+            "reanalyzed": reanalyzed
+        }
+    
+    def _qualitative_vibe(self, content_samples: List[str], quantitative_vibe: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM analysis of voice, humor and audience relationship"""
         analysis_prompt = f"""You are an expert content analyst specializing in creator voice identification.
 
 Analyze these {len(content_samples)} content samples and identify the creator's UNIQUE voice characteristics:
@@ -135,15 +224,7 @@ Return your analysis in JSON format with these keys:
                 "authenticity_score": 7.5
             }
         
-        # Combine quantitative and qualitative analysis
-        full_vibe = {
-            **quantitative_vibe,
-            **qualitative_vibe,
-            "analyzed_at": datetime.now().isoformat(),
-            "sample_count": len(content_samples)
-        }
-        
-        return full_vibe
+        return qualitative_vibe
 
 
 # ==================== QUILL AGENT ====================
@@ -164,15 +245,7 @@ class ContentGeneratorAgent(BaseAgent):
         Generate complete content package based on trending topic
         """
         
-        # Platform-specific requirements
-        platform_specs = {
-            "tiktok": {"length": "15-30 seconds", "style": "fast-paced, hook in first 3 seconds"},
-            "instagram": {"length": "30-60 seconds", "style": "visually stunning, aesthetic"},
-            "twitter": {"length": "1 tweet (280 chars)", "style": "punchy, quotable"},
-            "youtube": {"length": "60 seconds", "style": "informative + entertaining"}
-        }
-        
-        spec = platform_specs.get(platform, platform_specs["tiktok"])
+        spec = PLATFORM_SPECS.get(platform, PLATFORM_SPECS["tiktok"])
         
         generation_prompt = f"""You are creating viral {platform} content based on this trending topic:
 
@@ -245,14 +318,95 @@ CRITICAL: This must sound like YOU, not generic AI. Use your tone, humor, and st
         
         except Exception as e:
             print(f"Error parsing content output: {e}")
-            # Return fallback content
-            return ContentOutput(
-                script=f"Check out this {trend.get('title', 'trend')} - it's wild! [Your take here]",
-                caption="New video dropping 🔥 #viral",
-                hashtags=["fyp", "viral", "trending", "foryou", "explore"],
-                thumbnail_prompt="Bold text overlay on gradient background",
-                hook="Wait, this is actually insane..."
-            )
+            return self._fallback_content(trend)
+    
+    def generate_content_batch(self, trend: Dict[str, Any], platforms: List[str]) -> Dict[str, ContentOutput]:
+        """
+        Generate a content package for every platform in ONE model call.
+        
+        The vibe preamble is sent once and the model returns a JSON object keyed
+        by platform. Platforms missing from (or malformed in) the response get
+        fallback content, so the result always has one entry per platform.
+        """
+        platforms = list(dict.fromkeys(p.lower() for p in platforms)) or ["tiktok"]
+        
+        if len(platforms) == 1:
+            return {platforms[0]: self.generate_content(trend, platform=platforms[0])}
+        
+        platform_lines = []
+        for platform in platforms:
+            spec = PLATFORM_SPECS.get(platform, PLATFORM_SPECS["tiktok"])
+            platform_lines.append(f"- {platform}: length {spec['length']}; style {spec['style']}")
+        
+        example_variant = """{
+        "script": "full script here",
+        "caption": "caption here",
+        "hashtags": ["hashtag1", "hashtag2", ...],
+        "thumbnail_prompt": "detailed prompt",
+        "hook": "strongest hook option"
+    }"""
+        
+        generation_prompt = f"""You are creating viral content for {len(platforms)} platforms based on this trending topic:
+
+TRENDING TOPIC:
+Title: {trend.get('title', '')}
+Context: {trend.get('snippet', '') or trend.get('text', '')}
+Relevance Score: {trend.get('relevance_score', 0)}/10
+
+PLATFORM REQUIREMENTS:
+{chr(10).join(platform_lines)}
+
+FOR EACH PLATFORM, CREATE A COMPLETE CONTENT PACKAGE:
+1. **SCRIPT** - hook (first 3 seconds), body, payoff + CTA, sized to that platform's length
+2. **CAPTION** (100-150 characters) - complements the video, includes a CTA
+3. **HASHTAGS** (10 total) - 3 viral/broad + 7 niche-specific
+4. **THUMBNAIL PROMPT** - colors, composition, text overlay
+5. **HOOK** - the strongest first line
+
+Each platform gets its own take - don't paste the same script everywhere.
+
+Return ONLY valid JSON with exactly these top-level keys: {', '.join(platforms)}
+Each value must match this structure:
+{example_variant}
+
+CRITICAL: This must sound like YOU, not generic AI. Use your tone, humor, and style."""
+
+        messages = [
+            SystemMessage(content=self.vibe_prompt),
+            HumanMessage(content=generation_prompt)
+        ]
+        
+        variants: Dict[str, ContentOutput] = {}
+        try:
+            response = self.invoke(messages)
+            json_start = response.find('{')
+            json_end = response.rfind('}') + 1
+            batch_data = json.loads(response[json_start:json_end])
+            
+            for platform in platforms:
+                try:
+                    variants[platform] = ContentOutput(**batch_data[platform])
+                except Exception as e:
+                    print(f"Error parsing {platform} variant: {e}")
+        
+        except Exception as e:
+            print(f"Error generating content batch: {e}")
+        
+        for platform in platforms:
+            if platform not in variants:
+                variants[platform] = self._fallback_content(trend)
+        
+        return variants
+    
+    def _fallback_content(self, trend: Dict[str, Any]) -> ContentOutput:
+        """Fallback content when the model output can't be parsed"""
+        return ContentOutput(
+            script=f"Check out this {trend.get('title', 'trend')} - it's wild! [Your take here]",
+            caption="New video dropping 🔥 #viral",
+            hashtags=["fyp", "viral", "trending", "foryou", "explore"],
+            thumbnail_prompt="Bold text overlay on gradient background",
+            hook="Wait, this is actually insane..."
+        )
 
 
 # ==================== PULSE AGENT ====================
@@ -529,7 +683,7 @@ Return ONLY the JSON array, no other text."""
 
         try:
             # Call Gemini API
-            response = self.model.generate_content(prompt)
+            response = tracked_generate(self.model, prompt, agent=self.__class__.__name__)
             
             # Extract and parse the response
             response_text = response.text.strip()
@@ -616,7 +770,8 @@ __all__ = [
     "StrategyAgent",
     "DealHunterAgent",
     "ContentOutput",
-    "SponsorPitch"
+    "SponsorPitch",
+    "PLATFORM_SPECS"
 ]
 
 
@@ -18,6 +18,8 @@ from pathlib import Path
 
 # Import the updated NexusCore
 from nexus_core import run_nexus_phase1, run_nexus_phase2, db
+from route_executor import run_blocking, route_stats
+from media_server import MediaFiles
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -39,6 +41,10 @@ app.add_middleware(
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Uploaded videos and pulse's clipped shorts (HTTP Range, ETag, sendfile)
+app.mount("/uploads", MediaFiles(UPLOAD_DIR), name="uploads")
+app.mount("/shorts", MediaFiles("shorts"), name="shorts")
+
 
 # --- Request/Response Models ---
 
@@ -83,6 +89,14 @@ class VideoProcessResponse(BaseModel):
     message: str
 
 
+# --- Helpers ---
+
+def _save_upload(source, destination: Path):
+    """Copy an uploaded file to disk (blocking - run via run_blocking)"""
+    with destination.open("wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+
 # --- API Endpoints ---
 
 @app.get("/")
@@ -113,7 +127,9 @@ async def generate_script(request: ScriptRequest):
     """
     try:
         # Run Phase 1
-        state = run_nexus_phase1(
+        state = await run_blocking(
+            "phase1",
+            run_nexus_phase1,
             topic=request.topic,
             niche=request.niche,
             user_vibe=request.user_vibe,
@@ -139,6 +155,8 @@ async def generate_script(request: ScriptRequest):
             message="Script generated successfully. Please shoot video and upload for Phase 2."
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -162,13 +180,12 @@ async def process_video(
         video_filename = f"video_{script_id}_{video.filename}"
         video_path = UPLOAD_DIR / video_filename
         
-        with video_path.open("wb") as buffer:
-            shutil.copyfileobj(video.file, buffer)
+        await run_blocking("upload", _save_upload, video.file, video_path)
         
         print(f"📹 Video uploaded: {video_path}")
         
         # Get script from database
-        scripts = db.get_recent_scripts(limit=100)
+        scripts = await run_blocking("analytics", db.get_recent_scripts, limit=100)
         script_state = next((s for s in scripts if s['id'] == script_id), None)
         
         if not script_state:
@@ -197,7 +214,7 @@ async def process_video(
         state['script_id'] = script_id
         
         # Run Phase 2
-        final_state = run_nexus_phase2(state, str(video_path))
+        final_state = await run_blocking("phase2", run_nexus_phase2, state, str(video_path))
         
         # Check for errors
         if final_state.get('error'):
@@ -213,6 +230,8 @@ async def process_video(
             message=f"Video processed successfully. Created {len(final_state.get('clipped_shorts', []))} shorts and found {len(final_state.get('deal_plan', []))} sponsors."
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -229,12 +248,14 @@ async def get_recent_scripts(limit: int = 10):
         List of recent scripts with metadata
     """
     try:
-        scripts = db.get_recent_scripts(limit=limit)
+        scripts = await run_blocking("analytics", db.get_recent_scripts, limit=limit)
         return {
             "status": "success",
             "count": len(scripts),
             "scripts": scripts
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -245,7 +266,8 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "connected" if db else "error",
-        "ffmpeg": "available" if os.system("which ffmpeg > /dev/null 2>&1") == 0 else "not installed"
+        "ffmpeg": "available" if shutil.which("ffmpeg") else "not installed",
+        "routes": route_stats()
     }
 
 
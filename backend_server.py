@@ -11,9 +11,17 @@ import uvicorn
 import os
 import json
 import shutil
+import uuid
+import time
+import asyncio
 from pathlib import Path
 from datetime import datetime
 
+from session_store import create_session_store, JobStore, FINAL_JOB_STATUSES
+from route_executor import run_blocking, route_stats
+from media_server import MediaFiles
+from ffmpeg_runner import ffmpeg_job, cancel_ffmpeg_job, FFmpegCancelled
+
 # Import existing agents and tools
 try:
     from agents import agent_script
@@ -70,12 +78,29 @@ app.add_middleware(
 # Create directories
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
+SHORTS_DIR = Path("shorts")
+SHORTS_DIR.mkdir(exist_ok=True)
+
+# Uploaded videos and clipped shorts/posters/sprites (HTTP Range, ETag, sendfile)
+app.mount("/uploads", MediaFiles(UPLOAD_DIR), name="uploads")
+app.mount("/shorts", MediaFiles(SHORTS_DIR), name="shorts")
 
 # Initialize database
 db = VibeDatabase()
 
-# In-memory storage for active sessions
-active_sessions = {}
+# Bounded session store (SESSION_STORE=sqlite to share across workers)
+sessions = create_session_store()
+
+
+def _remove_job_files(job_id: str, job: Dict[str, Any]):
+    """Delete a purged job's uploaded video and its shorts"""
+    if job.get("video"):
+        (UPLOAD_DIR / Path(job["video"]).name).unlink(missing_ok=True)
+    shutil.rmtree(SHORTS_DIR / Path(job_id).name, ignore_errors=True)
+
+
+# Clip jobs: own table, never evicted while running (shared across workers)
+jobs = JobStore(on_purge=_remove_job_files)
 
 
 # ==================== REQUEST/RESPONSE MODELS ====================
@@ -120,6 +145,175 @@ class AnalyticsResponse(BaseModel):
     top_performing: List[Dict[str, Any]] = []
 
 
+# ==================== HELPERS ====================
+
+def _save_upload(source, destination: Path):
+    """Copy an uploaded file to disk (blocking - run via run_blocking)"""
+    with destination.open("wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+
+def _short_record(job_id: str, clip: Dict[str, Any]) -> Dict[str, Any]:
+    """Frontend view of a clipped short; every URL points at a small file under /shorts"""
+    def url(path: Optional[str]) -> Optional[str]:
+        return f"/shorts/{job_id}/{Path(path).name}" if path else None
+    
+    return {
+        "id": f"short_{job_id}_{clip['clip_id']}",
+        "duration": round(clip['duration'], 1),
+        "startTime": round(clip['start_time'], 1),
+        "videoUrl": url(clip['path']),
+        "thumbnail": url(clip.get('poster_path')),
+        "sprite": url(clip.get('sprite_path')),
+        "spriteLayout": clip.get('sprite'),
+        "sizeBytes": clip.get('size_bytes', 0),
+        "views": 0,
+        "likes": 0
+    }
+
+
+# Seconds between progress writes to the job record
+JOB_PROGRESS_INTERVAL = 1.0
+# Seconds between heartbeats of a queued or running job
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "15"))
+# An unfinished job without a heartbeat for this long lost its worker and is failed
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+
+
+def _job_progress_reporter(job_id: str):
+    """
+    ffmpeg progress callback: records percent complete in the job record
+    (throttled) and stops the encodes once a cancel was requested - from this
+    worker or any other sharing the job store.
+    """
+    last_write = [0.0]
+    
+    def report(progress: Dict[str, Any]):
+        now = time.monotonic()
+        if now - last_write[0] < JOB_PROGRESS_INTERVAL and progress["percent"] < 100:
+            return
+        last_write[0] = now
+        job = jobs.update(job_id, progress={
+            "percent": progress["percent"], "clip": progress["encode"], "stage": progress["stage"]
+        })
+        if job and job.get("cancel_requested"):
+            cancel_ffmpeg_job(job_id)
+    
+    return report
+
+
+def _clip_video(job_id: str, video_path: Path) -> List[Dict[str, Any]]:
+    """Clip an uploaded video into shorts with pulse's engine (blocking - run via run_blocking)"""
+    from agent_pulse import auto_clip_shorts, check_ffmpeg_installed
+    
+    if not check_ffmpeg_installed():
+        raise RuntimeError("FFmpeg is not installed on the server")
+    
+    job = jobs.update(job_id, status="clipping")
+    if job and job.get("cancel_requested"):
+        raise FFmpegCancelled(f"Job {job_id} was cancelled")
+    
+    with ffmpeg_job(job_id, on_progress=_job_progress_reporter(job_id)):
+        clips = auto_clip_shorts(
+            str(video_path),
+            output_dir=str(SHORTS_DIR / job_id),
+            min_duration=15,
+            max_duration=60,
+            num_clips=3
+        )
+    return [_short_record(job_id, clip) for clip in clips]
+
+
+async def _job_heartbeat(job_id: str):
+    """Touch the job record until cancelled, so pollers can tell it is still alive"""
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+        try:
+            await run_blocking("jobs", jobs.touch, job_id)
+        except Exception as e:
+            print(f"⚠️  Heartbeat for job {job_id} failed: {e}")
+
+
+async def _run_clip_job(job_id: str, video_path: Path):
+    """Background task: clip the video and record the outcome in the job record"""
+    heartbeat = asyncio.create_task(_job_heartbeat(job_id))
+    try:
+        try:
+            shorts = await run_blocking("clipping", _clip_video, job_id, video_path)
+        except FFmpegCancelled:
+            print(f"🛑 Clipping job {job_id} cancelled")
+            await run_blocking("jobs", jobs.update, job_id, status="cancelled")
+            return
+        except Exception as e:
+            print(f"❌ Clipping job {job_id} failed: {e}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            await run_blocking("jobs", jobs.update, job_id, status="failed", error=detail)
+            return
+        
+        status = "complete" if shorts else "failed"
+        await run_blocking(
+            "jobs", jobs.update, job_id,
+            status=status,
+            shorts=shorts,
+            error=None if shorts else "No clips could be created from this video",
+            completed_at=datetime.now().isoformat()
+        )
+        print(f"✅ Clipping job {job_id}: {len(shorts)} shorts")
+    finally:
+        heartbeat.cancel()
+
+
+def _discover_sponsors(trend: Dict[str, Any], vibe: str) -> List[Dict[str, Any]]:
+    """Find sponsors for a trend and attach a personalized email template to each"""
+    sponsor_finder = SponsorFinder()
+    sponsors = sponsor_finder.find_sponsors(
+        niche=trend.get('title', ''),
+        num_sponsors=3
+    )
+    
+    formatted_sponsors = []
+    for sponsor in sponsors[:3]:  # Top 3 sponsors
+        # Generate personalized email template for each sponsor
+        sponsor_name = sponsor.get('name', 'Unknown Sponsor')
+        sponsor_category = sponsor.get('category', 'General')
+        sponsor_description = sponsor.get('description', '')
+        trend_title = trend.get('title', 'content')
+        
+        # Tailor email based on sponsor's category and description
+        email_template = f"""Subject: Partnership Opportunity - {trend_title} Content Creator
+
+Hi {sponsor_name} Team,
+
+I'm a content creator specializing in {trend_title}, and I'm reaching out because I believe there's a strong alignment between my audience and {sponsor_name}'s {sponsor_category.lower()} offerings.
+
+My content focuses on {vibe} storytelling that resonates with viewers interested in {trend_title}. I noticed {sponsor_name} {sponsor_description[:100]}... and I think my audience would genuinely value learning about your brand.
+
+Recent Content Performance:
+• Targeting viewers passionate about {trend_title}
+• Creating {vibe} content that drives engagement
+• Building an authentic community in this niche
+
+I'd love to explore how we could collaborate on a partnership that brings real value to both your brand and my audience. Would you be open to a brief call this week to discuss potential opportunities?
+
+Looking forward to connecting!
+
+Best regards,
+[Your Name]
+[Your Channel/Profile]
+
+P.S. I'm particularly excited about how {sponsor_name} aligns with my content values in the {sponsor_category.lower()} space."""
+        
+        formatted_sponsors.append({
+            "name": sponsor_name,
+            "category": sponsor_category,
+            "email": sponsor.get('email', 'info@example.com'),
+            "emailTemplate": email_template,
+            "website": sponsor.get('website', '')
+        })
+    
+    return formatted_sponsors
+
+
 # ==================== API ENDPOINTS ====================
 
 @app.get("/")
@@ -152,7 +346,10 @@ async def health_check():
             "trend_hunter": "ready",
             "social_poster": "ready",
             "sponsor_finder": "ready"
-        }
+        },
+        "sessions": sessions.stats(),
+        "jobs": len(jobs),
+        "routes": route_stats()
     }
 
 
@@ -166,7 +363,7 @@ async def fetch_trends(request: TrendsRequest):
         
         # Use TrendHunter tool
         hunter = TrendHunter()
-        trends = hunter.get_best_trends(request.niche, limit=6)
+        trends = await run_blocking("trends", hunter.get_best_trends, request.niche, limit=6)
         
         # Format trends for frontend
         formatted_trends = []
@@ -196,6 +393,8 @@ async def fetch_trends(request: TrendsRequest):
             "niche": request.niche
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error fetching trends: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -219,9 +418,12 @@ async def generate_script(request: ScriptGenerateRequest):
             "content_formula": "hook → valuable info → call to action"
         }
         
-        # Generate content using agent_script alias
+        # Content generation and sponsor discovery are independent - run both at once
         generator = agent_script(vibe_profile)
-        content = generator.generate_content(request.trend, platform="youtube")
+        content, formatted_sponsors = await asyncio.gather(
+            run_blocking("script", generator.generate_content, request.trend, platform="youtube"),
+            run_blocking("sponsor_search", _discover_sponsors, request.trend, request.vibe)
+        )
         
         # Format script for frontend
         script_text = f"""🎬 OPENING (0-3 seconds)
@@ -238,65 +440,21 @@ CAPTION: {content.caption}
 HASHTAGS: {' '.join(['#' + tag for tag in content.hashtags[:5]])}
 """
         
-        # Find potential sponsors
-        sponsor_finder = SponsorFinder()
-        sponsors = sponsor_finder.find_sponsors(
-            niche=request.trend.get('title', ''),
-            num_sponsors=3
-        )
-        
-        # Format sponsors for frontend with personalized email templates
-        formatted_sponsors = []
-        for sponsor in sponsors[:3]:  # Top 3 sponsors
-            # Generate personalized email template for each sponsor
-            sponsor_name = sponsor.get('name', 'Unknown Sponsor')
-            sponsor_category = sponsor.get('category', 'General')
-            sponsor_description = sponsor.get('description', '')
-            trend_title = request.trend.get('title', 'content')
-            
-            # Tailor email based on sponsor's category and description
-            email_template = f"""Subject: Partnership Opportunity - {trend_title} Content Creator
-
-Hi {sponsor_name} Team,
-
-I'm a content creator specializing in {trend_title}, and I'm reaching out because I believe there's a strong alignment between my audience and {sponsor_name}'s {sponsor_category.lower()} offerings.
-
-My content focuses on {request.vibe} storytelling that resonates with viewers interested in {trend_title}. I noticed {sponsor_name} {sponsor_description[:100]}... and I think my audience would genuinely value learning about your brand.
-
-Recent Content Performance:
-• Targeting viewers passionate about {trend_title}
-• Creating {request.vibe} content that drives engagement
-• Building an authentic community in this niche
-
-I'd love to explore how we could collaborate on a partnership that brings real value to both your brand and my audience. Would you be open to a brief call this week to discuss potential opportunities?
-
-Looking forward to connecting!
-
-Best regards,
-[Your Name]
-[Your Channel/Profile]
-
-P.S. I'm particularly excited about how {sponsor_name} aligns with my content values in the {sponsor_category.lower()} space."""
-            
-            formatted_sponsors.append({
-                "name": sponsor_name,
-                "category": sponsor_category,
-                "email": sponsor.get('email', 'info@example.com'),
-                "emailTemplate": email_template,
-                "website": sponsor.get('website', '')
-            })
-        
-        # Generate script ID
-        script_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        # Generate script ID (random suffix keeps IDs unique across workers)
+        script_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
         
-        # Save to session
-        active_sessions[script_id] = {
+        # Save to session (plain fields only - the store keeps JSON)
+        await run_blocking("sponsors", sessions.set, script_id, {
             "script": script_text,
             "sponsors": formatted_sponsors,
             "trend": request.trend,
             "vibe": request.vibe,
-            "content": content
-        }
+            "content": {
+                "hook": content.hook,
+                "caption": content.caption,
+                "hashtags": list(content.hashtags)
+            }
+        })
         
         return {
             "status": "success",
@@ -305,65 +463,125 @@ P.S. I'm particularly excited about how {sponsor_name} aligns with my content va
             "sponsors": formatted_sponsors
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error generating script: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/upload/process")
+@app.post("/api/upload/process", status_code=202)
 async def process_video(
     background_tasks: BackgroundTasks,
     video: UploadFile = File(...),
     script: str = Form(...)
 ):
     """
-    Process uploaded video - clip into shorts and prepare for posting
+    Process uploaded video - clip into shorts and prepare for posting.
+    
+    Clipping runs as a background job; poll /api/upload/jobs/{jobId} until
+    its status is "complete" (or "failed").
     """
     try:
         print(f"📹 Processing video: {video.filename}")
         
         # Save uploaded video
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        video_filename = f"video_{timestamp}_{video.filename}"
+        job_id = f"{timestamp}-{uuid.uuid4().hex[:6]}"
+        video_filename = f"video_{timestamp}_{Path(video.filename or 'upload.mp4').name}"
         video_path = UPLOAD_DIR / video_filename
         
-        with video_path.open("wb") as buffer:
-            shutil.copyfileobj(video.file, buffer)
+        await run_blocking("upload", _save_upload, video.file, video_path)
         
         print(f"✅ Video saved: {video_path}")
         
-        # For now, simulate video processing
-        # In production, you'd use ffmpeg to actually clip the video
-        shorts = [
-            {
-                "id": f"short_{timestamp}_1",
-                "thumbnail": "/api/placeholder/short1.jpg",
-                "duration": 28,
-                "videoUrl": f"/uploads/{video_filename}",
-                "views": 0,
-                "likes": 0
-            },
-            {
-                "id": f"short_{timestamp}_2",
-                "thumbnail": "/api/placeholder/short2.jpg",
-                "duration": 25,
-                "videoUrl": f"/uploads/{video_filename}",
-                "views": 0,
-                "likes": 0
-            }
-        ]
+        job = {
+            "jobId": job_id,
+            "status": "queued",
+            "video": video_filename,
+            "script": script,
+            "shorts": [],
+            "error": None,
+            "created_at": datetime.now().isoformat()
+        }
+        await run_blocking("jobs", jobs.create, job_id, job)
+        background_tasks.add_task(_run_clip_job, job_id, video_path)
         
         return {
-            "status": "success",
-            "shorts": shorts,
-            "message": f"Video processed successfully. Created {len(shorts)} shorts."
+            "status": "processing",
+            "jobId": job_id,
+            "statusUrl": f"/api/upload/jobs/{job_id}",
+            "shorts": [],
+            "message": "Video uploaded. Clipping shorts in the background..."
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error processing video: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/upload/jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    """
+    Status of a clipping job (queued, clipping, complete, failed) and its shorts
+    """
+    try:
+        job = await run_blocking(
+            "jobs", jobs.fail_if_stale, job_id, JOB_STALE_SECONDS,
+            "The server stopped working on this job (worker restarted). Upload the video again."
+        )
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        message = {
+            "complete": f"Video processed successfully. Created {len(job.get('shorts', []))} shorts.",
+            "failed": f"Video processing failed: {job.get('error')}",
+            "cancelled": "Video processing cancelled.",
+            "cancelling": "Cancelling..."
+        }.get(job['status'], "Clipping shorts...")
+        
+        return {
+            "status": job['status'],
+            "jobId": job_id,
+            "shorts": job.get('shorts', []),
+            "progress": job.get('progress'),
+            "error": job.get('error'),
+            "updatedAt": datetime.fromtimestamp(job['updated_at']).isoformat(),
+            "message": message
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/upload/jobs/{job_id}/cancel")
+async def cancel_upload_job(job_id: str):
+    """
+    Cancel a clipping job. Encodes running in this worker stop at once;
+    a job running in another worker stops at its next progress update.
+    """
+    try:
+        job = await run_blocking("jobs", jobs.get, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job['status'] in FINAL_JOB_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+        
+        await run_blocking("jobs", jobs.update, job_id, cancel_requested=True, status="cancelling")
+        cancel_ffmpeg_job(job_id)
+        
+        return {"status": "cancelling", "jobId": job_id}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/analytics")
 async def get_analytics():
     """
@@ -371,7 +589,7 @@ async def get_analytics():
     """
     try:
         # Get recent data from database
-        recent_scripts = db.get_recent_scripts(limit=10)
+        recent_scripts = await run_blocking("analytics", db.get_recent_scripts, limit=10)
         
         # Calculate mock analytics
         # In production, this would pull real data from social platforms
@@ -398,6 +616,8 @@ async def get_analytics():
         
         return analytics
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error fetching analytics: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -409,7 +629,7 @@ async def get_sponsors(script_id: str):
     Get sponsors for a specific script
     """
     try:
-        session = active_sessions.get(script_id)
+        session = await run_blocking("sponsors", sessions.get, script_id)
         if not session:
             raise HTTPException(status_code=404, detail="Script not found")
         
@@ -418,6 +638,8 @@ async def get_sponsors(script_id: str):
             "sponsors": session.get('sponsors', [])
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -444,9 +666,9 @@ async def startup_event():
 
 
 if __name__ == "__main__":
+    # Single development process; use run_backend.py --workers N in production
     uvicorn.run(
         "backend_server:app",
         host="localhost",
-        port=8000,
-        reload=True  # Auto-reload on code changes
+        port=8000
     )
@@ -0,0 +1,283 @@
+"""
+VibeOS - Clip Profiles & Encode Cache
+Named, upload-ready output profiles (9:16 crop, resolution, bitrate caps,
+faststart) and a content-addressed cache of encoded clips keyed by
+(source content hash, start, duration, profile). Re-clipping or re-posting
+the same segment reuses the earlier encode instead of running ffmpeg again.
+The same ffmpeg pass also writes a poster frame and a preview sprite sheet.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Dict, List, Any, Callable, Optional
+
+# Bump to invalidate every cached encode (e.g. after changing encoder flags)
+CLIP_CACHE_VERSION = "4"
+CLIP_CACHE_DIR = os.getenv("CLIP_CACHE_DIR", "clip_cache")
+# Least recently used encodes are removed past this size (0 = unlimited)
+CLIP_CACHE_MAX_BYTES = int(os.getenv("CLIP_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+# Encodes used this recently are never evicted (callers may still be linking/uploading them)
+CLIP_CACHE_MIN_AGE_SECONDS = 600
+
+# name: output spec. width/height None keeps the source frame (no crop/scale);
+# reframe=True lets the crop follow the action (see reframe.py) instead of the centre.
+OUTPUT_PROFILES: Dict[str, Dict[str, Any]] = {
+    # YouTube Shorts: 1080x1920, generous bitrate so YouTube's re-encode has headroom
+    "shorts": {"width": 1080, "height": 1920, "fps": 30, "crf": 20, "maxrate": "10M", "bufsize": "20M",
+               "audio_bitrate": "192k", "preset": "fast", "reframe": True},
+    # X/Twitter: 720x1280 stays well inside its upload limits and processes fastest
+    "x": {"width": 720, "height": 1280, "fps": 30, "crf": 23, "maxrate": "5M", "bufsize": "10M",
+          "audio_bitrate": "128k", "preset": "fast", "reframe": True},
+    # Instagram Reels: 1080x1920, bitrate capped near Instagram's own delivery rate
+    "reels": {"width": 1080, "height": 1920, "fps": 30, "crf": 22, "maxrate": "8M", "bufsize": "16M",
+              "audio_bitrate": "128k", "preset": "fast", "reframe": True},
+    # Original behaviour: source frame, libx264 -preset fast
+    "source": {"width": None, "height": None, "fps": None, "crf": 23, "maxrate": None, "bufsize": None,
+               "audio_bitrate": "128k", "preset": "fast"},
+}
+
+# Profile each platform uploads
+PLATFORM_PROFILES = {
+    "youtube": "shorts",
+    "twitter": "x",
+    "instagram": "reels",
+}
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown clip profile '{name}' (choose from {', '.join(OUTPUT_PROFILES)})")
+    return OUTPUT_PROFILES[name]
+
+
+def profile_video_filter(profile: Dict[str, Any], crop: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Crop to the profile's aspect ratio, then scale (None for pass-through frames).
+    `crop` is a reframe.reframe_crop() window; without it the crop is centred.
+    """
+    filters = []
+    width, height = profile.get("width"), profile.get("height")
+    if width and height:
+        if crop:
+            filters.append(f"crop={crop['crop_w']}:{crop['crop_h']}:'{crop['x']}':{crop['y']}")
+        else:
+            filters.append(f"crop='min(iw,ih*{width}/{height})':'min(ih,iw*{height}/{width})'")
+        filters.append(f"scale={width}:{height}:flags=lanczos")
+        filters.append("setsar=1")
+    if profile.get("fps"):
+        filters.append(f"fps={profile['fps']}")
+    return ",".join(filters) or None
+
+
+def profile_encoder_args(profile: Dict[str, Any], threads: Optional[int] = None) -> List[str]:
+    """Codec, rate-control and container arguments for a profile's clip output"""
+    args = ['-c:v', 'libx264', '-preset', profile.get("preset", "fast"), '-crf', str(profile.get("crf", 23))]
+    if threads:
+        args += ['-threads', str(threads)]
+    if profile.get("maxrate"):
+        args += ['-maxrate', profile["maxrate"], '-bufsize', profile.get("bufsize") or profile["maxrate"]]
+    args += [
+        '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', profile.get("audio_bitrate", "128k"), '-ar', '48000',
+        '-movflags', '+faststart'  # moov atom first: playback/processing starts before the download ends
+    ]
+    return args
+
+
+# ==================== PREVIEWS ====================
+
+# Poster frame position (share of the clip) and width
+POSTER_POSITION = 0.3
+POSTER_WIDTH = 540
+# Preview sprite sheet: columns x rows thumbnails, each SPRITE_TILE_WIDTH wide
+SPRITE_COLUMNS = 5
+SPRITE_ROWS = 4
+SPRITE_TILE_WIDTH = 160
+
+
+def preview_paths(clip_path: str) -> Dict[str, str]:
+    """Poster and sprite sheet files that sit next to a clip"""
+    stem = clip_path[:-4] if clip_path.endswith(".mp4") else clip_path
+    return {"poster": f"{stem}.poster.jpg", "sprite": f"{stem}.sprite.jpg"}
+
+
+def sprite_layout(duration: float) -> Dict[str, Any]:
+    """How to address the sprite sheet: thumbnail i covers t = i * interval"""
+    tiles = SPRITE_COLUMNS * SPRITE_ROWS
+    return {
+        "columns": SPRITE_COLUMNS,
+        "rows": SPRITE_ROWS,
+        "tile_width": SPRITE_TILE_WIDTH,
+        "interval": round(duration / tiles, 3)
+    }
+
+
+def clip_pass_args(profile: Dict[str, Any], output_path: str, duration: float,
+                   crop: Optional[Dict[str, Any]] = None, threads: Optional[int] = None) -> List[str]:
+    """
+    Output arguments that write the clip, its poster frame and its preview
+    sprite sheet from one decode: the profile's filtered video is split
+    three ways inside a single filter graph.
+    """
+    video_filter = profile_video_filter(profile, crop) or "null"
+    poster_at = max(min(duration * POSTER_POSITION, duration - 0.1), 0)
+    tiles = SPRITE_COLUMNS * SPRITE_ROWS
+    graph = (
+        f"[0:v]{video_filter},split=3[clip][poster][sprite];"
+        f"[poster]select='gte(t,{poster_at:.3f})',scale={POSTER_WIDTH}:-2[poster_out];"
+        f"[sprite]fps={tiles}/{max(duration, 0.1):.3f},scale={SPRITE_TILE_WIDTH}:-2,"
+        f"tile={SPRITE_COLUMNS}x{SPRITE_ROWS}[sprite_out]"
+    )
+    previews = preview_paths(output_path)
+    return [
+        '-filter_complex', graph,
+        '-map', '[clip]', '-map', '0:a?', *profile_encoder_args(profile, threads), output_path,
+        '-map', '[poster_out]', '-frames:v', '1', '-q:v', '3', previews["poster"],
+        '-map', '[sprite_out]', '-frames:v', '1', '-q:v', '5', previews["sprite"],
+    ]
+
+
+@lru_cache(maxsize=256)
+def _hash_file(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_hash(path: str) -> str:
+    """Content hash of a source video (memoized per path/size/mtime within the process)"""
+    stat = os.stat(path)
+    return _hash_file(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def clip_key(source_digest: str, start: float, duration: float, profile_name: str) -> str:
+    """Cache key for one encoded segment; the profile spec is included so edits invalidate it"""
+    identity = [CLIP_CACHE_VERSION, source_digest, round(start, 3), round(duration, 3),
+                profile_name, get_profile(profile_name)]
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ClipCache:
+    """
+    Content-addressed store of encoded clips on disk: <cache_dir>/<key[:2]>/<key>.mp4
+    plus its <key>.poster.jpg and <key>.sprite.jpg previews
+    """
+
+    def __init__(self, cache_dir: str = CLIP_CACHE_DIR, max_bytes: int = CLIP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp4")
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def fetch(self, source_path: str, start: float, duration: float, profile_name: str,
+              encode: Callable[[str, str, float, float, str], bool]) -> Optional[Dict[str, Any]]:
+        """
+        Path of the encoded segment, encoding it on a miss.
+
+        Args:
+            encode: encode(input_path, output_path, start, duration, profile_name) -> success
+
+        Returns:
+            {"path", "key", "cache_hit", "poster", "sprite"} (previews None when
+            the encoder wrote none) or None if the encode failed
+        """
+        key = clip_key(source_hash(source_path), start, duration, profile_name)
+        path = self.path_for(key)
+
+        # One encode per key even when several workers ask for the same segment
+        with self._lock(key):
+            if os.path.exists(path):
+                # Recency for LRU eviction goes in atime; mtime stays put because
+                # hard-linked copies share it and upload checkpoints key on it
+                os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+                self.hits += 1
+                return self._entry(path, key, cache_hit=True)
+
+            self.misses += 1
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{threading.get_ident()}.partial.mp4"
+            partial_previews = preview_paths(partial)
+            try:
+                if not encode(source_path, partial, start, duration, profile_name):
+                    return None
+                for kind, final in preview_paths(path).items():
+                    if os.path.exists(partial_previews[kind]):
+                        os.replace(partial_previews[kind], final)
+                os.replace(partial, path)  # atomic, and last: the clip's presence marks a complete entry
+            finally:
+                for leftover in [partial, *partial_previews.values()]:
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+        self.evict()
+        return self._entry(path, key, cache_hit=False)
+
+    @staticmethod
+    def _entry(path: str, key: str, cache_hit: bool) -> Dict[str, Any]:
+        entry = {"path": path, "key": key, "cache_hit": cache_hit}
+        for kind, preview in preview_paths(path).items():
+            entry[kind] = preview if os.path.exists(preview) else None
+        return entry
+
+    def evict(self):
+        """Remove least recently used encodes until the cache fits max_bytes"""
+        if self.max_bytes <= 0 or not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for directory, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".mp4") or name.endswith(".partial.mp4"):
+                    continue
+                clip = os.path.join(directory, name)
+                files_for_entry = [clip, *preview_paths(clip).values()]
+                try:
+                    last_used = os.stat(clip).st_atime
+                except FileNotFoundError:
+                    continue
+                size = sum(os.path.getsize(f) for f in files_for_entry if os.path.exists(f))
+                entries.append((last_used, size, files_for_entry))
+        total = sum(size for _, size, _ in entries)
+        protected_after = time.time() - CLIP_CACHE_MIN_AGE_SECONDS
+        for last_used, size, files_for_entry in sorted(entries):
+            if total <= self.max_bytes or last_used >= protected_after:
+                break
+            for f in files_for_entry:
+                try:
+                    os.remove(f)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "cache_dir": self.cache_dir}
+
+
+def materialize(cached_path: str, output_path: str) -> str:
+    """Expose a cached clip at output_path (hard link when possible, else copy)"""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    try:
+        os.link(cached_path, output_path)
+    except OSError:
+        shutil.copyfile(cached_path, output_path)
+    return output_path
+
+
+clip_cache = ClipCache()
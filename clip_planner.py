@@ -0,0 +1,163 @@
+"""
+VibeOS - Clip Planner
+Chooses which segments of a video become shorts. Candidate windows of
+allowed durations are scored (audio energy plus an even-spacing prior),
+then the best set of at most N non-overlapping windows is picked with
+weighted interval scheduling: candidates sorted by end time, predecessors
+found by binary search, and an N-layer DP. That is O(n log n + n * N) over
+n candidates, so hour-long videos plan in milliseconds.
+"""
+
+import bisect
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ffmpeg_runner import run_ffmpeg, FFmpegError, FFmpegCancelled
+
+# Candidate start times are this share of min_duration apart
+CANDIDATE_STEP_SHARE = 0.25
+# Score weights: loudness relative to the whole video, and closeness to an evenly spaced slot
+ENERGY_WEIGHT = 1.0
+EVEN_SPACING_WEIGHT = 0.25
+# Audio analysis sample rate (Hz) - loudness only, so low on purpose
+ENERGY_SAMPLE_RATE = 2000
+
+
+def audio_energy(video_path: str, duration: float,
+                 sample_rate: int = ENERGY_SAMPLE_RATE) -> Optional[np.ndarray]:
+    """
+    RMS loudness per second of the first audio stream (None if silent or
+    unreadable). PCM is streamed from a supervised ffmpeg and folded into
+    per-second values as it arrives, so memory stays flat for long videos
+    and a cancelled job stops the analysis (FFmpegCancelled propagates).
+    """
+    second_bytes = sample_rate * 2  # s16le mono
+    pending = bytearray()
+    energy: List[float] = []
+
+    def consume(chunk: bytes):
+        pending.extend(chunk)
+        whole = len(pending) // second_bytes * second_bytes
+        if whole:
+            frames = np.frombuffer(bytes(pending[:whole]), dtype=np.int16).astype(np.float32)
+            energy.extend(np.sqrt((frames.reshape(-1, sample_rate) ** 2).mean(axis=1)).tolist())
+            del pending[:whole]
+
+    args = [
+        '-v', 'error', '-i', video_path,
+        '-vn', '-sn', '-ac', '1', '-ar', str(sample_rate),
+        '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'
+    ]
+    try:
+        run_ffmpeg(args, duration, on_output=consume, stage="analysis")
+    except FFmpegCancelled:
+        raise
+    except (FFmpegError, OSError) as e:
+        print(f"⚠️  Audio analysis failed: {e}")
+        return None
+    if not energy or max(energy) <= 0:
+        return None
+    return np.asarray(energy, dtype=np.float32)
+
+
+def candidate_windows(
+    total_duration: float,
+    min_duration: float,
+    max_duration: float,
+    num_clips: int,
+    energy: Optional[np.ndarray] = None
+) -> List[Dict[str, float]]:
+    """
+    Scored candidate windows {start, end, duration, score}.
+
+    Durations run from min_duration up to the target length (the old even
+    split: total / num_clips, capped at max_duration). Longer windows score
+    higher up to the target, so clips are only shortened where they must be.
+    """
+    min_duration = min(min_duration, total_duration)
+    target = max(min(max_duration, total_duration / max(num_clips, 1)), min_duration)
+    durations = sorted({min_duration, (min_duration + target) / 2, target})
+    step = max(min_duration * CANDIDATE_STEP_SHARE, 1.0)
+
+    # Prefix sums give any window's mean loudness in O(1)
+    prefix = None
+    if energy is not None and len(energy):
+        prefix = np.concatenate([[0.0], np.cumsum(energy / energy.mean())])
+
+    slot = total_duration / max(num_clips, 1)
+    candidates = []
+    for start in np.arange(0.0, max(total_duration - min_duration, 0.0) + 1e-6, step):
+        for duration in durations:
+            duration = min(duration, total_duration - start)
+            if duration < min_duration - 1e-6:
+                continue
+            loudness = 1.0
+            if prefix is not None:
+                first = min(int(start), len(prefix) - 2)
+                last = min(max(int(start + duration), first + 1), len(prefix) - 1)
+                loudness = (prefix[last] - prefix[first]) / (last - first)
+            # 1 when the window sits exactly on an evenly spaced slot start, 0 halfway between
+            offset = (start % slot) / slot if slot > 0 else 0.0
+            even = 1 - 2 * min(offset, 1 - offset)
+            coverage = min(duration / target, 1.0)
+            score = (ENERGY_WEIGHT * loudness + EVEN_SPACING_WEIGHT * even) * coverage
+            candidates.append({"start": float(start), "end": float(start + duration),
+                               "duration": float(duration), "score": float(score)})
+    return candidates
+
+
+def select_windows(candidates: List[Dict[str, float]], num_clips: int) -> List[Dict[str, float]]:
+    """
+    Highest total score set of at most num_clips non-overlapping windows
+    (weighted interval scheduling with a count limit), ordered by start time.
+
+    O(n log n + n * N) time and O(n * N) memory for n candidates and
+    N = num_clips: the sort and predecessor search are O(n log n), the DP
+    table has N + 1 rows of n + 1 cells. N is small (a handful of shorts),
+    so this stays close to O(n log n) in practice.
+    """
+    if not candidates or num_clips <= 0:
+        return []
+    ordered = sorted(candidates, key=lambda c: c["end"])
+    ends = [c["end"] for c in ordered]
+    # previous[i]: how many windows end at or before window i starts
+    previous = [bisect.bisect_right(ends, c["start"] + 1e-6) for c in ordered]
+
+    n = len(ordered)
+    best = [[0.0] * (n + 1) for _ in range(num_clips + 1)]
+    for k in range(1, num_clips + 1):
+        row, prior = best[k], best[k - 1]
+        for i, candidate in enumerate(ordered, start=1):
+            row[i] = max(row[i - 1], prior[previous[i - 1]] + candidate["score"])
+
+    chosen = []
+    k, i = num_clips, n
+    while k > 0 and i > 0:
+        if best[k][i] == best[k][i - 1]:
+            i -= 1
+        else:
+            chosen.append(ordered[i - 1])
+            i = previous[i - 1]
+            k -= 1
+    return sorted(chosen, key=lambda c: c["start"])
+
+
+def plan_clips(
+    total_duration: float,
+    min_duration: float,
+    max_duration: float,
+    num_clips: int,
+    energy: Optional[np.ndarray] = None
+) -> List[Dict[str, float]]:
+    """
+    Non-overlapping clip windows for a video: up to num_clips windows of
+    min_duration..max_duration seconds (a video shorter than min_duration
+    becomes a single clip of its full length)
+    """
+    if total_duration <= 0:
+        return []
+    return select_windows(
+        candidate_windows(total_duration, min_duration, max_duration, num_clips, energy),
+        num_clips
+    )
@@ -0,0 +1,283 @@
+"""
+VibeOS - FFmpeg Runner
+Supervises ffmpeg processes for clip encodes. Progress is streamed from
+`-progress pipe:1` and reported as percent complete. stderr is drained
+into a short tail instead of being buffered whole. Each process runs at
+lower CPU priority (nice), optionally pinned to a CPU set, with a thread
+cap. Timeouts scale with the clip duration, and processes started under
+an ffmpeg_job() scope can be cancelled together (e.g. from the API).
+"""
+
+import io
+import os
+import signal
+import threading
+import contextvars
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, Optional, Set
+
+# Threads per ffmpeg process (decoder, encoder and filter graph each)
+FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", "2"))
+# Niceness added to each ffmpeg process (0 = same priority as the server)
+FFMPEG_NICE = int(os.getenv("FFMPEG_NICE", "10"))
+# CPU ids ffmpeg may run on, e.g. "2,3" or "2-5" (empty = any)
+FFMPEG_CPUS = os.getenv("FFMPEG_CPUS", "")
+# Timeout = base + per_second * clip duration
+FFMPEG_TIMEOUT_BASE = float(os.getenv("FFMPEG_TIMEOUT_BASE", "30"))
+FFMPEG_TIMEOUT_PER_SECOND = float(os.getenv("FFMPEG_TIMEOUT_PER_SECOND", "4"))
+# Seconds between SIGTERM and SIGKILL when stopping a process
+FFMPEG_KILL_GRACE = 5.0
+# stderr lines kept for error messages
+STDERR_TAIL_LINES = 40
+# Bytes per on_output() call when stdout carries media data
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+
+class FFmpegError(RuntimeError):
+    """ffmpeg exited with an error"""
+
+
+class FFmpegCancelled(FFmpegError):
+    """The job was cancelled"""
+
+
+class FFmpegTimeout(FFmpegError):
+    """ffmpeg ran past its timeout"""
+
+
+def parse_cpus(spec: str) -> Optional[Set[int]]:
+    """'0,2-3' -> {0, 2, 3} (None for an empty spec)"""
+    cpus = set()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus or None
+
+
+def clip_timeout(duration: float) -> float:
+    """Seconds an encode of `duration` seconds of output may take"""
+    return FFMPEG_TIMEOUT_BASE + FFMPEG_TIMEOUT_PER_SECOND * max(duration, 0)
+
+
+# ==================== JOBS ====================
+
+class _Job:
+    """ffmpeg processes started under one ffmpeg_job() scope"""
+
+    def __init__(self, job_id: str, on_progress: Optional[Callable[[Dict[str, Any]], None]]):
+        self.job_id = job_id
+        self.on_progress = on_progress
+        self.processes: Set[subprocess.Popen] = set()
+        self.cancelled = False
+        self.encodes = 0
+
+
+_jobs: Dict[str, _Job] = {}
+_jobs_lock = threading.Lock()
+_current_job: contextvars.ContextVar = contextvars.ContextVar("ffmpeg_job", default=None)
+
+
+@contextmanager
+def ffmpeg_job(job_id: str, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    Group the ffmpeg runs inside the block under job_id so cancel_ffmpeg_job()
+    can stop them. on_progress(progress) receives every progress update.
+    Each scope starts a fresh job, so a reused job_id does not inherit an
+    earlier run's callback or cancellation.
+    """
+    job = _Job(job_id, on_progress)
+    with _jobs_lock:
+        _jobs[job_id] = job
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+        with _jobs_lock:
+            if _jobs.get(job_id) is job:
+                del _jobs[job_id]
+
+
+def cancel_ffmpeg_job(job_id: str) -> bool:
+    """Stop the job's running encodes and refuse new ones; False if the job is unknown here"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancelled = True
+        processes = list(job.processes)
+    for process in processes:
+        _stop(process)
+    return True
+
+
+def _stop(process: subprocess.Popen):
+    """SIGTERM, then SIGKILL if ffmpeg has not exited after the grace period"""
+    if process.poll() is not None:
+        return
+    process.send_signal(signal.SIGTERM)
+    threading.Timer(FFMPEG_KILL_GRACE, lambda: process.poll() is None and process.kill()).start()
+
+
+def _limit_process(pid: int, nice: int, cpus: Optional[Set[int]]):
+    """Lower priority and pin the CPU set of a freshly started process (best effort)"""
+    try:
+        if nice and hasattr(os, "setpriority"):
+            os.setpriority(os.PRIO_PROCESS, pid, min(os.getpriority(os.PRIO_PROCESS, pid) + nice, 19))
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, cpus)
+    except OSError as e:
+        print(f"⚠️  Could not limit ffmpeg process {pid}: {e}")
+
+
+# ==================== RUN ====================
+
+def run_ffmpeg(
+    args: List[str],
+    duration: float,
+    timeout: Optional[float] = None,
+    threads: int = FFMPEG_THREADS,
+    nice: int = FFMPEG_NICE,
+    cpus: Optional[str] = FFMPEG_CPUS,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    fps: Optional[float] = None,
+    on_output: Optional[Callable[[bytes], None]] = None,
+    stage: str = "encode"
+) -> Dict[str, Any]:
+    """
+    Run `ffmpeg <args>` under supervision.
+
+    Args:
+        args: arguments after the program name (inputs, filters, outputs)
+        duration: seconds of output expected (for percent complete and the timeout)
+        timeout: seconds before the process is killed (default clip_timeout(duration))
+        threads: filter graph thread cap (pass the same value to decoder/encoder -threads)
+        on_progress: progress callback, in addition to the job's
+        fps: output frame rate, when known; percent then follows the first
+            output's frame count, which stays accurate when side outputs
+            (poster, sprite) end early and reset ffmpeg's out_time
+        on_output: receives ffmpeg's stdout in chunks as it is produced (for
+            `pipe:1` outputs); progress then moves to a separate pipe
+        stage: reported with progress; only "encode" runs count towards "encode"
+
+    Returns:
+        Final progress: {"percent", "out_time", "speed", "encode", "stage"}
+
+    Raises:
+        FFmpegCancelled, FFmpegTimeout or FFmpegError
+    """
+    job: Optional[_Job] = _current_job.get()
+    # Progress shares stdout unless stdout carries media data
+    progress_read, progress_write = os.pipe() if on_output else (None, None)
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-nostdin',
+        '-progress', f'pipe:{progress_write}' if on_output else 'pipe:1',
+        '-filter_threads', str(threads), '-filter_complex_threads', str(threads),
+        *args
+    ]
+
+    try:
+        if job and job.cancelled:
+            raise FFmpegCancelled(f"Job {job.job_id} was cancelled")
+        # Spawn outside the lock: fork/exec must not serialize other runs or cancel_ffmpeg_job()
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            pass_fds=(progress_write,) if on_output else ()
+        )
+    except BaseException:
+        if on_output:
+            os.close(progress_read)
+        raise
+    finally:
+        if on_output:
+            os.close(progress_write)
+    if job:
+        with _jobs_lock:
+            job.processes.add(process)
+            if stage == "encode":
+                job.encodes += 1
+            cancelled = job.cancelled
+        if cancelled:  # cancelled while spawning; the check after wait() raises
+            _stop(process)
+    _limit_process(process.pid, nice, parse_cpus(cpus or ""))
+
+    # Drain stderr concurrently so a chatty encode can never fill the pipe and stall
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    stderr_text = io.TextIOWrapper(process.stderr, errors="replace")
+    drain = threading.Thread(target=lambda: stderr_tail.extend(stderr_text), daemon=True)
+    drain.start()
+
+    progress_stream = io.TextIOWrapper(
+        io.FileIO(progress_read, "r") if on_output else process.stdout, errors="replace"
+    )
+    output_errors = []
+    pump = None
+    if on_output:
+        def forward_output():
+            try:
+                for chunk in iter(lambda: process.stdout.read1(OUTPUT_CHUNK_SIZE), b""):
+                    on_output(chunk)
+            except BaseException as e:
+                output_errors.append(e)
+                _stop(process)
+
+        pump = threading.Thread(target=forward_output, daemon=True)
+        pump.start()
+
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        _stop(process)
+
+    timer = threading.Timer(timeout if timeout is not None else clip_timeout(duration), expire)
+    timer.start()
+
+    progress = {"percent": 0.0, "out_time": 0.0, "speed": None,
+                "encode": job.encodes if job else 1, "stage": stage}
+    fields: Dict[str, str] = {}
+    try:
+        for line in progress_stream:
+            key, _, value = line.strip().partition("=")
+            fields[key] = value
+            if key != "progress":
+                continue
+            # out_time_us (out_time_ms is also microseconds, despite the name); N/A between updates
+            micros = fields.get("out_time_us") or fields.get("out_time_ms") or ""
+            if micros.isdigit():
+                progress["out_time"] = max(progress["out_time"], int(micros) / 1_000_000)
+            frames = fields.get("frame", "")
+            done = int(frames) / fps if fps and frames.isdigit() else progress["out_time"]
+            progress["speed"] = fields.get("speed", "N/A").rstrip("x").replace("N/A", "") or progress["speed"]
+            progress["percent"] = 100.0 if value == "end" else max(
+                progress["percent"], round(min(done / max(duration, 1e-3) * 100, 99.9), 1)
+            )
+            for callback in (on_progress, job.on_progress if job else None):
+                if callback:
+                    callback(dict(progress))
+        process.wait()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        if pump:
+            pump.join(timeout=5)
+        drain.join(timeout=5)
+        progress_stream.close()
+        if job:
+            with _jobs_lock:
+                job.processes.discard(process)
+
+    if job and job.cancelled:
+        raise FFmpegCancelled(f"Job {job.job_id} was cancelled")
+    if output_errors:
+        raise output_errors[0]
+    if timed_out.is_set():
+        raise FFmpegTimeout(f"ffmpeg timed out after {timer.interval:.0f}s")
+    if process.returncode != 0:
+        detail = next((line.strip() for line in reversed(stderr_tail) if line.strip()), "no output")
+        raise FFmpegError(f"ffmpeg exited with code {process.returncode}: {detail}")
+    return progress
@@ -1,11 +1,56 @@
 
 import { useEffect, useState } from "react";
 import { HardDriveDownload } from "lucide-react";
-import { processVideo } from "../services/api.js";
+import { cancelUploadJob, getUploadJob, mediaUrl, processVideo } from "../services/api.js";
 import { useAppContext } from "../context/AppContext.jsx";
 import ButtonArrowDown from "../components/ui/ButtonArrowDown.jsx";
 import DotLoader from "../components/ui/DotLoader.jsx";
 
+const JOB_POLL_INTERVAL_MS = 2000;
+// Stop polling after this long; the server fails jobs whose worker died well before then
+const JOB_MAX_WAIT_MS = 60 * 60 * 1000;
+const FINAL_JOB_STATES = ["complete", "failed", "cancelled"];
+
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Hover scrubbing reads thumbnails from the sprite sheet; the video itself is only
+// fetched on play, and seeking then asks the server for just the byte ranges it needs.
+function ShortPreview({ short }) {
+        const [tile, setTile] = useState(null);
+        const layout = short.spriteLayout;
+
+        const handleMove = (event) => {
+                const video = event.currentTarget.querySelector("video");
+                if (!layout || !short.sprite || !video?.paused) return;
+                const bounds = event.currentTarget.getBoundingClientRect();
+                const share = Math.min(Math.max((event.clientX - bounds.left) / bounds.width, 0), 0.999);
+                setTile(Math.floor(share * layout.columns * layout.rows));
+        };
+
+        const spriteStyle = tile === null ? null : {
+                position: "absolute",
+                inset: 0,
+                pointerEvents: "none",
+                backgroundImage: `url(${mediaUrl(short.sprite)})`,
+                backgroundSize: `${layout.columns * 100}% ${layout.rows * 100}%`,
+                backgroundPosition: `${((tile % layout.columns) / Math.max(layout.columns - 1, 1)) * 100}% ${(Math.floor(tile / layout.columns) / Math.max(layout.rows - 1, 1)) * 100}%`
+        };
+
+        return (
+                <div style={{ position: "relative" }} onMouseMove={handleMove} onMouseLeave={() => setTile(null)}>
+                        <video
+                                src={mediaUrl(short.videoUrl)}
+                                poster={mediaUrl(short.thumbnail) || undefined}
+                                preload="none"
+                                controls
+                                onPlay={() => setTile(null)}
+                                style={{ width: "100%", borderRadius: "0.5rem" }}
+                        />
+                        {spriteStyle ? <div style={spriteStyle} aria-hidden="true" /> : null}
+                </div>
+        );
+}
+
 export default function UploadPage() {
         const { scriptResult, setErrorMessage, setIsBusy, isBusy } = useAppContext();
         const [videoFile, setVideoFile] = useState(null);
@@ -31,8 +76,23 @@ export default function UploadPage() {
                 formData.append("script", scriptText || "");
 
                 try {
-                        const { data } = await processVideo(formData);
+                        let { data } = await processVideo(formData);
                         setResponse(data);
+
+                        // Clipping runs as a background job on the server; poll until it settles
+                        const deadline = Date.now() + JOB_MAX_WAIT_MS;
+                        while (data.jobId && !FINAL_JOB_STATES.includes(data.status)) {
+                                if (Date.now() >= deadline) {
+                                        setErrorMessage("Clipping is taking too long. Check the backend log.");
+                                        break;
+                                }
+                                await wait(JOB_POLL_INTERVAL_MS);
+                                ({ data } = await getUploadJob(data.jobId));
+                                setResponse(data);
+                        }
+                        if (data.status === "failed") {
+                                setErrorMessage(data.error || "Clipping failed. Check the backend log.");
+                        }
                 } catch (error) {
                         console.error("Upload failed", error);
                         const detail = error.response?.data?.detail;
@@ -43,6 +103,23 @@ export default function UploadPage() {
                 }
         };
 
+        const handleCancel = async () => {
+                try {
+                        await cancelUploadJob(response.jobId);
+                } catch (error) {
+                        console.error("Cancel failed", error);
+                        setErrorMessage(error.response?.data?.detail || "Unable to cancel the job.");
+                }
+        };
+
+        const jobRunning = Boolean(response?.jobId) && !FINAL_JOB_STATES.includes(response.status);
+        const progress = response?.progress;
+        const progressLabel = !progress
+                ? "agent_core processing video"
+                : progress.stage === "analysis"
+                        ? `agent_core analysing audio: ${Math.round(progress.percent)}%`
+                        : `agent_core clipping short ${progress.clip}: ${Math.round(progress.percent)}%`;
+
         return (
                 <section className="card">
                         <header className="card__header">
@@ -78,7 +155,13 @@ export default function UploadPage() {
                                 </ButtonArrowDown>
                         </form>
 
-                        {isBusy ? <DotLoader label="agent_core processing video" /> : null}
+                        {isBusy ? <DotLoader label={progressLabel} /> : null}
+
+                        {jobRunning && response.status !== "cancelling" ? (
+                                <button type="button" onClick={handleCancel} style={{ marginTop: "1rem" }}>
+                                        Cancel processing
+                                </button>
+                        ) : null}
 
                         {response?.shorts?.length ? (
                                 <div style={{ marginTop: "2rem" }}>
@@ -86,9 +169,9 @@ export default function UploadPage() {
                                         <div className="grid">
                                                 {response.shorts.map((short) => (
                                                         <article key={short.id} className="trend-card">
+                                                                <ShortPreview short={short} />
                                                                 <strong>{short.id}</strong>
-                                                                <p>Duration: {short.duration}s</p>
-                                                                <p>Video URL: {short.videoUrl}</p>
+                                                                <p>Duration: {short.duration}s (from {short.startTime}s)</p>
                                                                 <p>Views: {short.views}</p>
                                                         </article>
                                                 ))}
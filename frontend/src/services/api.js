@@ -44,6 +44,19 @@ export function processVideo(formData) {
   });
 }
 
+export function getUploadJob(jobId) {
+  return api.get(`/api/upload/jobs/${jobId}`);
+}
+
+export function cancelUploadJob(jobId) {
+  return api.post(`/api/upload/jobs/${jobId}/cancel`);
+}
+
+// Absolute URL for media the backend serves (clips, posters, sprites)
+export function mediaUrl(path) {
+  return path ? `${API_BASE_URL}${path}` : null;
+}
+
 export function getAnalytics() {
   return api.get("/api/analytics");
 }
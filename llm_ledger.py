@@ -0,0 +1,398 @@
+"""
+VibeOS - LLM Usage Ledger
+Records prompt/completion tokens, latency, model and estimated cost for every
+Gemini call, with per-run, per-user, per-niche and per-day rollups.
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Union, Sequence
+
+from dotenv import load_dotenv
+
+from rate_limiter import limited_call
+from sqlite_connection import connect_sqlite
+
+load_dotenv()
+
+
+# ==================== PRICING ====================
+
+# Estimated USD per 1M tokens as (input, output). Used for cost accounting only;
+# unknown models are recorded with zero cost but full token counts.
+MODEL_PRICING = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.0-flash-exp": (0.10, 0.40),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-pro": (0.50, 1.50),
+}
+
+# Daily token budget per user (0 = unlimited)
+TENANT_DAILY_TOKEN_BUDGET = int(os.getenv("TENANT_DAILY_TOKEN_BUDGET", "0") or 0)
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when a user has spent their daily LLM token budget"""
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate USD cost of a call from the pricing table"""
+    input_price, output_price = MODEL_PRICING.get(model_name, (0.0, 0.0))
+    return round((prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000, 8)
+
+
+# ==================== RUN CONTEXT ====================
+
+_run_context: contextvars.ContextVar = contextvars.ContextVar("llm_run_context", default=None)
+
+
+@contextmanager
+def ledger_run(user_id: str = "", niche: str = "", run_id: Optional[str] = None):
+    """
+    Tag every LLM call made inside this block with a run ID, user and niche.
+
+    Context variables do not cross thread pools on their own; submit work with
+    contextvars.copy_context().run to keep the tags on worker threads.
+    """
+    context = {
+        "run_id": run_id or uuid.uuid4().hex[:12],
+        "user_id": user_id or "",
+        "niche": niche or ""
+    }
+    token = _run_context.set(context)
+    try:
+        yield context
+    finally:
+        _run_context.reset(token)
+
+
+def current_run() -> Dict[str, str]:
+    """Return the active run context (empty tags outside ledger_run)"""
+    return _run_context.get() or {"run_id": "", "user_id": "", "niche": ""}
+
+
+# ==================== LEDGER DATABASE ====================
+
+class LLMLedger:
+    """SQLite ledger of LLM calls"""
+
+    ROLLUP_COLUMNS = {
+        "user": "user_id",
+        "niche": "niche",
+        "day": "DATE(created_at)",
+        "model": "model_name",
+        "agent": "agent",
+    }
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("LLM_LEDGER_DB", "llm_ledger.db")
+        self.init_database()
+
+    def init_database(self):
+        """Initialize ledger schema"""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                agent TEXT,
+                model_name TEXT,
+                user_id TEXT,
+                niche TEXT,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                total_tokens INTEGER DEFAULT 0,
+                prompt_chars INTEGER DEFAULT 0,
+                latency_ms REAL,
+                cost_usd REAL DEFAULT 0,
+                status TEXT DEFAULT 'ok',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_run ON llm_calls (run_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_user_day ON llm_calls (user_id, created_at)")
+
+        # Prompt compaction savings (estimated tokens before/after)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_compactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                agent TEXT,
+                user_id TEXT,
+                niche TEXT,
+                items_in INTEGER,
+                items_kept INTEGER,
+                original_tokens INTEGER,
+                compact_tokens INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def record_call(
+        self,
+        agent: str,
+        model_name: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        prompt_chars: int = 0,
+        total_tokens: Optional[int] = None,
+        status: str = "ok",
+        run_id: str = "",
+        user_id: str = "",
+        niche: str = ""
+    ) -> int:
+        """Insert a single LLM call into the ledger"""
+        if total_tokens is None:
+            total_tokens = prompt_tokens + completion_tokens
+
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO llm_calls (run_id, agent, model_name, user_id, niche, prompt_tokens,
+                                   completion_tokens, total_tokens, prompt_chars, latency_ms,
+                                   cost_usd, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            run_id, agent, model_name, user_id, niche,
+            prompt_tokens, completion_tokens, total_tokens, prompt_chars,
+            round(latency_ms, 2),
+            estimate_cost(model_name, prompt_tokens, completion_tokens),
+            status
+        ))
+        call_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return call_id
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        conn = connect_sqlite(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def get_run_calls(self, run_id: str) -> List[Dict[str, Any]]:
+        """All calls recorded for one run, in order"""
+        return self._query("SELECT * FROM llm_calls WHERE run_id = ? ORDER BY id", (run_id,))
+
+    def get_rollup(self, group_by: Union[str, Sequence[str]] = "day", days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Aggregate tokens, cost and latency.
+
+        Args:
+            group_by: One or more of "user", "niche", "day", "model", "agent"
+            days: Look-back window in days
+        """
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        unknown = [key for key in keys if key not in self.ROLLUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown rollup key(s): {', '.join(unknown)}")
+
+        select_cols = ", ".join(f"{self.ROLLUP_COLUMNS[key]} AS {key}" for key in keys)
+        group_cols = ", ".join(self.ROLLUP_COLUMNS[key] for key in keys)
+
+        return self._query(f"""
+            SELECT {select_cols},
+                   COUNT(*) AS calls,
+                   SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens,
+                   SUM(total_tokens) AS total_tokens,
+                   ROUND(SUM(cost_usd), 6) AS cost_usd,
+                   ROUND(AVG(latency_ms), 1) AS avg_latency_ms
+            FROM llm_calls
+            WHERE created_at >= datetime('now', ?)
+            GROUP BY {group_cols}
+            ORDER BY total_tokens DESC
+        """, (f"-{int(days)} days",))
+
+    def get_largest_prompts(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Find the most oversized prompts, grouped by agent and model"""
+        return self._query("""
+            SELECT agent, model_name,
+                   COUNT(*) AS calls,
+                   ROUND(AVG(prompt_tokens), 1) AS avg_prompt_tokens,
+                   MAX(prompt_tokens) AS max_prompt_tokens,
+                   ROUND(AVG(prompt_chars), 1) AS avg_prompt_chars
+            FROM llm_calls
+            GROUP BY agent, model_name
+            ORDER BY avg_prompt_tokens DESC
+            LIMIT ?
+        """, (limit,))
+
+    def record_compaction(
+        self,
+        agent: str,
+        original_tokens: int,
+        compact_tokens: int,
+        items_in: int = 0,
+        items_kept: int = 0,
+        run_id: str = "",
+        user_id: str = "",
+        niche: str = ""
+    ) -> int:
+        """Record estimated token savings from compacting prompt context"""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO prompt_compactions (run_id, agent, user_id, niche, items_in, items_kept,
+                                            original_tokens, compact_tokens)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (run_id, agent, user_id, niche, items_in, items_kept, original_tokens, compact_tokens))
+        row_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return row_id
+
+    def get_compaction_savings(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Estimated tokens saved by prompt compaction, per agent"""
+        return self._query("""
+            SELECT agent,
+                   COUNT(*) AS prompts,
+                   SUM(original_tokens) AS original_tokens,
+                   SUM(compact_tokens) AS compact_tokens,
+                   SUM(original_tokens) - SUM(compact_tokens) AS tokens_saved,
+                   ROUND(100.0 * (SUM(original_tokens) - SUM(compact_tokens))
+                         / MAX(SUM(original_tokens), 1), 1) AS pct_saved
+            FROM prompt_compactions
+            WHERE created_at >= datetime('now', ?)
+            GROUP BY agent
+            ORDER BY tokens_saved DESC
+        """, (f"-{int(days)} days",))
+
+    def get_user_tokens_today(self, user_id: str) -> int:
+        """Total tokens a user has consumed since midnight UTC"""
+        rows = self._query("""
+            SELECT COALESCE(SUM(total_tokens), 0) AS tokens
+            FROM llm_calls
+            WHERE user_id = ? AND DATE(created_at) = DATE('now')
+        """, (user_id,))
+        return int(rows[0]["tokens"]) if rows else 0
+
+    def check_budget(self, user_id: str, daily_budget: Optional[int] = None):
+        """Raise BudgetExceededError if the user is over their daily token budget"""
+        budget = TENANT_DAILY_TOKEN_BUDGET if daily_budget is None else daily_budget
+        if not user_id or budget <= 0:
+            return
+
+        used = self.get_user_tokens_today(user_id)
+        if used >= budget:
+            raise BudgetExceededError(
+                f"User {user_id} has used {used:,} of {budget:,} daily LLM tokens"
+            )
+
+
+# Global ledger instance
+ledger = LLMLedger()
+
+
+# ==================== TRACKED CALLS ====================
+
+def _usage_counts(response) -> Dict[str, int]:
+    """Pull token counts out of a Gemini response's usage metadata"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    prompt_tokens = int(getattr(usage, "prompt_token_count", 0) or 0)
+    completion_tokens = int(getattr(usage, "candidates_token_count", 0) or 0)
+    total_tokens = int(getattr(usage, "total_token_count", 0) or 0) or prompt_tokens + completion_tokens
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": total_tokens
+    }
+
+
+def model_name_of(model) -> str:
+    """Short model name for a genai.GenerativeModel ("models/x" -> "x")"""
+    name = getattr(model, "model_name", "") or ""
+    return name.split("/", 1)[1] if name.startswith("models/") else name
+
+
+def tracked_generate(model, prompt: str, agent: str):
+    """
+    Call model.generate_content(prompt) through the shared Gemini rate
+    limiter and record usage in the ledger.
+
+    Returns the raw Gemini response. Failed calls are recorded with
+    status='error' and the exception is re-raised.
+    """
+    context = current_run()
+    ledger.check_budget(context["user_id"])
+
+    model_name = model_name_of(model)
+    started = time.perf_counter()
+    try:
+        response = limited_call("gemini", model.generate_content, prompt)
+    except Exception:
+        try:
+            ledger.record_call(
+                agent=agent,
+                model_name=model_name,
+                prompt_tokens=0,
+                completion_tokens=0,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                prompt_chars=len(prompt),
+                status="error",
+                **context
+            )
+        except sqlite3.Error as e:
+            # Keep the Gemini error, not the accounting one
+            print(f"⚠️  Could not record failed LLM call: {e}")
+        raise
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    try:
+        ledger.record_call(
+            agent=agent,
+            model_name=model_name,
+            latency_ms=latency_ms,
+            prompt_chars=len(prompt),
+            **_usage_counts(response),
+            **context
+        )
+    except sqlite3.Error as e:
+        # Accounting must never break generation
+        print(f"⚠️  Could not record LLM usage: {e}")
+
+    return response
+
+
+def record_prompt_compaction(agent: str, stats: Dict[str, int]):
+    """Accounting hook for prompt_context.build_trend_context stats"""
+    try:
+        ledger.record_compaction(
+            agent=agent,
+            original_tokens=stats.get("original_tokens", 0),
+            compact_tokens=stats.get("compact_tokens", 0),
+            items_in=stats.get("trends_in", 0),
+            items_kept=stats.get("trends_kept", 0),
+            **current_run()
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not record prompt compaction: {e}")
+
+
+if __name__ == "__main__":
+    import json
+
+    print("LLM usage by agent (last 30 days):")
+    print(json.dumps(ledger.get_rollup(group_by="agent"), indent=2))
+
+    print("\nLargest prompts:")
+    print(json.dumps(ledger.get_largest_prompts(), indent=2))
+
+    print("\nPrompt compaction savings:")
+    print(json.dumps(ledger.get_compaction_savings(), indent=2))
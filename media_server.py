@@ -0,0 +1,185 @@
+"""
+VibeOS - Media Server
+ASGI app that serves uploaded videos and clipped shorts with HTTP Range
+support (single byte ranges, 206/416), ETag/Last-Modified validators and
+conditional requests (304, If-Range). A video element seeking into a clip
+fetches only the bytes it needs. Bodies go out through the ASGI zero-copy
+send extension (sendfile) when the server offers it; otherwise fixed-size
+chunks are read with pread on a worker thread.
+
+Mount it on a FastAPI app:
+    app.mount("/shorts", MediaFiles("shorts"), name="shorts")
+"""
+
+import os
+import stat
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+import anyio.to_thread
+
+# Bytes per body message when streaming without sendfile
+MEDIA_CHUNK_SIZE = int(os.getenv("MEDIA_CHUNK_SIZE", str(256 * 1024)))
+# Cache-Control max-age; files are revalidated cheaply with ETag afterwards
+MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", "3600"))
+
+ZERO_COPY_EXTENSION = "http.response.zerocopysend"
+
+mimetypes.add_type("video/mp4", ".mp4")
+mimetypes.add_type("video/quicktime", ".mov")
+
+
+def file_etag(st: os.stat_result) -> str:
+    """Strong validator from size and mtime (a re-encode changes both)"""
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into an inclusive (start, end) byte range.
+
+    Returns None when the header should be ignored (not bytes, malformed,
+    last byte before first or several ranges - the full file is served then).
+    Raises ValueError when the range cannot be satisfied (416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = (part.strip() for part in spec.strip().partition("-"))
+    if not dash or not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        return None
+    if not first:  # suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("range not satisfiable")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:  # syntactically invalid (RFC 7233 2.1)
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def route_path(scope) -> str:
+    """Request path below the mount point (Starlette keeps the prefix in root_path)"""
+    path, root = scope["path"], scope.get("root_path", "")
+    return path[len(root):] if root and path.startswith(root) else path
+
+
+class MediaFiles:
+    """ASGI app serving files below `directory` (GET and HEAD only)"""
+
+    def __init__(self, directory: str, chunk_size: int = MEDIA_CHUNK_SIZE, max_age: int = MEDIA_MAX_AGE):
+        self.directory = os.path.realpath(directory)
+        self.chunk_size = chunk_size
+        self.max_age = max_age
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _resolve(self, path: str) -> Optional[str]:
+        """Absolute file path for a request path, or None if it escapes the directory"""
+        full = os.path.realpath(os.path.join(self.directory, path.lstrip("/")))
+        if os.path.commonpath([full, self.directory]) != self.directory:
+            return None
+        return full
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._respond(send, 405, {"allow": "GET, HEAD"})
+            return
+
+        path = self._resolve(route_path(scope))
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            await self._respond(send, 404, {}, b"Not Found")
+            return
+
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        size = st.st_size
+        etag = file_etag(st)
+        last_modified = formatdate(st.st_mtime, usegmt=True)
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+            "cache-control": f"public, max-age={self.max_age}",
+            "content-type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+        }
+
+        if self._not_modified(request_headers, etag, st.st_mtime):
+            await self._respond(send, 304, {k: headers[k] for k in ("etag", "last-modified", "cache-control")})
+            return
+
+        start, end, status = 0, size - 1, 200
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(request_headers.get("if-range"), etag, last_modified):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                await self._respond(send, 416, {"content-range": f"bytes */{size}", "accept-ranges": "bytes"})
+                return
+            if byte_range:
+                start, end = byte_range
+                status = 206
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+        length = end - start + 1 if size else 0
+        headers["content-length"] = str(length)
+        await send({"type": "http.response.start", "status": status, "headers": self._encode(headers)})
+        if scope["method"] == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, path, start, length)
+
+    @staticmethod
+    def _not_modified(request_headers: Dict[str, str], etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _if_range_matches(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+        """If-Range: honour Range only while the client's copy is still current"""
+        return if_range is None or if_range.strip() in (etag, last_modified)
+
+    async def _send_file(self, scope, send, path: str, offset: int, length: int):
+        with open(path, "rb") as media:
+            if ZERO_COPY_EXTENSION in (scope.get("extensions") or {}):
+                # The server sendfile()s straight from the page cache to the socket
+                await send({"type": ZERO_COPY_EXTENSION, "file": media, "offset": offset, "count": length})
+                return
+
+            fd = media.fileno()
+            remaining = length
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(self.chunk_size, remaining), offset)
+                if not chunk:
+                    # Truncated underneath us: content-length is already out, so the
+                    # server must abort the connection rather than end the body cleanly
+                    raise OSError(f"{path} shrank while being sent")
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+    @staticmethod
+    def _encode(headers: Dict[str, str]) -> List[Tuple[bytes, bytes]]:
+        return [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+
+    async def _respond(self, send, status: int, headers: Dict[str, str], body: bytes = b""):
+        headers = {**headers, "content-length": str(len(body))}
+        await send({"type": "http.response.start", "status": status, "headers": self._encode(headers)})
+        await send({"type": "http.response.body", "body": body})
@@ -12,7 +12,11 @@ Name: core - the central orchestrator, the brain of the operation
 """
 
 import os
+import json
+import time
 import sqlite3
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import TypedDict, List, Dict, Any, Optional
 from pathlib import Path
@@ -26,6 +30,9 @@ from agent_ripple import run_ripple, GraphState
 from agent_quill import run_quill
 from agent_pulse import run_pulse
 from agent_envoy import run_envoy
+from llm_ledger import ledger_run
+from rate_limiter import configure_limiter
+from sqlite_connection import connect_sqlite
 
 # Load environment variables
 load_dotenv()
@@ -41,7 +48,7 @@ class NexusDatabase:
     
     def init_database(self):
         """Initialize database tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         
         # Scripts table
@@ -89,11 +96,20 @@ class NexusDatabase:
                 posted BOOLEAN DEFAULT 0,
                 platform TEXT,
                 post_url TEXT,
+                poster_path TEXT,
+                sprite_path TEXT,
+                sprite_meta TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (video_id) REFERENCES videos(id)
             )
         """)
         
+        # Gallery previews (added after the original schema)
+        short_columns = {row[1] for row in cursor.execute("PRAGMA table_info(shorts)")}
+        for column in ("poster_path", "sprite_path", "sprite_meta"):
+            if column not in short_columns:
+                cursor.execute(f"ALTER TABLE shorts ADD COLUMN {column} TEXT")
+        
         # Sponsors table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sponsors (
@@ -116,7 +132,7 @@ class NexusDatabase:
     
     def save_script(self, script_data: Dict[str, Any], topic: str, niche: str, vibe: str) -> int:
         """Save generated script to database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -143,9 +159,52 @@ class NexusDatabase:
         print(f"💾 Script saved to database (ID: {script_id})")
         return script_id
     
+    def save_scripts_bulk(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Save many generated scripts in a single transaction
+        
+        Args:
+            rows: Dicts with 'script_data', 'topic', 'niche' and 'vibe'
+        
+        Returns:
+            Script IDs in the same order as rows
+        """
+        if not rows:
+            return []
+        
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        
+        script_ids = []
+        for row in rows:
+            script_data = row['script_data']
+            cursor.execute("""
+                INSERT INTO scripts (topic, niche, vibe, intro, body, outro, full_script, 
+                                    shot_count, difficulty, props_needed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                row['topic'],
+                row['niche'],
+                row['vibe'],
+                script_data.get('intro', ''),
+                script_data.get('body', ''),
+                script_data.get('outro', ''),
+                script_data.get('full_script', ''),
+                script_data.get('shot_count', 1),
+                script_data.get('difficulty', 'easy'),
+                ','.join(script_data.get('props_needed', []))
+            ))
+            script_ids.append(cursor.lastrowid)
+        
+        conn.commit()
+        conn.close()
+        
+        print(f"💾 {len(script_ids)} scripts saved to database")
+        return script_ids
+    
     def save_video(self, script_id: int, video_path: str, duration: float, file_size: int) -> int:
         """Save uploaded video to database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -162,7 +221,7 @@ class NexusDatabase:
     
     def save_shorts(self, video_id: int, clips: List[Dict[str, Any]]):
         """Save clipped shorts to database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         
         for clip in clips:
@@ -171,8 +230,9 @@ class NexusDatabase:
             
             cursor.execute("""
                 INSERT INTO shorts (video_id, clip_path, start_time, duration, 
-                                  file_size, posted, platform)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                                  file_size, posted, platform,
+                                  poster_path, sprite_path, sprite_meta)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 video_id,
                 clip.get('path', ''),
@@ -180,7 +240,10 @@ class NexusDatabase:
                 clip.get('duration', 0),
                 clip.get('size_bytes', 0),
                 clip.get('posted', False),
-                'Twitter/X' if clip.get('posted') else None
+                'Twitter/X' if clip.get('posted') else None,
+                clip.get('poster_path'),
+                clip.get('sprite_path'),
+                json.dumps(clip['sprite']) if clip.get('sprite') else None
             ))
         
         conn.commit()
@@ -190,7 +253,7 @@ class NexusDatabase:
     
     def save_sponsors(self, script_id: int, deals: List[Dict[str, Any]]):
         """Save sponsor deals to database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         
         for deal in deals:
@@ -211,9 +274,31 @@ class NexusDatabase:
         
         print(f"💾 {len(deals)} sponsor opportunities saved to database")
     
+    def get_shorts(self, video_id: Optional[int] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get shorts (newest first) with their poster and sprite previews"""
+        conn = connect_sqlite(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        if video_id is None:
+            cursor.execute("SELECT * FROM shorts ORDER BY created_at DESC, id DESC LIMIT ?", (limit,))
+        else:
+            cursor.execute("""
+                SELECT * FROM shorts WHERE video_id = ? ORDER BY start_time LIMIT ?
+            """, (video_id, limit))
+        
+        shorts = []
+        for row in cursor.fetchall():
+            short = dict(row)
+            short['sprite_meta'] = json.loads(short['sprite_meta']) if short['sprite_meta'] else None
+            shorts.append(short)
+        conn.close()
+        
+        return shorts
+    
     def get_recent_scripts(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent scripts from database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -386,10 +471,13 @@ nexus_app = create_nexus_workflow()
 
 
 # --- Main Execution Functions ---
-def run_nexus_phase1(topic: str, niche: str, user_vibe: str, goals: str = "") -> Dict[str, Any]:
+def run_nexus_phase1(topic: str, niche: str, user_vibe: str, goals: str = "", user_id: str = "") -> Dict[str, Any]:
     """
     Run Phase 1: Script Generation (ripple → quill)
     
+    LLM calls are tagged in the usage ledger with user_id, niche and a run ID
+    (returned as 'llm_run_id' and 'user_id', so Phase 2 joins the same run).
+    
     Returns state with generated script, paused for video upload
     """
     
@@ -421,7 +509,10 @@ def run_nexus_phase1(topic: str, niche: str, user_vibe: str, goals: str = "") ->
     print("-" * 80)
     
     # Run workflow (will pause at awaiting_video node)
-    final_state = nexus_app.invoke(inputs)
+    with ledger_run(user_id=user_id, niche=niche) as run:
+        final_state = nexus_app.invoke(inputs)
+    final_state['llm_run_id'] = run['run_id']
+    final_state['user_id'] = user_id
     
     print("-" * 80)
     
@@ -494,7 +585,8 @@ def run_nexus_phase2(state: GraphState, video_path: str) -> Dict[str, Any]:
     
     # Run envoy
     print("\n--- Running envoy ---")
-    deal_result = run_envoy(state)
+    with ledger_run(user_id=state.get('user_id', ''), niche=state.get('niche', ''), run_id=state.get('llm_run_id')):
+        deal_result = run_envoy(state)
     state.update(deal_result)
     
     # Save sponsors to database
@@ -542,6 +634,157 @@ def run_nexus_full(
     return state
 
 
+# --- Batch Phase 1 ---
+def _empty_state(topic: str, niche: str, user_vibe: str, goals: str) -> GraphState:
+    return GraphState(
+        topic=topic,
+        niche=niche,
+        user_vibe=user_vibe,
+        goals=goals,
+        scouted_trends=[],
+        generated_script={},
+        video_path="",
+        clipped_shorts=[],
+        engage_plan={},
+        deal_plan=[],
+        error=""
+    )
+
+
+def run_nexus_batch(
+    jobs: List[Dict[str, Any]],
+    max_workers: int = 4,
+    requests_per_minute: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run Phase 1 (ripple → quill) for many topics in one go
+    
+    Ripple runs once per unique niche and its trends are shared by every job
+    in that niche. Quill calls run concurrently on a thread pool under the
+    shared Gemini rate limiter, and successful scripts are written in one
+    transaction.
+    
+    Args:
+        jobs: Dicts with 'topic', 'niche', 'vibe' (or 'user_vibe') and
+              optional 'goals' / 'user_id'
+        max_workers: Concurrent quill calls
+        requests_per_minute: Optional new rate for the shared Gemini limiter
+    
+    Returns:
+        {"jobs": [per-job status], "summary": {...throughput...}}
+    """
+    print("=" * 80)
+    print(f"🚀 CORE - Batch Phase 1: {len(jobs)} jobs")
+    print("=" * 80)
+    
+    started = time.perf_counter()
+    if requests_per_minute:
+        configure_limiter("gemini", rate=requests_per_minute / 60.0)
+    
+    results = []
+    for index, job in enumerate(jobs):
+        results.append({
+            "index": index,
+            "topic": job.get('topic', ''),
+            "niche": job.get('niche', ''),
+            "vibe": job.get('vibe') or job.get('user_vibe', ''),
+            "status": "pending",
+            "script_id": None,
+            "error": "",
+            "seconds": 0.0
+        })
+    
+    def submit(executor, fn, *args):
+        # Carry the caller's ledger tags onto the worker thread
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+    
+    # 1. One ripple lookup per unique niche
+    niches = list(dict.fromkeys(r['niche'] for r in results))
+    trends_by_niche: Dict[str, List[Dict[str, str]]] = {}
+    
+    def scout(niche: str) -> List[Dict[str, str]]:
+        with ledger_run(niche=niche):
+            result = run_ripple(_empty_state("", niche, "", ""))
+        return result.get('scouted_trends', [])
+    
+    print(f"🌊 Scouting trends for {len(niches)} unique niche(s)...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {submit(executor, scout, niche): niche for niche in niches}
+        for future in as_completed(futures):
+            niche = futures[future]
+            try:
+                trends_by_niche[niche] = future.result()
+            except Exception as e:
+                print(f"⚠️  ripple failed for niche '{niche}': {e}")
+                trends_by_niche[niche] = []
+    
+    # 2. Concurrent quill calls
+    def write(result: Dict[str, Any]) -> Dict[str, Any]:
+        job = jobs[result['index']]
+        job_started = time.perf_counter()
+        trends = trends_by_niche.get(result['niche'], [])
+        
+        if not trends:
+            return {"error": "ripple: No trends found", "seconds": time.perf_counter() - job_started}
+        
+        state = _empty_state(result['topic'], result['niche'], result['vibe'], job.get('goals', ''))
+        state['scouted_trends'] = trends
+        
+        with ledger_run(user_id=job.get('user_id', ''), niche=result['niche']):
+            output = run_quill(state)
+        
+        output['seconds'] = time.perf_counter() - job_started
+        return output
+    
+    print(f"✍️  Writing {len(results)} scripts with {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {submit(executor, write, result): result for result in results}
+        for future in as_completed(futures):
+            result = futures[future]
+            try:
+                output = future.result()
+            except Exception as e:
+                output = {"error": f"quill failed: {e}"}
+            
+            result['seconds'] = round(output.get('seconds', 0.0), 2)
+            script = output.get('generated_script') or {}
+            if output.get('error') or not script.get('full_script'):
+                result['status'] = "failed"
+                result['error'] = output.get('error', 'No script generated')
+            else:
+                result['status'] = "generated"
+                result['script'] = script
+            
+            print(f"   {'✅' if result['status'] == 'generated' else '❌'} [{result['index']}] {result['topic']}")
+    
+    # 3. Bulk write
+    generated = [r for r in results if r['status'] == "generated"]
+    script_ids = db.save_scripts_bulk([
+        {"script_data": r['script'], "topic": r['topic'], "niche": r['niche'], "vibe": r['vibe']}
+        for r in generated
+    ])
+    for result, script_id in zip(generated, script_ids):
+        result['script_id'] = script_id
+        result['status'] = "saved"
+    
+    elapsed = time.perf_counter() - started
+    summary = {
+        "jobs": len(results),
+        "succeeded": len(generated),
+        "failed": len(results) - len(generated),
+        "ripple_lookups": len(niches),
+        "elapsed_seconds": round(elapsed, 2),
+        "jobs_per_minute": round(len(results) / elapsed * 60, 2) if elapsed > 0 else 0.0
+    }
+    
+    print("-" * 80)
+    print(f"✅ Batch complete: {summary['succeeded']}/{summary['jobs']} scripts in "
+          f"{summary['elapsed_seconds']}s ({summary['jobs_per_minute']} jobs/min)")
+    print("=" * 80)
+    
+    return {"jobs": results, "summary": summary}
+
+
 # --- Display Helper ---
 def display_results(state: Dict[str, Any]):
     """Pretty-print the complete pipeline results"""
@@ -0,0 +1,136 @@
+"""
+VibeOS - Prompt Context Builder
+Compacts scouted trends into short prompt text: near-duplicate trends are
+merged, fields the model does not need (URLs, scores) are dropped and
+summaries are truncated to fit a token budget.
+"""
+
+import re
+import json
+from typing import Dict, List, Any, Tuple
+
+# Rough chars-per-token ratio for English text with Gemini tokenizers
+CHARS_PER_TOKEN = 4
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting before a prompt is sent"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _title_words(trend: Dict[str, Any]) -> frozenset:
+    title = trend.get('title') or trend.get('text') or ''
+    return frozenset(_WORD_RE.findall(title.lower()))
+
+
+def _summary_of(trend: Dict[str, Any]) -> str:
+    summary = trend.get('summary') or trend.get('snippet') or ''
+    if not summary and trend.get('title') and trend.get('text'):
+        summary = trend['text']
+    return re.sub(r'\s+', ' ', summary).strip()
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Cut text at a word boundary so it fits max_chars"""
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ""
+    cut = text[:max_chars - 1].rsplit(' ', 1)[0].rstrip(' ,;:.-')
+    return f"{cut}…"
+
+
+def dedupe_trends(trends: List[Dict[str, Any]], similarity: float = 0.7) -> List[Dict[str, Any]]:
+    """
+    Drop near-identical trends, keeping the first (highest ranked) of each group.
+
+    Two trends are duplicates when they share a URL or the Jaccard similarity
+    of their title words is at least `similarity`.
+    """
+    kept: List[Dict[str, Any]] = []
+    kept_words: List[frozenset] = []
+    seen_urls = set()
+
+    for trend in trends:
+        url = (trend.get('url') or trend.get('link') or '').rstrip('/')
+        if url and url in seen_urls:
+            continue
+
+        words = _title_words(trend)
+        duplicate = False
+        if words:
+            for other in kept_words:
+                if other and len(words & other) / len(words | other) >= similarity:
+                    duplicate = True
+                    break
+        if duplicate:
+            continue
+
+        if url:
+            seen_urls.add(url)
+        kept.append(trend)
+        kept_words.append(words)
+
+    return kept
+
+
+def build_trend_context(
+    trends: List[Dict[str, Any]],
+    token_budget: int = 300,
+    max_trends: int = 8
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Render trends as compact bullet lines for an LLM prompt.
+
+    Args:
+        trends: Scouted trends (ripple or TrendHunter format)
+        token_budget: Approximate token budget for the whole block
+        max_trends: Maximum trends to keep after deduplication
+
+    Returns:
+        (context_text, stats) where stats compares against the legacy
+        json.dumps(trends, indent=2) rendering
+    """
+    original_text = json.dumps(trends, indent=2) if trends else ""
+    stats = {
+        "trends_in": len(trends),
+        "trends_kept": 0,
+        "original_tokens": estimate_tokens(original_text),
+        "compact_tokens": 0
+    }
+
+    if not trends:
+        return "No specific trends available", stats
+
+    kept = dedupe_trends(trends)[:max_trends]
+
+    titles = [re.sub(r'\s+', ' ', t.get('title') or t.get('text') or '').strip() for t in kept]
+    summaries = [_summary_of(t) for t in kept]
+
+    # Titles are kept whole; whatever budget is left is shared across summaries
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    title_chars = sum(len(title) + 4 for title in titles)
+    per_summary = max((budget_chars - title_chars) // max(len(kept), 1), 0)
+
+    lines = []
+    for title, summary in zip(titles, summaries):
+        summary = _truncate(summary, per_summary) if summary and summary != title else ""
+        lines.append(f"- {title}: {summary}" if summary else f"- {title}")
+
+    context = "\n".join(lines)
+    stats["trends_kept"] = len(kept)
+    stats["compact_tokens"] = estimate_tokens(context)
+    return context, stats
+
+
+if __name__ == "__main__":
+    sample_trends = [
+        {"title": "Rabbit R1 review: AI gadget flops", "url": "https://example.com/a", "summary": "Slow performance and missing features frustrate early buyers. " * 4},
+        {"title": "Rabbit R1 review - AI gadget flops!", "url": "https://example.com/b", "summary": "Duplicate coverage of the same story."},
+        {"title": "Humane AI Pin returns spike", "url": "https://example.com/c", "summary": "Returns outpace sales as reviewers pile on."},
+    ]
+    text, compaction = build_trend_context(sample_trends, token_budget=80)
+    print(text)
+    print(compaction)
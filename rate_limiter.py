@@ -0,0 +1,363 @@
+"""
+VibeOS - Client-Side Rate Limiting
+Shared per-provider limiters for external APIs (Gemini, Serper, Twitter,
+YouTube, Gmail): a token bucket caps request rate and an AIMD concurrency
+window shrinks on 429/503 responses, honouring Retry-After, and grows back
+while calls succeed. Calls that are not safe to repeat (posting a tweet,
+sending an email) pass retry="throttle" and are only retried when the
+provider refused them outright.
+"""
+
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Callable
+
+# Statuses that mean "slow down" - they shrink the concurrency window
+THROTTLE_STATUSES = {429, 503}
+# Statuses worth retrying after a backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Transport errors retried even without a status, matched by class name so the
+# SDKs stay optional (requests, httpx, urllib3, http.client, google api_core)
+TRANSIENT_ERROR_NAMES = {
+    "ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "ChunkedEncodingError",
+    "ConnectError", "ReadError", "WriteError", "NetworkError", "TimeoutException", "RemoteProtocolError",
+    "ProtocolError", "NewConnectionError", "IncompleteRead", "RemoteDisconnected",
+    "ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "TooManyRequests", "RetryError",
+}
+# Retry policies for ProviderLimiter.call:
+# - "transient": 429/5xx and transport errors (reads and other idempotent calls)
+# - "throttle": only 429, or a 5xx carrying Retry-After - the provider rejected the
+#   request unprocessed, so repeating a non-idempotent call cannot duplicate it
+RETRY_POLICIES = ("transient", "throttle")
+
+# provider: (requests per second, burst, max concurrency)
+PROVIDER_DEFAULTS = {
+    "gemini": (2.0, 4, 8),
+    "serper": (5.0, 10, 8),
+    "twitter": (1.0, 3, 4),
+    "twitter_media": (10.0, 20, 12),  # media/upload.json chunks have their own, larger budget
+    "youtube": (2.0, 4, 4),
+    "gmail": (1.0, 2, 2),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket (rate tokens/second, up to capacity)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+                self._tokens = min(self._tokens, capacity)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency window: +1 slot per window of successes (additive
+    increase), halved on throttling (multiplicative decrease).
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial: Optional[int] = None, decrease: float = 0.5):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(initial or self.max_limit)
+        self.decrease = decrease
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+
+
+# ==================== RESPONSE INSPECTION ====================
+
+def _status_of(obj: Any) -> Optional[int]:
+    """HTTP status from a response or an SDK exception (requests, tweepy, googleapiclient, api_core)"""
+    candidates = [
+        getattr(obj, "status_code", None),
+        getattr(getattr(obj, "response", None), "status_code", None),
+        getattr(getattr(obj, "resp", None), "status", None),
+        getattr(obj, "code", None),
+    ]
+    for value in candidates:
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                continue
+        try:
+            status = int(value)
+        except (TypeError, ValueError):
+            continue
+        if 100 <= status < 600:
+            return status
+    return None
+
+
+def _is_transient(error: Exception) -> bool:
+    """Connection resets, timeouts and SDK transport errors that carry no HTTP status"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def _headers_of(obj: Any) -> Dict[str, str]:
+    for source in (obj, getattr(obj, "response", None), getattr(obj, "resp", None)):
+        headers = getattr(source, "headers", None)
+        if headers is None and isinstance(source, dict):
+            headers = source  # httplib2.Response is a dict of headers
+        if headers:
+            return {str(k).lower(): v for k, v in dict(headers).items()}
+    return {}
+
+
+def retry_after_seconds(obj: Any) -> Optional[float]:
+    """Parse Retry-After (seconds or HTTP date) or x-rate-limit-reset (epoch seconds)"""
+    headers = _headers_of(obj)
+
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(value)
+                return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    reset = headers.get("x-rate-limit-reset")
+    if reset:
+        try:
+            return max(float(reset) - time.time(), 0.0)
+        except ValueError:
+            pass
+    return None
+
+
+# ==================== PROVIDER LIMITER ====================
+
+class ProviderLimiter:
+    """Rate + adaptive concurrency limiter for one external provider"""
+
+    def __init__(self, name: str, rate: float, burst: float, max_concurrency: int,
+                 max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "throttled": 0, "retries": 0, "errors": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _wait_for_cooldown(self):
+        while True:
+            remaining = self._cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _set_cooldown(self, seconds: float):
+        with self._lock:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+
+    @contextmanager
+    def slot(self):
+        """Hold one rate token and one concurrency slot for the duration of a call"""
+        self._wait_for_cooldown()
+        self.bucket.acquire()
+        self.concurrency.acquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def _backoff(self, attempt: int, hint: Optional[float]) -> float:
+        if hint is not None:
+            return min(hint, self.max_delay)
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        return delay * (0.5 + random.random() / 2)  # jitter
+
+    def _throttled(self, source: Any, status: int, attempt: int) -> float:
+        hint = retry_after_seconds(source)
+        if status in THROTTLE_STATUSES:
+            self._count("throttled")
+            self.concurrency.on_throttle()
+            if hint:
+                self._set_cooldown(min(hint, self.max_delay))
+        return self._backoff(attempt, hint)
+
+    @staticmethod
+    def _retryable(source: Any, status: Optional[int], retry: str) -> bool:
+        """Whether a failed attempt (exception or response) may be repeated under a policy"""
+        if retry == "throttle":
+            return status == 429 or (status in RETRY_STATUSES and retry_after_seconds(source) is not None)
+        if status is None:
+            return isinstance(source, Exception) and _is_transient(source)
+        return status in RETRY_STATUSES
+
+    def call(self, fn: Callable, *args, retry: str = "transient", **kwargs):
+        """
+        Run fn(*args, **kwargs) under this provider's limits.
+
+        With retry="transient" (default) retries on 429/5xx, whether raised as
+        an exception or returned as a response object, honouring Retry-After,
+        and on status-less transport errors (connection resets, timeouts).
+        With retry="throttle" only 429s and Retry-After rejections are retried,
+        for calls that must not run twice. After the last retry the final
+        response is returned (or the exception re-raised).
+        """
+        if retry not in RETRY_POLICIES:
+            raise ValueError(f"Unknown retry policy: {retry}")
+        for attempt in range(self.max_retries + 1):
+            self._count("calls")
+            try:
+                with self.slot():
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                status = _status_of(e)
+                if not self._retryable(e, status, retry) or attempt == self.max_retries:
+                    self._count("errors")
+                    raise
+                delay = self._throttled(e, status, attempt)
+                reason = f"HTTP {status}" if status is not None else type(e).__name__
+            else:
+                status = _status_of(result) if hasattr(result, "status_code") else None
+                if status is None or not self._retryable(result, status, retry) or attempt == self.max_retries:
+                    self.concurrency.on_success()
+                    return result
+                delay = self._throttled(result, status, attempt)
+                reason = f"HTTP {status}"
+
+            self._count("retries")
+            print(f"⏳ {self.name}: {reason}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "provider": self.name,
+            "rate_per_second": self.bucket.rate,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight
+        })
+        return stats
+
+
+# ==================== REGISTRY ====================
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """
+    Shared limiter for a provider. Defaults can be overridden with
+    RATE_LIMIT_<PROVIDER>_RPS, _BURST and _CONCURRENCY env vars.
+
+    Limits are per host: when RATE_LIMIT_PROCESSES is set (run_backend.py
+    sets it to the worker count) each process takes an equal share.
+    """
+    provider = provider.lower()
+    with _registry_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rate, burst, concurrency = PROVIDER_DEFAULTS.get(provider, (1.0, 2, 2))
+            prefix = f"RATE_LIMIT_{provider.upper()}"
+            processes = max(int(_env_number("RATE_LIMIT_PROCESSES", 1)), 1)
+            limiter = ProviderLimiter(
+                provider,
+                rate=_env_number(f"{prefix}_RPS", rate) / processes,
+                burst=max(_env_number(f"{prefix}_BURST", burst) / processes, 1.0),
+                max_concurrency=max(int(_env_number(f"{prefix}_CONCURRENCY", concurrency)) // processes, 1)
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def configure_limiter(provider: str, rate: Optional[float] = None, max_concurrency: Optional[int] = None):
+    """Adjust a provider's rate (requests/second) and/or concurrency ceiling at runtime"""
+    limiter = get_limiter(provider)
+    if rate is not None:
+        limiter.bucket.set_rate(rate)
+    if max_concurrency is not None:
+        with limiter.concurrency._cond:
+            limiter.concurrency.max_limit = max(max_concurrency, limiter.concurrency.min_limit)
+            limiter.concurrency.limit = min(limiter.concurrency.limit, limiter.concurrency.max_limit)
+            limiter.concurrency._cond.notify_all()
+    return limiter
+
+
+def limited_call(provider: str, fn: Callable, *args, retry: str = "transient", **kwargs):
+    """Shorthand for get_limiter(provider).call(fn, *args, retry=retry, **kwargs)"""
+    return get_limiter(provider).call(fn, *args, retry=retry, **kwargs)
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every limiter created so far"""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
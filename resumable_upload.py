@@ -0,0 +1,143 @@
+"""
+VibeOS - Resumable Uploads
+Checkpoints for chunked platform uploads (session URI + bytes sent) kept in
+SQLite, so an upload interrupted by a crash, timeout or restart continues
+from the last acknowledged byte instead of starting over, plus a chunk-size
+controller that sizes chunks from the throughput actually observed.
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+from typing import Dict, Any, Optional
+
+from sqlite_connection import connect_sqlite
+
+# Resumable sessions (YouTube's last about a week) older than this are dropped
+UPLOAD_SESSION_MAX_AGE_DAYS = int(os.getenv("UPLOAD_SESSION_MAX_AGE_DAYS", "6"))
+
+
+def upload_key(platform: str, file_path: str, *extra: Any) -> str:
+    """
+    Stable key for one upload of one file: platform, absolute path, size,
+    mtime and any extra identity (title, privacy...). Editing the file
+    changes the key, so a stale session is never resumed with new bytes.
+    """
+    stat = os.stat(file_path)
+    identity = [platform, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, *extra]
+    return hashlib.sha256(json.dumps(identity, default=str).encode("utf-8")).hexdigest()
+
+
+class UploadCheckpointStore:
+    """SQLite checkpoints for resumable uploads (upload_sessions table)"""
+
+    def __init__(self, db_path: str = "nexus_data.db"):
+        self.db_path = db_path
+        self.init_database()
+
+    def init_database(self):
+        """Initialize database tables"""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS upload_sessions (
+                upload_key TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                session_uri TEXT,
+                bytes_sent INTEGER DEFAULT 0,
+                chunk_size INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint for an upload, or None (sessions past their max age are discarded)"""
+        conn = connect_sqlite(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM upload_sessions WHERE updated_at < datetime('now', ?)
+        """, (f"-{UPLOAD_SESSION_MAX_AGE_DAYS} days",))
+        cursor.execute("SELECT * FROM upload_sessions WHERE upload_key = ?", (key,))
+        row = cursor.fetchone()
+        conn.commit()
+        conn.close()
+
+        return dict(row) if row else None
+
+    def start(self, key: str, platform: str, file_path: str, file_size: int,
+              session_uri: Optional[str] = None, chunk_size: Optional[int] = None):
+        """Record a new upload session (replacing any previous one for the key)"""
+        conn = connect_sqlite(self.db_path)
+        conn.execute("""
+            INSERT OR REPLACE INTO upload_sessions
+            (upload_key, platform, file_path, file_size, session_uri, bytes_sent, chunk_size)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+        """, (key, platform, file_path, file_size, session_uri, chunk_size))
+        conn.commit()
+        conn.close()
+
+    def checkpoint(self, key: str, session_uri: Optional[str], bytes_sent: int,
+                   chunk_size: Optional[int] = None):
+        """Persist progress after an acknowledged chunk"""
+        conn = connect_sqlite(self.db_path)
+        conn.execute("""
+            UPDATE upload_sessions
+            SET session_uri = COALESCE(?, session_uri), bytes_sent = ?,
+                chunk_size = COALESCE(?, chunk_size), updated_at = CURRENT_TIMESTAMP
+            WHERE upload_key = ?
+        """, (session_uri, bytes_sent, chunk_size, key))
+        conn.commit()
+        conn.close()
+
+    def discard(self, key: str):
+        """Forget a session once its upload finished or failed for good"""
+        conn = connect_sqlite(self.db_path)
+        conn.execute("DELETE FROM upload_sessions WHERE upload_key = ?", (key,))
+        conn.commit()
+        conn.close()
+
+
+class AdaptiveChunkSize:
+    """
+    Picks the next chunk size so each chunk takes about target_seconds at
+    the smoothed observed throughput. Sizes are multiples of `granularity`
+    (YouTube requires 256 KiB), grow at most 2x per chunk and halve after
+    a failed chunk, so flaky links fall back to small, cheap retries.
+    """
+
+    def __init__(self, initial: Optional[int] = None, minimum: int = 256 * 1024,
+                 maximum: int = 32 * 1024 * 1024, target_seconds: float = 4.0,
+                 granularity: int = 256 * 1024):
+        self.granularity = granularity
+        self.minimum = max(minimum, granularity)
+        self.maximum = max(maximum, self.minimum)
+        self.target_seconds = target_seconds
+        self.throughput: Optional[float] = None  # bytes/second (EWMA)
+        self.size = self._clamp(initial or 1024 * 1024)
+
+    def _clamp(self, size: float) -> int:
+        size = int(size) // self.granularity * self.granularity
+        return min(max(size, self.minimum), self.maximum)
+
+    def observe(self, sent_bytes: int, seconds: float) -> int:
+        """Record a completed chunk and return the next chunk size"""
+        if sent_bytes > 0 and seconds > 0:
+            rate = sent_bytes / seconds
+            self.throughput = rate if self.throughput is None else 0.7 * self.throughput + 0.3 * rate
+            self.size = self._clamp(min(self.throughput * self.target_seconds, self.size * 2))
+        return self.size
+
+    def backoff(self) -> int:
+        """Halve the chunk size after a failed chunk"""
+        self.size = self._clamp(self.size // 2)
+        return self.size
+
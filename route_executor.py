@@ -0,0 +1,128 @@
+"""
+VibeOS - Route Executor
+Runs blocking handler work (Gemini, Serper, SQLite, ffmpeg) on worker threads
+so the event loop stays responsive. Each route gets its own concurrency cap
+and a bounded wait queue; when both are full the request is rejected with
+503 + Retry-After instead of piling up behind a slow call.
+"""
+
+import os
+import functools
+from typing import Dict, Any, Callable
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException
+
+# route: (max concurrent calls, max queued callers)
+ROUTE_DEFAULTS = {
+    "trends": (8, 16),
+    "script": (4, 8),
+    "upload": (2, 4),
+    "clipping": (2, 16),  # ffmpeg clip jobs (background)
+    "jobs": (16, 64),
+    "analytics": (16, 32),
+    "sponsors": (16, 32),
+    "sponsor_search": (8, 16),
+    "phase1": (4, 8),
+    "phase2": (2, 4),
+}
+
+# Seconds a queued request waits for a slot before giving up
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("ROUTE_QUEUE_TIMEOUT", "30"))
+
+
+class RouteSaturatedError(HTTPException):
+    """503 raised when a route's slots and queue are both full"""
+
+    def __init__(self, route: str, retry_after: int = 5):
+        super().__init__(
+            status_code=503,
+            detail=f"Server busy ({route}), please retry shortly",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class RouteLimiter:
+    """Concurrency cap + bounded queue for one route, executing work on threads"""
+
+    def __init__(self, name: str, max_concurrent: int, max_waiting: int,
+                 queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.max_concurrent = max(max_concurrent, 1)
+        self.max_waiting = max(max_waiting, 0)
+        self.queue_timeout = queue_timeout
+        self._slots = anyio.CapacityLimiter(self.max_concurrent)
+        # Separate thread limiter so route work does not compete with anyio's default pool
+        self._threads = anyio.CapacityLimiter(self.max_concurrent)
+        self._waiting = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Await fn(*args, **kwargs) on a worker thread once a slot is free"""
+        if self._slots.available_tokens == 0 and self._waiting >= self.max_waiting:
+            self._stats["rejected"] += 1
+            raise RouteSaturatedError(self.name)
+
+        self._waiting += 1
+        try:
+            with anyio.fail_after(self.queue_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            self._stats["timed_out"] += 1
+            raise RouteSaturatedError(self.name)
+        finally:
+            self._waiting -= 1
+
+        try:
+            result = await anyio.to_thread.run_sync(
+                functools.partial(fn, *args, **kwargs), limiter=self._threads
+            )
+        except BaseException:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._slots.release()
+
+        self._stats["completed"] += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats.update({
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.max_concurrent - int(self._slots.available_tokens),
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting
+        })
+        return stats
+
+
+_routes: Dict[str, RouteLimiter] = {}
+
+
+def route_limiter(name: str) -> RouteLimiter:
+    """
+    Limiter for a route, created on first use. Override the defaults with
+    ROUTE_LIMIT_<NAME>=<concurrent> and ROUTE_QUEUE_<NAME>=<waiting>.
+    """
+    limiter = _routes.get(name)
+    if limiter is None:
+        concurrent, waiting = ROUTE_DEFAULTS.get(name, (4, 8))
+        limiter = RouteLimiter(
+            name,
+            max_concurrent=int(os.getenv(f"ROUTE_LIMIT_{name.upper()}", concurrent)),
+            max_waiting=int(os.getenv(f"ROUTE_QUEUE_{name.upper()}", waiting))
+        )
+        _routes[name] = limiter
+    return limiter
+
+
+async def run_blocking(route: str, fn: Callable, *args, **kwargs):
+    """Shorthand for route_limiter(route).run(fn, *args, **kwargs)"""
+    return await route_limiter(route).run(fn, *args, **kwargs)
+
+
+def route_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every route limiter created so far"""
+    return {name: limiter.stats() for name, limiter in _routes.items()}
@@ -2,25 +2,112 @@
 """
 Backend server launcher for Nexus
 Run this to start the backend API server
+
+Usage:
+    python run_backend.py                         # single process (development)
+    python run_backend.py --reload                # single process, auto-reload
+    python run_backend.py --workers 4             # production: pre-forked workers
+    python run_backend.py --app api_server:app --port 8001
+
+With more than one worker the app is imported once in the master (gunicorn
+preload, when gunicorn is installed) and forked, sessions move to the shared
+SQLite store and provider rate limits are split across the workers.
 """
+import argparse
+import os
+
 import uvicorn
 
+
+def configure_worker_env(workers: int):
+    """Move per-process state out of memory before the app is imported"""
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    if workers <= 1:
+        return
+
+    # In-memory sessions would only be visible to the worker that created them
+    if os.getenv("SESSION_STORE", "memory").lower() == "memory":
+        if "SESSION_STORE" in os.environ:
+            print("⚠️  SESSION_STORE=memory is per-process - using sqlite for multiple workers")
+        os.environ["SESSION_STORE"] = "sqlite"
+
+    # Provider quotas are per host; each worker gets an equal share
+    os.environ.setdefault("RATE_LIMIT_PROCESSES", str(workers))
+
+    # Gemini's gRPC transport must be told it will be used after fork
+    os.environ.setdefault("GRPC_ENABLE_FORK_SUPPORT", "1")
+    os.environ.setdefault("GRPC_POLL_STRATEGY", "poll")
+
+
+def _serve_gunicorn(app: str, host: str, port: int, workers: int, log_level: str) -> bool:
+    """Run under gunicorn with preload_app; returns False if gunicorn is not installed"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+
+    from uvicorn.importer import import_from_string
+
+    class PreforkApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("loglevel", log_level)
+            self.cfg.set("timeout", int(os.getenv("WORKER_TIMEOUT", "120")))
+            self.cfg.set("graceful_timeout", 30)
+
+        def load(self):
+            return import_from_string(app)
+
+    PreforkApplication().run()
+    return True
+
+
+def serve(app: str = "backend_server:app", host: str = "0.0.0.0", port: int = 8000,
+          workers: int = 1, reload: bool = False, log_level: str = "info"):
+    """Start the API with one process (or reload) or a pool of pre-forked workers"""
+    workers = max(workers, 1)
+    if reload and workers > 1:
+        print("⚠️  --reload only supports one worker - starting a single process")
+        workers = 1
+
+    configure_worker_env(workers)
+
+    if workers > 1:
+        print(f"👥 Starting {workers} workers")
+        if _serve_gunicorn(app, host, port, workers, log_level):
+            return
+        # Fallback: uvicorn's own supervisor spawns workers that each import the app
+        print("   gunicorn not installed - using uvicorn workers (no preload)")
+
+    uvicorn.run(app, host=host, port=port, workers=workers, reload=reload, log_level=log_level)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the Nexus backend API")
+    parser.add_argument("--app", default="backend_server:app", help="ASGI app import path (default: backend_server:app)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes, 0 = one per CPU (default: $WEB_CONCURRENCY or 1)")
+    parser.add_argument("--reload", action="store_true", help="Auto-reload on code changes (development only)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
     print("=" * 80)
     print("🚀 Starting Nexus Backend Server")
     print("=" * 80)
-    print("\n📡 Backend will be available at: http://localhost:8000")
-    print("📚 API Documentation: http://localhost:8000/docs")
+    print(f"\n📡 Backend will be available at: http://localhost:{args.port}")
+    print(f"📚 API Documentation: http://localhost:{args.port}/docs")
     print("\n⚠️  Note: Backend requires API keys to function fully")
     print("   Add these to your Replit Secrets:")
     print("   - GEMINI_API_KEY")
     print("   - SERPER_API_KEY")
     print("\n" + "=" * 80 + "\n")
-    
-    uvicorn.run(
-        "backend_server:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=False,
-        log_level="info"
-    )
+
+    serve(args.app, host=args.host, port=args.port, workers=workers,
+          reload=args.reload, log_level=args.log_level)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Batch script generation launcher for Nexus
+Runs Phase 1 (ripple → quill) for a list of (topic, niche, vibe) jobs
+
+Usage:
+    python run_batch.py jobs.json
+    python run_batch.py jobs.csv --workers 8 --rpm 60 --output report.json
+
+jobs.json is a list of {"topic": ..., "niche": ..., "vibe": ...} objects;
+jobs.csv needs a header row with topic,niche,vibe (goals/user_id optional).
+"""
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+
+def load_jobs(path: Path):
+    """Load batch jobs from a JSON list or a CSV file"""
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            jobs = [dict(row) for row in csv.DictReader(handle)]
+    else:
+        with path.open(encoding="utf-8") as handle:
+            jobs = json.load(handle)
+
+    if not isinstance(jobs, list):
+        raise ValueError("Jobs file must contain a list of jobs")
+
+    for index, job in enumerate(jobs):
+        missing = [key for key in ("topic", "niche") if not job.get(key)]
+        if missing or not (job.get("vibe") or job.get("user_vibe")):
+            raise ValueError(f"Job {index} is missing: {', '.join(missing or ['vibe'])}")
+
+    return jobs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Nexus scripts for many topics in one run")
+    parser.add_argument("jobs", type=Path, help="JSON or CSV file of (topic, niche, vibe) jobs")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent quill calls (default: 4)")
+    parser.add_argument("--rpm", type=float, help="Max Gemini requests per minute (default: shared limiter setting)")
+    parser.add_argument("--output", type=Path, help="Write the per-job report as JSON")
+    args = parser.parse_args()
+
+    try:
+        jobs = load_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"🚨 Could not load jobs: {e}")
+        sys.exit(1)
+
+    # Imported after argument parsing - nexus_core validates API keys on import
+    from nexus_core import run_nexus_batch
+
+    report = run_nexus_batch(jobs, max_workers=args.workers, requests_per_minute=args.rpm)
+
+    print("\n📋 Per-job status:")
+    for job in report["jobs"]:
+        detail = f"script #{job['script_id']}" if job["script_id"] else job["error"]
+        print(f"   [{job['index']}] {job['status']:<9} {job['seconds']:>6.1f}s  {job['topic']} ({detail})")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+        print(f"\n💾 Report written to {args.output}")
+
+    sys.exit(0 if report["summary"]["failed"] == 0 else 2)
@@ -0,0 +1,414 @@
+"""
+VibeOS - Session Store
+Bounded key/value store for short-lived API sessions (generated scripts,
+sponsors, email templates). Two backends:
+
+- MemorySessionStore: per-process LRU with TTL and entry/byte limits
+- SQLiteSessionStore: shared across uvicorn workers via one SQLite file
+
+Background job records (clip jobs) live in JobStore instead: its own SQLite
+table that is never LRU-evicted, with a heartbeat so jobs orphaned by a dead
+worker can be failed, and a retention period after which jobs are purged.
+
+Values are stored as JSON so both backends behave the same and no live
+objects (pydantic models, clients) are kept alive by a session.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+from sqlite_connection import connect_sqlite
+
+# Defaults (override with SESSION_* env vars)
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Jobs untouched for this long are purged (override with JOB_RETENTION_SECONDS)
+DEFAULT_JOB_RETENTION_SECONDS = 24 * 3600
+# Job states that are never changed again
+FINAL_JOB_STATUSES = ("complete", "failed", "cancelled")
+
+
+def _encode(value: Dict[str, Any]) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+class SessionStore(ABC):
+    """Interface shared by the session backends"""
+
+    backend = "base"
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0}
+
+    def _count(self, key: str, amount: int = 1):
+        if amount:
+            with self._stats_lock:
+                self._stats[key] += amount
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, session_id: str, value: Dict[str, Any]):
+        """Store a session value (resets its TTL)"""
+
+    def update(self, session_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into an existing session; returns the new value or None if missing"""
+        value = self.get(session_id)
+        if value is None:
+            return None
+        value.update(fields)
+        self.set(session_id, value)
+        return value
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Remove a session if present"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored sessions"""
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "backend": self.backend,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0
+        })
+        return stats
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store with TTL, bounded by entry count and encoded size"""
+
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(ttl_seconds, max_entries)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (expires_at, payload)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, session_id: str):
+        _, payload = self._entries.pop(session_id)
+        self._bytes -= len(payload)
+
+    def _purge_expired(self, now: float) -> int:
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._drop(key)
+        return len(expired)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(session_id)
+                entry = None
+                self._count("expirations")
+            if entry is None:
+                self._count("misses")
+                return None
+            self._entries.move_to_end(session_id)
+        self._count("hits")
+        return json.loads(entry[1])
+
+    def set(self, session_id: str, value: Dict[str, Any]):
+        payload = _encode(value)
+        now = time.monotonic()
+        with self._lock:
+            if session_id in self._entries:
+                self._drop(session_id)
+            self._entries[session_id] = (now + self.ttl_seconds, payload)
+            self._bytes += len(payload)
+
+            self._count("expirations", self._purge_expired(now))
+            evicted = 0
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                evicted += 1
+        self._count("sets")
+        self._count("evictions", evicted)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if session_id in self._entries:
+                self._drop(session_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats.update({"bytes": self._bytes, "max_bytes": self.max_bytes})
+        return stats
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store visible to every worker process on the host"""
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(ttl_seconds, max_entries)
+        self.db_path = db_path or os.getenv("SESSION_DB", "sessions.db")
+        self.init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect_sqlite(self.db_path)
+
+    def init_database(self):
+        """Initialize session schema"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER,
+                expires_at REAL,
+                accessed_at REAL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_accessed ON sessions (accessed_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+        conn.commit()
+        conn.close()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT data, expires_at FROM sessions WHERE session_id = ?", (session_id,))
+        row = cursor.fetchone()
+
+        if row and row[1] <= now:
+            cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._count("expirations")
+            row = None
+        elif row:
+            cursor.execute("UPDATE sessions SET accessed_at = ? WHERE session_id = ?", (now, session_id))
+
+        conn.commit()
+        conn.close()
+
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    def set(self, session_id: str, value: Dict[str, Any]):
+        payload = _encode(value)
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO sessions (session_id, data, size, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (session_id, payload, len(payload), now + self.ttl_seconds, now))
+
+        cursor.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        expired = cursor.rowcount
+
+        # Least recently used rows beyond the cap
+        cursor.execute("""
+            DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM sessions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        evicted = cursor.rowcount
+
+        conn.commit()
+        conn.close()
+        self._count("sets")
+        self._count("expirations", max(expired, 0))
+        self._count("evictions", max(evicted, 0))
+
+    def delete(self, session_id: str):
+        conn = self._connect()
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.commit()
+        conn.close()
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        conn.close()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        conn = self._connect()
+        stats["bytes"] = conn.execute("SELECT COALESCE(SUM(size), 0) FROM sessions").fetchone()[0]
+        conn.close()
+        return stats
+
+
+class JobStore:
+    """
+    Background job records in their own SQLite table, shared across workers.
+    Nothing is evicted for space. The worker running a job touch()es it
+    periodically, so updated_at doubles as a heartbeat: an unfinished job
+    whose heartbeat stops (its worker died) can be failed with fail_if_stale(),
+    and any job is purged after retention_seconds without a write. on_purge
+    (job_id, value) is called for each purged job to clean up its files.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, retention_seconds: Optional[float] = None,
+                 on_purge: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.db_path = db_path or os.getenv("JOB_DB") or os.getenv("SESSION_DB", "sessions.db")
+        self.retention_seconds = retention_seconds if retention_seconds is not None else float(
+            os.getenv("JOB_RETENTION_SECONDS", DEFAULT_JOB_RETENTION_SECONDS)
+        )
+        self.on_purge = on_purge
+        self.init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect_sqlite(self.db_path)
+
+    def init_database(self):
+        """Initialize job schema"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at)")
+        conn.commit()
+        conn.close()
+
+    def create(self, job_id: str, value: Dict[str, Any]):
+        """Store a new job (and purge jobs past the retention period)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR REPLACE INTO jobs (job_id, data, updated_at) VALUES (?, ?, ?)",
+                         (job_id, _encode(value), now))
+            cutoff = now - self.retention_seconds
+            purged = conn.execute("SELECT job_id, data FROM jobs WHERE updated_at <= ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM jobs WHERE updated_at <= ?", (cutoff,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        for purged_id, data in purged:
+            if self.on_purge:
+                try:
+                    self.on_purge(purged_id, json.loads(data))
+                except Exception as e:
+                    print(f"⚠️  Cleanup of job {purged_id} failed: {e}")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job record with its last write time as updated_at (epoch seconds), or None if unknown"""
+        conn = self._connect()
+        row = conn.execute("SELECT data, updated_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {**json.loads(row[0]), "updated_at": row[1]}
+
+    def _modify(self, job_id: str, change: Callable[[Dict[str, Any], float], bool]) -> Optional[Dict[str, Any]]:
+        """
+        Read-modify-write a job in one write transaction, so concurrent updates
+        from other workers are not lost. change(value, updated_at) edits value
+        in place and returns False to leave the row untouched.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data, updated_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            value, updated_at = json.loads(row[0]), row[1]
+            if change(value, updated_at):
+                updated_at = time.time()
+                conn.execute("UPDATE jobs SET data = ?, updated_at = ? WHERE job_id = ?",
+                             (_encode(value), updated_at, job_id))
+            conn.commit()
+            return {**value, "updated_at": updated_at}
+        finally:
+            conn.close()
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job; returns the new value or None if unknown"""
+        return self._modify(job_id, lambda value, updated_at: value.update(fields) or True)
+
+    def touch(self, job_id: str):
+        """Heartbeat: mark the job as still being worked on"""
+        conn = self._connect()
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+        conn.commit()
+        conn.close()
+
+    def fail_if_stale(self, job_id: str, stale_seconds: float, error: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark an unfinished job failed when it has gone stale_seconds without a
+        write or heartbeat; returns the (possibly updated) job or None if unknown
+        """
+        def change(value: Dict[str, Any], updated_at: float) -> bool:
+            if value.get("status") in FINAL_JOB_STATUSES or time.time() - updated_at < stale_seconds:
+                return False
+            value.update(status="failed", error=error)
+            return True
+
+        return self._modify(job_id, change)
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        conn.close()
+        return count
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """
+    Build the session store selected by SESSION_STORE ("memory" or "sqlite").
+
+    Limits come from SESSION_TTL_SECONDS, SESSION_MAX_ENTRIES and (memory only)
+    SESSION_MAX_BYTES; the SQLite file from SESSION_DB.
+    """
+    backend = (backend or os.getenv("SESSION_STORE", "memory")).lower()
+    ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    max_entries = int(os.getenv("SESSION_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
+    return MemorySessionStore(
+        ttl_seconds=ttl_seconds,
+        max_entries=max_entries,
+        max_bytes=int(os.getenv("SESSION_MAX_BYTES", DEFAULT_MAX_BYTES))
+    )
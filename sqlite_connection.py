@@ -0,0 +1,22 @@
+"""
+VibeOS - SQLite Connections
+One connection helper for every SQLite store (sessions, jobs, upload
+checkpoints, LLM ledger, user data). Standard library only, so the
+lightweight stores can import it without pulling in pandas.
+"""
+
+import sqlite3
+
+# Seconds a connection waits on another writer's lock before raising "database is locked"
+SQLITE_BUSY_TIMEOUT_SECONDS = 10
+
+
+def connect_sqlite(db_path: str, timeout: float = SQLITE_BUSY_TIMEOUT_SECONDS) -> sqlite3.Connection:
+    """
+    Connection used by every SQLite store. WAL (persistent per file) lets
+    worker processes read while one writes; the busy timeout makes writers
+    wait for each other instead of failing.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
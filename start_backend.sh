@@ -2,4 +2,10 @@
 # Backend startup script for VibeOS
 
 echo "🚀 Starting VibeOS Backend Server..."
-uvicorn backend_server:app --host localhost --port 8000 --reload
+# Development: single process with auto-reload
+# Production:  WEB_CONCURRENCY=4 ./start_backend.sh --prod
+if [ "$1" = "--prod" ]; then
+    python run_backend.py --workers "${WEB_CONCURRENCY:-0}"
+else
+    python run_backend.py --host localhost --reload
+fi
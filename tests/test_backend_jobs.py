@@ -0,0 +1,135 @@
+"""
+VibeOS - clip job flow tests
+Upload -> poll -> complete/failed/cancelled through the backend API with the
+clipping itself stubbed, plus stale-job failure and purge cleanup.
+"""
+
+import importlib
+import sqlite3
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("multipart")
+
+from fastapi.testclient import TestClient
+
+from ffmpeg_runner import FFmpegCancelled
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """backend_server imported fresh inside a scratch directory (uploads/, shorts/, databases)"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JOB_DB", str(tmp_path / "jobs.db"))
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    sys.modules.pop("backend_server", None)
+    module = importlib.import_module("backend_server")
+    yield module
+    sys.modules.pop("backend_server", None)
+
+
+def upload(client: TestClient) -> str:
+    response = client.post(
+        "/api/upload/process",
+        files={"video": ("clip.mp4", b"not really a video", "video/mp4")},
+        data={"script": "hello"}
+    )
+    assert response.status_code == 202
+    return response.json()["jobId"]
+
+
+def age_job(backend, job_id: str, seconds: float):
+    conn = sqlite3.connect(backend.jobs.db_path)
+    conn.execute("UPDATE jobs SET updated_at = updated_at - ? WHERE job_id = ?", (seconds, job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_job_completes(backend, monkeypatch):
+    short = {"id": "short_1", "videoUrl": "/shorts/x/short_1.mp4"}
+    monkeypatch.setattr(backend, "_clip_video", lambda job_id, video_path: [short])
+
+    with TestClient(backend.app) as client:
+        job_id = upload(client)
+        job = client.get(f"/api/upload/jobs/{job_id}").json()
+
+    assert job["status"] == "complete"
+    assert job["shorts"] == [short]
+    assert job["updatedAt"]
+
+
+def test_job_fails(backend, monkeypatch):
+    def broken(job_id, video_path):
+        raise RuntimeError("decoder exploded")
+
+    monkeypatch.setattr(backend, "_clip_video", broken)
+    with TestClient(backend.app) as client:
+        job = client.get(f"/api/upload/jobs/{upload(client)}").json()
+
+    assert job["status"] == "failed"
+    assert job["error"] == "decoder exploded"
+
+
+def test_job_cancelled_while_clipping(backend, monkeypatch):
+    def cancelled(job_id, video_path):
+        raise FFmpegCancelled(f"Job {job_id} was cancelled")
+
+    monkeypatch.setattr(backend, "_clip_video", cancelled)
+    with TestClient(backend.app) as client:
+        job_id = upload(client)
+        job = client.get(f"/api/upload/jobs/{job_id}").json()
+        assert job["status"] == "cancelled"
+        assert client.post(f"/api/upload/jobs/{job_id}/cancel").status_code == 409
+
+
+def test_cancel_request_recorded(backend):
+    backend.jobs.create("job-1", {"jobId": "job-1", "status": "clipping", "shorts": []})
+    with TestClient(backend.app) as client:
+        assert client.post("/api/upload/jobs/job-1/cancel").json()["status"] == "cancelling"
+    assert backend.jobs.get("job-1")["cancel_requested"] is True
+
+
+def test_unknown_job_404(backend):
+    with TestClient(backend.app) as client:
+        assert client.get("/api/upload/jobs/missing").status_code == 404
+
+
+def test_stale_job_failed(backend):
+    backend.jobs.create("job-1", {"jobId": "job-1", "status": "clipping", "shorts": []})
+    age_job(backend, "job-1", backend.JOB_STALE_SECONDS + 1)
+
+    with TestClient(backend.app) as client:
+        job = client.get("/api/upload/jobs/job-1").json()
+    assert job["status"] == "failed"
+    assert "worker restarted" in job["error"]
+
+
+def test_heartbeat_keeps_job_alive(backend):
+    backend.jobs.create("job-1", {"jobId": "job-1", "status": "clipping", "shorts": []})
+    age_job(backend, "job-1", backend.JOB_STALE_SECONDS + 1)
+    backend.jobs.touch("job-1")
+
+    with TestClient(backend.app) as client:
+        assert client.get("/api/upload/jobs/job-1").json()["status"] == "clipping"
+
+
+def test_purge_removes_job_files(backend):
+    video = backend.UPLOAD_DIR / "video_old.mp4"
+    video.write_bytes(b"old")
+    shorts = backend.SHORTS_DIR / "job-old"
+    shorts.mkdir()
+    (shorts / "short_1.mp4").write_bytes(b"old")
+    backend.jobs.create("job-old", {"jobId": "job-old", "status": "complete", "video": video.name})
+    age_job(backend, "job-old", backend.jobs.retention_seconds + 1)
+
+    backend.jobs.create("job-new", {"jobId": "job-new", "status": "queued"})
+
+    assert backend.jobs.get("job-old") is None
+    assert backend.jobs.get("job-new") is not None
+    assert not video.exists()
+    assert not shorts.exists()
+    assert time.time() - backend.jobs.get("job-new")["updated_at"] < 60
@@ -0,0 +1,42 @@
+"""
+VibeOS - clip profile filter tests
+Both crop branches of profile_video_filter must end at the profile's resolution.
+"""
+
+import shutil
+import subprocess
+
+import pytest
+
+from clip_cache import get_profile, profile_video_filter
+
+SOURCE = "testsrc=size=1920x1080:rate=30"
+REFRAME_CROP = {"crop_w": 606, "crop_h": 1080, "x": "100", "y": 0}
+
+
+def output_size(video_filter: str):
+    """(width, height) of one frame of a 1920x1080 test source after the filter"""
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', SOURCE, '-vf', video_filter,
+         '-frames:v', '1', '-f', 'image2pipe', '-vcodec', 'ppm', 'pipe:1'],
+        capture_output=True, timeout=30, check=True
+    )
+    width, height = result.stdout.split(b"\n")[1].split()
+    return int(width), int(height)
+
+
+@pytest.mark.parametrize("crop", [None, REFRAME_CROP], ids=["centre", "reframe"])
+def test_filter_scales_to_profile(crop):
+    video_filter = profile_video_filter(get_profile("shorts"), crop)
+    assert "scale=1080:1920" in video_filter
+    assert "setsar=1" in video_filter
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+@pytest.mark.parametrize("crop", [None, REFRAME_CROP], ids=["centre", "reframe"])
+def test_filter_output_dimensions(crop):
+    assert output_size(profile_video_filter(get_profile("shorts"), crop)) == (1080, 1920)
+
+
+def test_source_profile_passes_frames_through():
+    assert profile_video_filter(get_profile("source")) is None
@@ -0,0 +1,89 @@
+"""
+VibeOS - clip planner tests
+Window selection edge cases, non-overlap, loudness preference and a brute
+force check of the interval-scheduling DP.
+"""
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from clip_planner import plan_clips, select_windows
+
+
+def assert_valid(windows, total, min_duration, max_duration):
+    for window in windows:
+        assert 0 <= window["start"] < window["end"] <= total + 1e-6
+        assert min_duration - 1e-6 <= window["duration"] <= max_duration + 1e-6
+    for earlier, later in zip(windows, windows[1:]):
+        assert earlier["end"] <= later["start"] + 1e-6
+
+
+def test_short_video_becomes_one_full_clip():
+    windows = plan_clips(10, min_duration=15, max_duration=60, num_clips=3)
+    assert len(windows) == 1
+    assert windows[0]["start"] == 0
+    assert windows[0]["end"] == pytest.approx(10)
+
+
+def test_fewer_windows_than_requested_fit():
+    windows = plan_clips(40, min_duration=15, max_duration=60, num_clips=3)
+    assert len(windows) == 2
+    assert_valid(windows, 40, 15, 60)
+
+
+def test_empty_video():
+    assert plan_clips(0, min_duration=15, max_duration=60, num_clips=3) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_windows_never_overlap(seed):
+    rng = np.random.default_rng(seed)
+    total = float(rng.integers(120, 1800))
+    energy = rng.random(int(total)).astype(np.float32) + 0.01
+
+    windows = plan_clips(total, min_duration=15, max_duration=60, num_clips=5, energy=energy)
+
+    assert len(windows) == 5
+    assert_valid(windows, total, 15, 60)
+
+
+def test_loud_segment_preferred():
+    energy = np.full(300, 0.1, dtype=np.float32)
+    energy[200:260] = 5.0
+
+    windows = plan_clips(300, min_duration=15, max_duration=60, num_clips=1, energy=energy)
+
+    assert len(windows) == 1
+    assert windows[0]["start"] == pytest.approx(200, abs=4)
+    assert windows[0]["duration"] == pytest.approx(60)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_selection_matches_brute_force(seed):
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(9):
+        start = rng.uniform(0, 100)
+        duration = rng.uniform(5, 30)
+        candidates.append({"start": start, "end": start + duration, "duration": duration,
+                           "score": rng.uniform(0, 1)})
+    num_clips = rng.randint(1, 4)
+
+    def disjoint(subset):
+        ordered = sorted(subset, key=lambda c: c["start"])
+        return all(a["end"] <= b["start"] for a, b in zip(ordered, ordered[1:]))
+
+    best = max(
+        sum(c["score"] for c in subset)
+        for k in range(num_clips + 1)
+        for subset in itertools.combinations(candidates, k)
+        if disjoint(subset)
+    )
+    chosen = select_windows(candidates, num_clips)
+
+    assert len(chosen) <= num_clips
+    assert disjoint(chosen)
+    assert sum(c["score"] for c in chosen) == pytest.approx(best)
@@ -0,0 +1,138 @@
+"""
+VibeOS - ffmpeg supervision tests
+A fake `ffmpeg` on PATH plays back progress, media output, stderr and hangs
+so run_ffmpeg's parsing, timeout, cancellation and pipes can be checked
+without encoding anything.
+"""
+
+import os
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from ffmpeg_runner import (
+    run_ffmpeg, ffmpeg_job, cancel_ffmpeg_job, FFmpegError, FFmpegCancelled, FFmpegTimeout
+)
+
+FAKE_FFMPEG = textwrap.dedent("""\
+    #!{python}
+    import os, sys, time
+
+    args = sys.argv[1:]
+    mode = args[args.index("-f") + 1] if "-f" in args else "progress"
+    target = args[args.index("-progress") + 1]
+    fd = int(target.split(":")[1])
+    progress = sys.stdout if fd == 1 else os.fdopen(fd, "w")
+
+    def report(frame, seconds, state="continue"):
+        progress.write(f"frame={{frame}}\\nout_time_us={{int(seconds * 1e6)}}\\nspeed=2.0x\\nprogress={{state}}\\n")
+        progress.flush()
+
+    if mode == "fail":
+        for i in range(60):
+            sys.stderr.write(f"noise line {{i}}\\n")
+        sys.stderr.write("Invalid data found when processing input\\n")
+        sys.exit(1)
+    if mode == "hang":
+        report(1, 0.1)
+        time.sleep(30)
+    if mode == "output":
+        for i in range(4):
+            sys.stdout.buffer.write(bytes([i]) * 100000)
+            sys.stdout.buffer.flush()
+            report((i + 1) * 10, i + 1)
+    else:
+        for i in range(1, 4):
+            report(i * 30, i * 2.5)
+            time.sleep(0.05)
+    report(120, 10, "end")
+""")
+
+
+@pytest.fixture(autouse=True)
+def fake_ffmpeg(tmp_path, monkeypatch):
+    script = tmp_path / "ffmpeg"
+    script.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=os.pathsep)
+    return script
+
+
+def test_progress_parsing():
+    updates = []
+    final = run_ffmpeg(["-f", "progress"], duration=10, on_progress=updates.append)
+
+    assert [u["percent"] for u in updates] == [25.0, 50.0, 75.0, 100.0]
+    assert final["out_time"] == 10.0
+    assert final["speed"] == "2.0"
+    assert final["stage"] == "encode"
+
+
+def test_progress_follows_frames_when_fps_known():
+    updates = []
+    run_ffmpeg(["-f", "progress"], duration=10, fps=12, on_progress=updates.append)
+    # frame / fps: 30/12 = 2.5s of 10s
+    assert updates[0]["percent"] == 25.0
+
+
+def test_timeout():
+    with pytest.raises(FFmpegTimeout):
+        run_ffmpeg(["-f", "hang"], duration=10, timeout=0.5)
+
+
+def test_cancel_running_job():
+    errors = []
+    started = threading.Event()
+
+    def run():
+        with ffmpeg_job("job-1", on_progress=lambda progress: started.set()):
+            try:
+                run_ffmpeg(["-f", "hang"], duration=10, timeout=20)
+            except FFmpegError as e:
+                errors.append(e)
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    assert started.wait(10)
+    assert cancel_ffmpeg_job("job-1")
+    worker.join(10)
+
+    assert not worker.is_alive()
+    assert len(errors) == 1 and isinstance(errors[0], FFmpegCancelled)
+
+
+def test_cancelled_job_refuses_new_runs():
+    with ffmpeg_job("job-2"):
+        assert cancel_ffmpeg_job("job-2")
+        with pytest.raises(FFmpegCancelled):
+            run_ffmpeg(["-f", "progress"], duration=10)
+
+
+def test_reused_job_id_starts_fresh():
+    first, second = [], []
+    with ffmpeg_job("job-3", on_progress=first.append):
+        cancel_ffmpeg_job("job-3")
+        # Same id while the cancelled job is still registered
+        with ffmpeg_job("job-3", on_progress=second.append):
+            run_ffmpeg(["-f", "progress"], duration=10)
+
+    assert not first
+    assert second[-1]["percent"] == 100.0
+    assert not cancel_ffmpeg_job("job-3")
+
+
+def test_output_pipe_separate_from_progress():
+    chunks, updates = [], []
+    run_ffmpeg(["-f", "output"], duration=4, on_output=chunks.append,
+               on_progress=updates.append, stage="analysis")
+
+    assert b"".join(chunks) == b"".join(bytes([i]) * 100000 for i in range(4))
+    assert updates[-1]["percent"] == 100.0
+    assert all(u["stage"] == "analysis" for u in updates)
+
+
+def test_error_reports_stderr_tail():
+    with pytest.raises(FFmpegError, match="code 1: Invalid data found when processing input"):
+        run_ffmpeg(["-f", "fail"], duration=10)
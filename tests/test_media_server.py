@@ -0,0 +1,172 @@
+"""
+VibeOS - media server tests
+MediaFiles called directly as an ASGI app: ranges, validators, HEAD,
+path traversal and a file shrinking mid-stream.
+"""
+
+import os
+
+import anyio
+import pytest
+
+from media_server import MediaFiles, parse_range, file_etag
+
+BODY = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def media(tmp_path):
+    root = tmp_path / "shorts"
+    root.mkdir()
+    (root / "clip.mp4").write_bytes(BODY)
+    (tmp_path / "secret.txt").write_text("outside the mount")
+    return MediaFiles(str(root), chunk_size=4096)
+
+
+def request(app, path="/clip.mp4", method="GET", headers=None, extensions=None, on_body=None):
+    """Run one request; returns (status, headers, body)"""
+    messages = []
+    scope = {
+        "type": "http", "method": method, "path": path, "root_path": "",
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in (headers or {}).items()],
+        "extensions": extensions or {},
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+        if on_body and message["type"] == "http.response.body":
+            on_body(message)
+
+    anyio.run(app, scope, receive, send)
+    start = messages[0]
+    response_headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in start["headers"]}
+    body = b"".join(m.get("body", b"") for m in messages[1:] if m["type"] == "http.response.body")
+    return start["status"], response_headers, body
+
+
+def test_full_file(media):
+    status, headers, body = request(media)
+    assert status == 200
+    assert body == BODY
+    assert headers["content-length"] == str(len(BODY))
+    assert headers["accept-ranges"] == "bytes"
+    assert headers["content-type"] == "video/mp4"
+
+
+def test_byte_range(media):
+    status, headers, body = request(media, headers={"Range": "bytes=100-5099"})
+    assert status == 206
+    assert body == BODY[100:5100]
+    assert headers["content-range"] == f"bytes 100-5099/{len(BODY)}"
+    assert headers["content-length"] == "5000"
+
+
+def test_open_ended_range(media):
+    status, headers, body = request(media, headers={"Range": "bytes=10000-"})
+    assert status == 206
+    assert body == BODY[10000:]
+
+
+def test_suffix_range(media):
+    status, headers, body = request(media, headers={"Range": "bytes=-500"})
+    assert status == 206
+    assert body == BODY[-500:]
+    assert headers["content-range"] == f"bytes {len(BODY) - 500}-{len(BODY) - 1}/{len(BODY)}"
+
+
+def test_unsatisfiable_range(media):
+    status, headers, body = request(media, headers={"Range": f"bytes={len(BODY)}-"})
+    assert status == 416
+    assert headers["content-range"] == f"bytes */{len(BODY)}"
+
+
+def test_inverted_range_ignored(media):
+    status, headers, body = request(media, headers={"Range": "bytes=5-3"})
+    assert status == 200
+    assert body == BODY
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-0", (0, 0)),
+    ("bytes=5-3", None),
+    ("bytes=0-1,4-5", None),
+    ("items=0-1", None),
+    ("bytes=abc", None),
+    ("bytes=-20000", (0, len(BODY) - 1)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, len(BODY)) == expected
+
+
+def test_parse_range_past_end():
+    with pytest.raises(ValueError):
+        parse_range("bytes=20000-30000", len(BODY))
+
+
+def test_not_modified(media):
+    headers = request(media)[1]
+    status, headers_304, body = request(media, headers={"If-None-Match": headers["etag"]})
+    assert status == 304
+    assert body == b""
+    assert headers_304["etag"] == headers["etag"]
+
+
+def test_if_range_mismatch_serves_full_file(media):
+    status, headers, body = request(media, headers={"Range": "bytes=0-99", "If-Range": '"stale-etag"'})
+    assert status == 200
+    assert body == BODY
+
+
+def test_if_range_match_serves_range(media):
+    etag = file_etag(os.stat(os.path.join(media.directory, "clip.mp4")))
+    status, headers, body = request(media, headers={"Range": "bytes=0-99", "If-Range": etag})
+    assert status == 206
+    assert body == BODY[:100]
+
+
+def test_head(media):
+    status, headers, body = request(media, method="HEAD")
+    assert status == 200
+    assert headers["content-length"] == str(len(BODY))
+    assert body == b""
+
+
+@pytest.mark.parametrize("path", ["/../secret.txt", "/..%2Fsecret.txt", "/missing.mp4", "/"])
+def test_not_found(media, path):
+    assert request(media, path=path)[0] == 404
+
+
+def test_method_not_allowed(media):
+    status, headers, body = request(media, method="POST")
+    assert status == 405
+    assert headers["allow"] == "GET, HEAD"
+
+
+def test_zero_copy_send(media):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {"type": "http", "method": "GET", "path": "/clip.mp4", "root_path": "",
+             "headers": [(b"range", b"bytes=10-19")], "extensions": {"http.response.zerocopysend": {}}}
+    anyio.run(media, scope, receive, send)
+
+    assert messages[0]["status"] == 206
+    assert (messages[1]["offset"], messages[1]["count"]) == (10, 10)
+
+
+def test_file_shrinking_mid_stream_aborts(media):
+    path = os.path.join(media.directory, "clip.mp4")
+
+    def truncate(message):
+        os.truncate(path, 100)
+
+    with pytest.raises(OSError, match="shrank"):
+        request(media, on_body=truncate)
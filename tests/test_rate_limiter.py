@@ -0,0 +1,87 @@
+"""
+VibeOS - provider limiter retry policy tests
+Idempotent calls retry transport errors and 5xx; retry="throttle" calls
+(tweets, emails) are only repeated when the provider rejected them outright.
+"""
+
+import pytest
+
+from rate_limiter import ProviderLimiter
+
+
+class ReadTimeout(Exception):
+    """Stands in for requests.exceptions.ReadTimeout (matched by class name)"""
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+def make_limiter() -> ProviderLimiter:
+    return ProviderLimiter("test", rate=0, burst=1, max_concurrency=4, max_retries=2, base_delay=0, max_delay=0)
+
+
+def failing(*errors, result="ok"):
+    """Callable raising each error in turn, then returning result; .calls counts attempts"""
+    pending = list(errors)
+
+    def fn(*args, **kwargs):
+        fn.calls += 1
+        if pending:
+            raise pending.pop(0)
+        return result
+
+    fn.calls = 0
+    return fn
+
+
+def test_transient_policy_retries_read_timeout():
+    fn = failing(ReadTimeout("read timed out"))
+    assert make_limiter().call(fn) == "ok"
+    assert fn.calls == 2
+
+
+def test_throttle_policy_does_not_retry_read_timeout():
+    post = failing(ReadTimeout("read timed out"))
+    with pytest.raises(ReadTimeout):
+        make_limiter().call(post, retry="throttle")
+    assert post.calls == 1
+
+
+@pytest.mark.parametrize("status", [500, 502, 503])
+def test_throttle_policy_does_not_retry_server_errors(status):
+    post = failing(APIError(status))
+    with pytest.raises(APIError):
+        make_limiter().call(post, retry="throttle")
+    assert post.calls == 1
+
+
+def test_throttle_policy_retries_429():
+    post = failing(APIError(429))
+    assert make_limiter().call(post, retry="throttle") == "ok"
+    assert post.calls == 2
+
+
+def test_throttle_policy_retries_503_with_retry_after():
+    post = failing(APIError(503, {"Retry-After": "0"}))
+    assert make_limiter().call(post, retry="throttle") == "ok"
+    assert post.calls == 2
+
+
+def test_throttle_policy_returned_response():
+    responses = [FakeResponse(500), FakeResponse(200)]
+    post = lambda: responses.pop(0)
+    assert make_limiter().call(post, retry="throttle").status_code == 500
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        make_limiter().call(lambda: None, retry="always")
@@ -0,0 +1,138 @@
+"""
+VibeOS - Twitter chunked media upload tests
+Runs the INIT / APPEND / FINALIZE / STATUS protocol against an in-process
+fake of media/upload.json (a stand-in for requests.Session).
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from twitter_media import TwitterMediaUploader, TwitterMediaError
+
+CHUNK_SIZE = 1024
+SEGMENTS = 6
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: dict = None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.text = self.content.decode()
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeUploadEndpoint:
+    """
+    media/upload.json: records every command, reassembles APPEND segments by
+    index and answers STATUS with `pending` processing states before `final`.
+    """
+
+    def __init__(self, pending: int = 2, final: dict = None, check_after_secs: float = 0.2):
+        self.pending = pending
+        self.final = final or {"state": "succeeded"}
+        self.check_after_secs = check_after_secs
+        self.commands = []
+        self.segments = {}
+        self.status_times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.finalized_with = None
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, data=None, files=None, auth=None, timeout=None):
+        fields = params if method == "GET" else data
+        command = fields["command"]
+        with self._lock:
+            self.commands.append(command)
+
+        if command == "INIT":
+            return FakeResponse(202, {"media_id_string": "42"})
+        if command == "APPEND":
+            with self._lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            # Later segments finish first, so ordering relies on segment_index
+            time.sleep(0.05 * (SEGMENTS - fields["segment_index"]) / SEGMENTS)
+            with self._lock:
+                self.segments[fields["segment_index"]] = files["media"][1]
+                self.in_flight -= 1
+            return FakeResponse(204)
+        if command == "FINALIZE":
+            self.finalized_with = sorted(self.segments)
+            return FakeResponse(201, {"media_id_string": "42", "processing_info": self._processing()})
+        if command == "STATUS":
+            self.status_times.append(time.monotonic())
+            return FakeResponse(200, {"media_id_string": "42", "processing_info": self._processing()})
+        return FakeResponse(400, {"error": f"unknown command {command}"})
+
+    def _processing(self):
+        if self.pending > 0:
+            self.pending -= 1
+            return {"state": "in_progress", "check_after_secs": self.check_after_secs}
+        return self.final
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(bytes(range(256)) * (CHUNK_SIZE * SEGMENTS // 256))
+    return path
+
+
+def make_uploader(endpoint: FakeUploadEndpoint, monkeypatch) -> TwitterMediaUploader:
+    uploader = TwitterMediaUploader(upload_url="http://fake/media/upload.json", chunk_size=CHUNK_SIZE,
+                                    append_window=3)
+    monkeypatch.setattr(uploader, "_session", lambda: endpoint)
+    return uploader
+
+
+def test_upload_protocol(media_file, monkeypatch):
+    endpoint = FakeUploadEndpoint(pending=1, check_after_secs=0.2)
+    started = time.monotonic()
+
+    media_id = make_uploader(endpoint, monkeypatch).upload(str(media_file), timeout=30)
+
+    assert media_id == "42"
+    assert endpoint.commands[0] == "INIT"
+    assert endpoint.commands[1:1 + SEGMENTS] == ["APPEND"] * SEGMENTS
+    assert endpoint.commands[1 + SEGMENTS:] == ["FINALIZE", "STATUS"]
+    # Every segment landed before FINALIZE and reassembles to the file
+    assert endpoint.finalized_with == list(range(SEGMENTS))
+    assert b"".join(endpoint.segments[i] for i in range(SEGMENTS)) == media_file.read_bytes()
+    # Pipelined, but never past the window
+    assert 1 < endpoint.max_in_flight <= 3
+    # STATUS waited check_after_secs after FINALIZE's in_progress
+    assert endpoint.status_times[0] - started >= 0.2
+
+
+def test_status_polled_until_done(media_file, monkeypatch):
+    endpoint = FakeUploadEndpoint(pending=3, check_after_secs=0.2)
+
+    assert make_uploader(endpoint, monkeypatch).upload(str(media_file), timeout=30) == "42"
+    # FINALIZE and two STATUS calls report in_progress, the third STATUS succeeds
+    assert endpoint.commands.count("STATUS") == 3
+    assert all(later - earlier >= 0.2 for earlier, later in zip(endpoint.status_times, endpoint.status_times[1:]))
+
+
+def test_processing_failed(media_file, monkeypatch):
+    endpoint = FakeUploadEndpoint(pending=1, final={
+        "state": "failed", "error": {"name": "InvalidMedia", "message": "Unsupported codec"}
+    })
+
+    with pytest.raises(TwitterMediaError, match="Unsupported codec"):
+        make_uploader(endpoint, monkeypatch).upload(str(media_file), timeout=30)
+    assert endpoint.commands[-1] == "STATUS"
+
+
+def test_command_error(media_file, monkeypatch):
+    endpoint = FakeUploadEndpoint()
+    endpoint.request = lambda method, url, **kwargs: FakeResponse(400, {"error": "bad media_type"})
+
+    with pytest.raises(TwitterMediaError, match="INIT failed: HTTP 400"):
+        make_uploader(endpoint, monkeypatch).upload(str(media_file), timeout=30)
@@ -0,0 +1,69 @@
+"""
+VibeOS - YouTube resumable session query tests
+_youtube_upload_offset against canned responses: 308 with/without Range,
+200/201 completion and 404/410 expiry (which restarts the upload).
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+import httplib2
+from googleapiclient.errors import HttpError
+
+SESSION_URI = "https://www.googleapis.com/upload/youtube/v3/videos?uploadType=resumable&upload_id=abc"
+TOTAL = 10 * 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def youtube_upload_offset(tmp_path_factory):
+    """agent_pulse._youtube_upload_offset (the module needs a key and writes its database in the cwd)"""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.chdir(tmp_path_factory.mktemp("pulse"))
+    import agent_pulse
+    yield agent_pulse._youtube_upload_offset
+    monkeypatch.undo()
+
+
+class FakeHttp:
+    """Answers every request with one canned (response, content) and records it"""
+
+    def __init__(self, status: int, headers=None, content: bytes = b""):
+        self.response = httplib2.Response({"status": status, **(headers or {})})
+        self.content = content
+        self.requests = []
+
+    def request(self, uri, method="GET", headers=None, **kwargs):
+        self.requests.append((uri, method, headers))
+        return self.response, self.content
+
+
+def test_incomplete_session_reports_next_byte(youtube_upload_offset):
+    http = FakeHttp(308, {"range": "bytes=0-4194303"})
+
+    assert youtube_upload_offset(http, SESSION_URI, TOTAL) == (4194304, None)
+    uri, method, headers = http.requests[0]
+    assert (uri, method) == (SESSION_URI, "PUT")
+    assert headers == {"Content-Length": "0", "Content-Range": f"bytes */{TOTAL}"}
+
+
+def test_nothing_received_yet(youtube_upload_offset):
+    assert youtube_upload_offset(FakeHttp(308), SESSION_URI, TOTAL) == (0, None)
+
+
+@pytest.mark.parametrize("status", [200, 201])
+def test_finished_upload_returns_video(youtube_upload_offset, status):
+    video = {"id": "dQw4w9WgXcQ", "kind": "youtube#video"}
+    http = FakeHttp(status, content=json.dumps(video).encode())
+
+    assert youtube_upload_offset(http, SESSION_URI, TOTAL) == (TOTAL, video)
+
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_expired_session_raises_for_restart(youtube_upload_offset, status):
+    with pytest.raises(HttpError) as raised:
+        youtube_upload_offset(FakeHttp(status, content=b"gone"), SESSION_URI, TOTAL)
+    # upload_to_youtube restarts the upload on exactly these statuses
+    assert raised.value.resp.status == status
@@ -8,6 +8,9 @@ import json
 import requests
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import tweepy
 from google.oauth2.credentials import Credentials
@@ -17,10 +20,33 @@ from googleapiclient.discovery import build
 import pickle
 
 from utils import get_api_key, retry_with_exponential_backoff, validate_email
+from rate_limiter import limited_call
+from trend_similarity import dedupe_similar_trends
+from trend_sources import registry, FunctionProvider
 
 
 # ==================== TREND HUNTING TOOLS ====================
 
+# Sources TrendHunter merges (see trend_sources.registry; "local" needs TREND_FEEDS)
+TREND_HUNTER_SOURCES = ("google", "twitter", "local")
+
+_http_local = threading.local()
+
+
+def _http_session() -> requests.Session:
+    """Per-thread keep-alive session for Serper calls"""
+    session = getattr(_http_local, "session", None)
+    if session is None:
+        session = _http_local.session = requests.Session()
+    return session
+
+
+@lru_cache(maxsize=4)
+def _twitter_search_client(bearer_token: str) -> "tweepy.Client":
+    """App-only Twitter client, built once per token and reused across requests"""
+    return tweepy.Client(bearer_token=bearer_token)
+
+
 class TrendHunter:
     """Discovers viral trends using Google Serper and X API"""
     
@@ -51,7 +77,10 @@ class TrendHunter:
         }
         
         try:
-            response = requests.post(self.serper_url, json=payload, headers=headers, timeout=10)
+            response = limited_call(
+                "serper", _http_session().post, self.serper_url, json=payload, headers=headers,
+                timeout=registry.get("google").deadline
+            )
             response.raise_for_status()
             data = response.json()
             
@@ -95,7 +124,8 @@ class TrendHunter:
         
         return min(score, 10.0)
     
-    def get_twitter_trends(self, niche: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def get_twitter_trends(niche: str) -> List[Dict[str, Any]]:
         """
         Fetch trending topics from X/Twitter
         Note: Requires Twitter API credentials
@@ -105,12 +135,14 @@ class TrendHunter:
             if not twitter_token:
                 return []
             
-            # Initialize Twitter client
-            client = tweepy.Client(bearer_token=twitter_token)
+            # Reuse the long-lived Twitter client
+            client = _twitter_search_client(twitter_token)
             
             # Search recent tweets in niche
             query = f"{niche} -is:retweet lang:en"
-            tweets = client.search_recent_tweets(
+            tweets = limited_call(
+                "twitter",
+                client.search_recent_tweets,
                 query=query,
                 max_results=20,
                 tweet_fields=['public_metrics', 'created_at']
@@ -144,20 +176,29 @@ class TrendHunter:
     def get_best_trends(self, niche: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Combine trends from multiple sources and return top trends
-        """
-        all_trends = []
         
-        # Get Google trends
-        google_trends = self.search_trending_topics(niche, num_results=10)
-        all_trends.extend(google_trends)
-        
-        # Get Twitter trends
-        twitter_trends = self.get_twitter_trends(niche)
-        all_trends.extend(twitter_trends)
+        Sources are queried concurrently through the trend source registry;
+        each has its own deadline and whatever has arrived by then is merged.
+        """
+        all_trends = registry.gather(niche, limit=10, names=TREND_HUNTER_SOURCES)
         
-        # Sort by relevance and return top results
+        # Sort by relevance, then keep one trend per near-duplicate cluster
         all_trends.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-        return all_trends[:limit]
+        return dedupe_similar_trends(all_trends, limit=limit)
+
+
+registry.register(FunctionProvider(
+    "google",
+    lambda query, limit, **_: TrendHunter().search_trending_topics(query, num_results=limit),
+    cost=1.0, latency=1.5, deadline=8.0,
+    available=lambda: bool(os.getenv('SERPER_API_KEY'))
+))
+registry.register(FunctionProvider(
+    "twitter",
+    lambda query, limit, **_: TrendHunter.get_twitter_trends(query),
+    cost=1.0, latency=2.0, deadline=5.0, cache_ttl=300.0,
+    available=lambda: bool(os.getenv('TWITTER_BEARER_TOKEN'))
+))
 
 
 # ==================== SOCIAL MEDIA POSTING TOOLS ====================
@@ -202,7 +243,7 @@ class SocialMediaPoster:
             if len(content) > 280:
                 content = content[:277] + "..."
             
-            response = self.twitter_client.create_tweet(text=content)
+            response = limited_call("twitter", self.twitter_client.create_tweet, text=content, retry="throttle")
             
             return {
                 "status": "success",
@@ -351,7 +392,7 @@ class SponsorFinder:
         }
         
         try:
-            response = requests.post("https://google.serper.dev/search", json=payload, headers=headers)
+            response = limited_call("serper", requests.post, "https://google.serper.dev/search", json=payload, headers=headers, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -365,21 +406,26 @@ class SponsorFinder:
                     # Extract category from snippet
                     category = self._extract_category(result.get('snippet', ''), niche)
                     
-                    # Find contact email for this brand
-                    email = self._find_brand_email(brand_name, website)
-                    
                     sponsors.append({
                         "name": brand_name,  # Changed from brand_name to name
                         "website": website,
                         "description": result.get('snippet', ''),
                         "category": category,
-                        "email": email,
                         "relevance": self._calculate_brand_relevance(result, niche)
                     })
             
-            # Sort by relevance and return top N
+            # Sort by relevance and keep top N before the (slow) email lookups
             sponsors.sort(key=lambda x: x['relevance'], reverse=True)
-            return sponsors[:num_sponsors]
+            sponsors = sponsors[:num_sponsors]
+            
+            # Find contact emails for the kept brands concurrently
+            if sponsors:
+                with ThreadPoolExecutor(max_workers=len(sponsors)) as pool:
+                    emails = pool.map(lambda s: self._find_brand_email(s['name'], s['website']), sponsors)
+                    for sponsor, email in zip(sponsors, emails):
+                        sponsor['email'] = email
+            
+            return sponsors
         
         except Exception as e:
             print(f"Error finding sponsors: {e}")
@@ -453,7 +499,7 @@ class SponsorFinder:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post("https://google.serper.dev/search", json=payload, headers=headers)
+            response = limited_call("serper", requests.post, "https://google.serper.dev/search", json=payload, headers=headers, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -549,10 +595,14 @@ class EmailSender:
             
             raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
             
-            send_message = self.gmail_service.users().messages().send(
-                userId='me',
-                body={'raw': raw_message}
-            ).execute()
+            send_message = limited_call(
+                "gmail",
+                self.gmail_service.users().messages().send(
+                    userId='me',
+                    body={'raw': raw_message}
+                ).execute,
+                retry="throttle"
+            )
             
             return {
                 "status": "success",
@@ -592,7 +642,7 @@ class AnalyticsTracker:
         
         try:
             # Get user info
-            user = self.twitter_client.get_user(id=user_id, user_fields=['public_metrics'])
+            user = limited_call("twitter", self.twitter_client.get_user, id=user_id, user_fields=['public_metrics'])
             
             if user.data:
                 metrics = user.data.public_metrics
@@ -614,7 +664,9 @@ class AnalyticsTracker:
         """
         if platform == "twitter" and self.twitter_client:
             try:
-                tweet = self.twitter_client.get_tweet(
+                tweet = limited_call(
+                    "twitter",
+                    self.twitter_client.get_tweet,
                     id=post_id,
                     tweet_fields=['public_metrics']
                 )
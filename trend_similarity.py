@@ -0,0 +1,149 @@
+"""
+VibeOS - Trend Similarity
+Local, CPU-only near-duplicate detection for trends. Each trend's title and
+summary are turned into a hashed word + character n-gram vector (no model
+download, no API call); cosine similarity between vectors groups trends
+into clusters and one representative per cluster is kept.
+"""
+
+import re
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+# Hashed feature space size (power of two); collisions are rare at trend volumes
+VECTOR_DIM = 2048
+# Cosine similarity at or above which two trends are treated as the same story
+DEFAULT_SIMILARITY = 0.6
+# Trend vectors kept in the per-URL cache
+VECTOR_CACHE_SIZE = 4096
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def trend_text(trend: Dict[str, Any]) -> str:
+    """Text used for similarity: title plus summary/snippet/tweet text"""
+    title = trend.get('title') or ''
+    body = trend.get('summary') or trend.get('snippet') or trend.get('text') or ''
+    return f"{title} {title} {body}".strip()  # title counted twice - headlines carry the story
+
+
+def _feature_hash(feature: str) -> Tuple[int, float]:
+    code = zlib.crc32(feature.encode("utf-8"))
+    return code % VECTOR_DIM, (1.0 if code & 0x80000000 else -1.0)
+
+
+def text_vector(text: str) -> np.ndarray:
+    """L2-normalized hashed vector of word unigrams, word bigrams and char trigrams"""
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    words = _WORD_RE.findall(text.lower())
+
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f" {word} "
+        features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+    for feature in features:
+        index, sign = _feature_hash(feature)
+        vector[index] += sign
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class TrendVectorCache:
+    """Thread-safe LRU of trend vectors keyed by URL (text checksum guards edits)"""
+
+    def __init__(self, max_size: int = VECTOR_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[int, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def vector(self, trend: Dict[str, Any]) -> np.ndarray:
+        text = trend_text(trend)
+        url = (trend.get('url') or trend.get('link') or '').rstrip('/')
+        if not url:
+            return text_vector(text)
+
+        checksum = zlib.crc32(text.encode("utf-8"))
+        with self._lock:
+            cached = self._entries.get(url)
+            if cached and cached[0] == checksum:
+                self._entries.move_to_end(url)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        vector = text_vector(text)
+        with self._lock:
+            self._entries[url] = (checksum, vector)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return vector
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+vector_cache = TrendVectorCache()
+
+
+def similarity_matrix(trends: List[Dict[str, Any]]) -> np.ndarray:
+    """Pairwise cosine similarity of trends (n x n)"""
+    if not trends:
+        return np.zeros((0, 0), dtype=np.float32)
+    vectors = np.stack([vector_cache.vector(trend) for trend in trends])
+    return vectors @ vectors.T
+
+
+def cluster_trends(trends: List[Dict[str, Any]], similarity: float = DEFAULT_SIMILARITY) -> List[List[int]]:
+    """
+    Group trends whose similarity to a cluster's leader is >= similarity.
+
+    Trends are visited in list order, so pass them best-first: each cluster's
+    first index is its highest-ranked member.
+    """
+    matrix = similarity_matrix(trends)
+    clusters: List[List[int]] = []
+    leaders: List[int] = []
+
+    for index in range(len(trends)):
+        if leaders:
+            scores = matrix[index, leaders]
+            best = int(scores.argmax())
+            if scores[best] >= similarity:
+                clusters[best].append(index)
+                continue
+        leaders.append(index)
+        clusters.append([index])
+
+    return clusters
+
+
+def dedupe_similar_trends(
+    trends: List[Dict[str, Any]],
+    similarity: float = DEFAULT_SIMILARITY,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Keep one representative (the first, i.e. best-ranked) trend per cluster.
+
+    Representatives get a `cluster_size` field counting the near-duplicates
+    they stand for - a useful popularity signal in its own right.
+    """
+    representatives = []
+    for members in cluster_trends(trends, similarity):
+        representative = dict(trends[members[0]])
+        representative['cluster_size'] = len(members)
+        representatives.append(representative)
+        if limit and len(representatives) >= limit:
+            break
+    return representatives
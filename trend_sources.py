@@ -0,0 +1,399 @@
+"""
+VibeOS - Trend Source Registry
+Every trend source (Serper, Twitter, Gemini simulation, local feeds) is a
+TrendProvider registered here. Providers declare a relative cost, an
+expected latency and a deadline, so callers can rank them, query them
+concurrently and cache their results the same way.
+
+The local feed provider reads RSS/Atom XML and JSON dumps from disk, so
+trend lookups can be benchmarked and caches pre-warmed without network.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import contextvars
+from abc import ABC, abstractmethod
+from pathlib import Path
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class TrendProvider(ABC):
+    """
+    Base class for trend sources.
+
+    Attributes:
+        name: Registry key
+        cost: Relative cost per call (0 = free/local, 1 = one paid API call, 10 = LLM call)
+        latency: Typical seconds per call, used for ranking
+        deadline: Seconds a concurrent gather waits for this provider
+        cache_ttl: Seconds results stay cached (0 = no caching)
+    """
+
+    name = "base"
+    cost = 1.0
+    latency = 1.0
+    deadline = 5.0
+    cache_ttl = 900.0
+
+    def available(self) -> bool:
+        """Whether the provider is configured (API key present, feeds found, ...)"""
+        return True
+
+    @abstractmethod
+    def fetch(self, query: str, limit: int, **context) -> List[Dict[str, Any]]:
+        """Up to `limit` trend dicts for the query (context: niche, goals, ...)"""
+
+
+class FunctionProvider(TrendProvider):
+    """Adapter turning an existing fetch function into a provider"""
+
+    def __init__(self, name: str, fn: Callable[..., List[Dict[str, Any]]], cost: float, latency: float,
+                 deadline: float = 5.0, cache_ttl: float = 900.0, available: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self._fn = fn
+        self.cost = cost
+        self.latency = latency
+        self.deadline = float(os.getenv(f"TREND_DEADLINE_{name.upper()}", deadline))
+        self.cache_ttl = cache_ttl
+        self._available = available
+
+    def available(self) -> bool:
+        return self._available() if self._available else True
+
+    def fetch(self, query: str, limit: int, **context) -> List[Dict[str, Any]]:
+        return self._fn(query, limit, **context)
+
+
+# ==================== LOCAL FEEDS ====================
+
+def _text(element: Optional[ElementTree.Element]) -> str:
+    return re.sub(r"\s+", " ", "".join(element.itertext())).strip() if element is not None else ""
+
+
+def _first(fields: Dict[str, ElementTree.Element], *tags: str) -> Optional[ElementTree.Element]:
+    # Elements without children are falsy, so `a or b` cannot be used to pick one
+    for tag in tags:
+        if fields.get(tag) is not None:
+            return fields[tag]
+    return None
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_feed(path: Path) -> List[Dict[str, Any]]:
+    """Read trend items from an RSS 2.0 / Atom file or a JSON dump"""
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        items = data.get("items", data.get("trends", [])) if isinstance(data, dict) else data
+        return [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("url") or item.get("link", ""),
+                "summary": item.get("summary") or item.get("snippet") or item.get("description", ""),
+                "published": item.get("published", "")
+            }
+            for item in items if isinstance(item, dict) and item.get("title")
+        ]
+
+    root = ElementTree.parse(path).getroot()
+    items = []
+    for element in root.iter():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag not in ("item", "entry"):
+            continue
+        fields = {child.tag.rsplit("}", 1)[-1]: child for child in element}
+        link = fields.get("link")
+        url = (link.get("href") or _text(link)) if link is not None else ""
+        items.append({
+            "title": _text(fields.get("title")),
+            "url": url,
+            "summary": _text(_first(fields, "description", "summary", "content")),
+            "published": _text(_first(fields, "pubDate", "updated", "published"))
+        })
+    return [item for item in items if item["title"]]
+
+
+class LocalFeedProvider(TrendProvider):
+    """
+    Trends from RSS/Atom/JSON files on disk (no network).
+
+    Paths come from the constructor or TREND_FEEDS (os.pathsep separated files
+    or directories). Files are re-parsed only when their mtime changes.
+    """
+
+    name = "local"
+    cost = 0.0
+    latency = 0.01
+    deadline = 2.0
+    cache_ttl = 60.0
+
+    FEED_SUFFIXES = {".xml", ".rss", ".atom", ".json"}
+
+    def __init__(self, paths: Optional[Iterable[str]] = None):
+        if paths is None:
+            paths = [p for p in os.getenv("TREND_FEEDS", "").split(os.pathsep) if p]
+        self.paths = [Path(p) for p in paths]
+        self._parsed: Dict[Path, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def _files(self) -> List[Path]:
+        files = []
+        for path in self.paths:
+            if path.is_dir():
+                files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in self.FEED_SUFFIXES))
+            elif path.is_file():
+                files.append(path)
+        return files
+
+    def available(self) -> bool:
+        return bool(self._files())
+
+    def items(self) -> List[Dict[str, Any]]:
+        """All feed items, parsing only files that changed since the last call"""
+        items = []
+        for path in self._files():
+            mtime = path.stat().st_mtime
+            with self._lock:
+                cached = self._parsed.get(path)
+            if not cached or cached[0] != mtime:
+                try:
+                    cached = (mtime, [
+                        {
+                            **item,
+                            "words": frozenset(_WORD_RE.findall(f"{item['title']} {item['summary']}".lower())),
+                            "published_at": _parse_date(item.get("published", ""))
+                        }
+                        for item in parse_feed(path)
+                    ])
+                except (OSError, ValueError, ElementTree.ParseError) as e:
+                    print(f"⚠️  Could not read trend feed {path}: {e}")
+                    cached = (mtime, [])
+                with self._lock:
+                    self._parsed[path] = cached
+            items.extend(cached[1])
+        return items
+
+    def fetch(self, query: str, limit: int, **context) -> List[Dict[str, Any]]:
+        query_words = set(_WORD_RE.findall(query.lower()))
+        if not query_words:
+            return []
+
+        now = datetime.now(timezone.utc)
+        scored = []
+        for item in self.items():
+            overlap = len(query_words & item["words"])
+            if not overlap:
+                continue
+            score = 5.0 + 5.0 * overlap / len(query_words)
+            published = item["published_at"]
+            if published and (now - published).days > 7:
+                score -= 2.0  # stale items rank below this week's
+            scored.append((score, item))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [
+            {
+                "title": item["title"],
+                "url": item["url"],
+                "summary": item["summary"],
+                "snippet": item["summary"],
+                "relevance_score": round(min(score, 10.0), 2),
+                "source": "Local feed"
+            }
+            for score, item in scored[:limit]
+        ]
+
+
+# ==================== REGISTRY ====================
+
+class TrendSourceRegistry:
+    """Registered providers plus a shared result cache and worker pool"""
+
+    def __init__(self, max_workers: int = 8, cache_size: int = 2048):
+        self._providers: Dict[str, TrendProvider] = {}
+        self._cache: Dict[Tuple, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trend-source")
+        self.stats = {"cache_hits": 0, "cache_misses": 0, "deadline_misses": 0, "errors": 0}
+
+    def register(self, provider: TrendProvider, replace: bool = True) -> TrendProvider:
+        with self._lock:
+            if replace or provider.name not in self._providers:
+                self._providers[provider.name] = provider
+            return self._providers[provider.name]
+
+    def get(self, name: str) -> Optional[TrendProvider]:
+        return self._providers.get(name)
+
+    def ranked(self, names: Optional[Iterable[str]] = None) -> List[TrendProvider]:
+        """Available providers, cheapest then fastest first"""
+        if names is None:
+            candidates = list(self._providers.values())
+        else:
+            candidates = [self._providers[name] for name in names if name in self._providers]
+        return sorted(
+            (provider for provider in candidates if provider.available()),
+            key=lambda provider: (provider.cost, provider.latency)
+        )
+
+    # --- cache ---
+
+    @staticmethod
+    def _cache_key(provider: TrendProvider, query: str, limit: int, context: Dict[str, Any]) -> Tuple:
+        # Context (niche, goals, ...) can change a provider's answer, so it is part of the key
+        return provider.name, " ".join(query.lower().split()), limit, tuple(sorted(context.items()))
+
+    def _cached(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.stats["cache_hits"] += 1
+                return [dict(trend) for trend in entry[1]]
+            self.stats["cache_misses"] += 1
+        return None
+
+    def _store(self, key: Tuple, provider: TrendProvider, trends: List[Dict[str, Any]]):
+        if provider.cache_ttl <= 0 or not trends:
+            return
+        with self._lock:
+            if len(self._cache) >= self._cache_size:
+                now = time.monotonic()
+                for stale in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+                    del self._cache[stale]
+                while len(self._cache) >= self._cache_size:
+                    del self._cache[next(iter(self._cache))]
+            self._cache[key] = (time.monotonic() + provider.cache_ttl, trends)
+
+    def fetch(self, name: str, query: str, limit: int, use_cache: bool = True, **context) -> List[Dict[str, Any]]:
+        """Fetch from one provider through the cache; results are tagged with the provider name"""
+        provider = self._providers[name]
+        key = self._cache_key(provider, query, limit, context)
+        if use_cache:
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+
+        trends = [
+            {**trend, "provider": provider.name}
+            for trend in provider.fetch(query, limit, **context) or []
+        ]
+        self._store(key, provider, trends)
+        return [dict(trend) for trend in trends]
+
+    # --- multi-provider lookups ---
+
+    def gather(self, query: str, limit: int, names: Optional[Iterable[str]] = None,
+               **context) -> List[Dict[str, Any]]:
+        """
+        Query providers concurrently and merge whatever arrives before each
+        provider's deadline (late or failing providers are skipped)
+        """
+        providers = self.ranked(names)
+        started = time.monotonic()
+        futures = {
+            provider.name: self._pool.submit(
+                contextvars.copy_context().run, self.fetch, provider.name, query, limit, **context
+            )
+            for provider in providers
+        }
+
+        merged = []
+        for provider in sorted(providers, key=lambda p: p.deadline):
+            remaining = started + provider.deadline - time.monotonic()
+            try:
+                merged.extend(futures[provider.name].result(timeout=max(remaining, 0)))
+            except FutureTimeoutError:
+                self.stats["deadline_misses"] += 1
+                print(f"⏱️  Trend source '{provider.name}' missed its deadline - merging without it")
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Error fetching {provider.name} trends: {e}")
+        return merged
+
+    def fetch_first(self, query: str, limit: int, names: Optional[Iterable[str]] = None,
+                    **context) -> List[Dict[str, Any]]:
+        """Try providers in rank order and return the first non-empty result"""
+        for provider in self.ranked(names):
+            try:
+                trends = self.fetch(provider.name, query, limit, **context)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Error fetching {provider.name} trends: {e}")
+                continue
+            if trends:
+                return trends
+        return []
+
+    def prewarm(self, queries: Iterable[str], limit: int, names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Fill the cache for many queries in bulk; returns trends cached per query"""
+        providers = self.ranked(names)
+        jobs = {
+            (query, provider.name): self._pool.submit(self.fetch, provider.name, query, limit, False)
+            for query in queries for provider in providers
+        }
+        counts: Dict[str, int] = {}
+        for (query, _), future in jobs.items():
+            try:
+                counts[query] = counts.get(query, 0) + len(future.result())
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Error pre-warming '{query}': {e}")
+        return counts
+
+
+registry = TrendSourceRegistry()
+registry.register(LocalFeedProvider())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the local trend feed provider or pre-warm its cache")
+    parser.add_argument("feeds", nargs="+", help="RSS/Atom/JSON files or directories")
+    parser.add_argument("--queries", nargs="+", default=["ai", "fitness", "gaming"])
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    registry.register(LocalFeedProvider(args.feeds))
+    local = registry.get("local")
+
+    started = time.perf_counter()
+    item_count = len(local.items())
+    print(f"📂 Parsed {item_count} feed items in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for query in args.queries:
+            local.fetch(query, args.limit)
+    per_query = (time.perf_counter() - started) / (args.rounds * len(args.queries)) * 1000
+    print(f"🔍 Uncached lookup: {per_query:.3f} ms/query")
+
+    warmed = registry.prewarm(args.queries, args.limit, ["local"])
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for query in args.queries:
+            registry.fetch("local", query, args.limit)
+    per_query = (time.perf_counter() - started) / (args.rounds * len(args.queries)) * 1000
+    print(f"♻️  Cached lookup:   {per_query:.3f} ms/query  (pre-warmed: {warmed})")
@@ -0,0 +1,180 @@
+"""
+VibeOS - Twitter/X Chunked Media Upload
+INIT / APPEND / FINALIZE / STATUS upload of video clips. APPEND segments are
+sent a few at a time (pipelined) instead of one round trip after another,
+and server-side processing is watched by one shared poller thread, so
+clips waiting on Twitter's transcoder do not hold an upload worker.
+
+Point TWITTER_UPLOAD_URL at a local fake endpoint to exercise the protocol
+without credentials (auth is optional).
+"""
+
+import os
+import heapq
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+
+from rate_limiter import limited_call
+
+TWITTER_UPLOAD_URL = os.getenv("TWITTER_UPLOAD_URL", "https://upload.twitter.com/1.1/media/upload.json")
+# Twitter accepts APPEND segments up to 5 MB
+CHUNK_SIZE = int(os.getenv("TWITTER_CHUNK_SIZE", str(4 * 1024 * 1024)))
+# APPEND segments in flight per clip
+APPEND_WINDOW = int(os.getenv("TWITTER_APPEND_WINDOW", "3"))
+# Seconds to wait for Twitter to finish processing a video
+PROCESSING_TIMEOUT = float(os.getenv("TWITTER_PROCESSING_TIMEOUT", "300"))
+
+
+class TwitterMediaError(RuntimeError):
+    """A media upload command failed or processing ended in error"""
+
+
+class TwitterMediaUploader:
+    """
+    Chunked media uploader, safe to share between threads.
+
+    Args:
+        auth: requests auth object (e.g. tweepy.OAuth1UserHandler(...).apply_auth()), or None
+        upload_url: media/upload.json endpoint
+        chunk_size: APPEND segment size in bytes
+        append_window: APPEND segments in flight per clip
+        max_uploads: clips whose bytes are sent concurrently
+    """
+
+    def __init__(self, auth: Any = None, upload_url: str = TWITTER_UPLOAD_URL,
+                 chunk_size: int = CHUNK_SIZE, append_window: int = APPEND_WINDOW,
+                 max_uploads: int = 4, timeout: float = 60.0):
+        self.auth = auth
+        self.upload_url = upload_url
+        self.chunk_size = chunk_size
+        self.append_window = max(append_window, 1)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._uploads = ThreadPoolExecutor(max_workers=max_uploads, thread_name_prefix="twitter-upload")
+        self._appends = ThreadPoolExecutor(
+            max_workers=max_uploads * self.append_window, thread_name_prefix="twitter-append"
+        )
+        # Processing watch list: heap of (next check time, seq, media_id, future, deadline)
+        self._pending = []
+        self._seq = 0
+        self._wakeup = threading.Condition()
+        self._poller: Optional[threading.Thread] = None
+
+    # --- HTTP ---
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _command(self, method: str, command: str, data: Optional[Dict[str, Any]] = None,
+                 files: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        fields = {"command": command, **(data or {})}
+        response = limited_call(
+            "twitter_media", self._session().request, method, self.upload_url,
+            params=fields if method == "GET" else None,
+            data=fields if method != "GET" else None,
+            files=files, auth=self.auth, timeout=self.timeout
+        )
+        if response.status_code >= 400:
+            raise TwitterMediaError(f"{command} failed: HTTP {response.status_code} {response.text[:200]}")
+        return response.json() if response.content else {}
+
+    # --- upload ---
+
+    def _send(self, path: str, media_type: str, media_category: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """INIT, pipelined APPENDs, FINALIZE; returns (media_id, processing_info)"""
+        total_bytes = os.path.getsize(path)
+        init = self._command("POST", "INIT", {
+            "total_bytes": total_bytes,
+            "media_type": media_type,
+            "media_category": media_category
+        })
+        media_id = init["media_id_string"]
+
+        in_flight = deque()
+        with open(path, "rb") as media:
+            segment_index = 0
+            while True:
+                chunk = media.read(self.chunk_size)
+                if not chunk:
+                    break
+                if len(in_flight) >= self.append_window:
+                    in_flight.popleft().result()
+                in_flight.append(self._appends.submit(
+                    contextvars.copy_context().run, self._command, "POST", "APPEND",
+                    {"media_id": media_id, "segment_index": segment_index},
+                    {"media": ("blob", chunk, "application/octet-stream")}
+                ))
+                segment_index += 1
+        while in_flight:
+            in_flight.popleft().result()
+
+        finalize = self._command("POST", "FINALIZE", {"media_id": media_id})
+        return media_id, finalize.get("processing_info")
+
+    def upload_async(self, path: str, media_type: str = "video/mp4",
+                     media_category: str = "tweet_video") -> "Future[str]":
+        """Start an upload; the future resolves to the media_id once Twitter has processed it"""
+        result: "Future[str]" = Future()
+
+        def run():
+            try:
+                media_id, processing = self._send(path, media_type, media_category)
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            self._settle(media_id, processing, result, time.monotonic() + PROCESSING_TIMEOUT)
+
+        self._uploads.submit(contextvars.copy_context().run, run)
+        return result
+
+    def upload(self, path: str, media_type: str = "video/mp4", media_category: str = "tweet_video",
+               timeout: Optional[float] = None) -> str:
+        """Upload and wait for processing; returns the media_id"""
+        return self.upload_async(path, media_type, media_category).result(timeout)
+
+    # --- processing status ---
+
+    def _settle(self, media_id: str, processing: Optional[Dict[str, Any]], result: Future, deadline: float):
+        """Resolve the future if processing is over, otherwise schedule the next STATUS check"""
+        state = (processing or {}).get("state", "succeeded")
+        if state == "succeeded":
+            result.set_result(media_id)
+        elif state == "failed":
+            error = processing.get("error") or {}
+            result.set_exception(TwitterMediaError(
+                f"Processing failed for {media_id}: {error.get('message') or error.get('name') or 'unknown error'}"
+            ))
+        elif time.monotonic() >= deadline:
+            result.set_exception(TwitterMediaError(f"Processing timed out for {media_id}"))
+        else:
+            check_after = max(float(processing.get("check_after_secs", 1)), 0.1)
+            with self._wakeup:
+                self._seq += 1
+                heapq.heappush(self._pending, (time.monotonic() + check_after, self._seq, media_id, result, deadline))
+                if self._poller is None:
+                    self._poller = threading.Thread(target=self._poll, name="twitter-status", daemon=True)
+                    self._poller.start()
+                self._wakeup.notify()
+
+    def _poll(self):
+        """Poller thread: issue STATUS for each pending media when its check_after_secs is up"""
+        while True:
+            with self._wakeup:
+                while not self._pending or self._pending[0][0] > time.monotonic():
+                    self._wakeup.wait(self._pending[0][0] - time.monotonic() if self._pending else None)
+                _, _, media_id, result, deadline = heapq.heappop(self._pending)
+            try:
+                status = self._command("GET", "STATUS", {"media_id": media_id})
+            except Exception as e:
+                result.set_exception(e)
+                continue
+            self._settle(media_id, status.get("processing_info"), result, deadline)
@@ -0,0 +1,72 @@
+"""
+VibeOS - Upload Scheduler
+Runs clip uploads concurrently across clips and platforms. Each platform
+gets its own small worker pool (its concurrency cap), so a slow YouTube
+upload never holds up Twitter posts and no platform is hit by more
+parallel uploads than its API tolerates.
+"""
+
+import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable, Hashable, Iterable, Optional, Tuple
+
+# platform: max concurrent uploads (override with UPLOAD_CONCURRENCY_<PLATFORM>)
+PLATFORM_CONCURRENCY = {
+    "twitter": 2,
+    "youtube": 2,
+}
+
+# (job key, platform, fn, args, kwargs)
+UploadJob = Tuple[Hashable, str, Callable, tuple, dict]
+
+
+class UploadScheduler:
+    """Per-platform worker pools; use as a context manager or call shutdown()"""
+
+    def __init__(self, caps: Optional[Dict[str, int]] = None):
+        self.caps = dict(PLATFORM_CONCURRENCY)
+        self.caps.update(caps or {})
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+
+    def _pool(self, platform: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(platform)
+        if pool is None:
+            cap = int(os.getenv(f"UPLOAD_CONCURRENCY_{platform.upper()}", self.caps.get(platform, 1)))
+            pool = ThreadPoolExecutor(max_workers=max(cap, 1), thread_name_prefix=f"upload-{platform}")
+            self._pools[platform] = pool
+        return pool
+
+    def submit(self, platform: str, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on the platform's pool (context vars carried over)"""
+        return self._pool(platform).submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    def run(self, jobs: Iterable[UploadJob]) -> Dict[Tuple[Hashable, str], Any]:
+        """
+        Run all jobs and wait for them.
+
+        Returns:
+            (job key, platform) -> fn's result, or the exception it raised
+        """
+        futures = {
+            (key, platform): self.submit(platform, fn, *args, **kwargs)
+            for key, platform, fn, args, kwargs in jobs
+        }
+        results = {}
+        for job, future in futures.items():
+            try:
+                results[job] = future.result()
+            except Exception as e:
+                results[job] = e
+        return results
+
+    def shutdown(self, wait: bool = True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+        self._pools.clear()
+
+    def __enter__(self) -> "UploadScheduler":
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -10,12 +10,14 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import hashlib
 from collections import Counter
-import sqlite3
 from pathlib import Path
 
 import pandas as pd
 from dotenv import load_dotenv
 
+from vibe_markers import vibe_markers
+from sqlite_connection import connect_sqlite
+
 load_dotenv()
 
 # ==================== DATABASE UTILITIES ====================
@@ -29,7 +31,7 @@ class VibeDatabase:
     
     def init_database(self):
         """Initialize database schema"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         
         # User profiles table
@@ -44,6 +46,21 @@ class VibeDatabase:
             )
         """)
         
+        # Incremental vibe statistics (added after the original schema)
+        user_columns = {row[1] for row in cursor.execute("PRAGMA table_info(users)")}
+        if "vibe_stats" not in user_columns:
+            cursor.execute("ALTER TABLE users ADD COLUMN vibe_stats TEXT")
+        
+        # Vibe profiles keyed by a fingerprint of the sample set (see vibe_samples_fingerprint)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vibe_profile_cache (
+                fingerprint TEXT PRIMARY KEY,
+                vibe_profile TEXT,
+                vibe_stats TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
         # Content samples table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS content_samples (
@@ -113,18 +130,117 @@ class VibeDatabase:
     
     def save_user_profile(self, user_id: str, niche: str, goal: str, vibe_profile: Dict):
         """Save user profile and vibe analysis"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         cursor.execute("""
-            INSERT OR REPLACE INTO users (user_id, niche, goal, vibe_profile, last_active)
+            INSERT INTO users (user_id, niche, goal, vibe_profile, last_active)
             VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                niche = excluded.niche, goal = excluded.goal,
+                vibe_profile = excluded.vibe_profile, last_active = excluded.last_active
         """, (user_id, niche, goal, json.dumps(vibe_profile), datetime.now()))
         conn.commit()
         conn.close()
     
+    def get_cached_vibe(self, fingerprint: str) -> Optional[Dict]:
+        """Look up a cached vibe analysis for an identical sample set"""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT vibe_profile, vibe_stats FROM vibe_profile_cache WHERE fingerprint = ?",
+            (fingerprint,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        vibe_stats = json.loads(row[1]) if row[1] else {}
+        return {
+            "vibe_profile": json.loads(row[0]),
+            "stats": vibe_stats.get("stats"),
+            "baseline": vibe_stats.get("baseline")
+        }
+    
+    def cache_vibe(self, fingerprint: str, vibe_profile: Dict, stats: Dict, baseline: Dict):
+        """Store a vibe analysis computed from exactly the fingerprinted samples"""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO vibe_profile_cache (fingerprint, vibe_profile, vibe_stats)
+            VALUES (?, ?, ?)
+        """, (fingerprint, json.dumps(vibe_profile), json.dumps({"stats": stats, "baseline": baseline})))
+        conn.commit()
+        conn.close()
+    
+    def get_vibe_state(self, user_id: str) -> Optional[Dict]:
+        """
+        Retrieve the stored vibe profile with its sufficient statistics
+        
+        Returns {"vibe_profile", "stats", "baseline"} or None for unknown users;
+        stats/baseline are None for profiles saved before incremental updates
+        """
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT vibe_profile, vibe_stats FROM users WHERE user_id = ?", (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        vibe_stats = json.loads(row[1]) if row[1] else {}
+        return {
+            "vibe_profile": json.loads(row[0]) if row[0] else {},
+            "stats": vibe_stats.get("stats"),
+            "baseline": vibe_stats.get("baseline")
+        }
+    
+    def filter_new_samples(self, user_id: str, samples: List[str]) -> List[str]:
+        """Return the samples not yet folded into this user's vibe statistics"""
+        candidates = {}
+        for sample in samples:
+            candidates.setdefault(content_sample_id(user_id, sample), sample)
+        if not candidates:
+            return []
+        
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(candidates))
+        cursor.execute(
+            f"SELECT sample_id FROM content_samples WHERE sample_id IN ({placeholders})",
+            list(candidates)
+        )
+        seen = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        
+        return [sample for sample_id, sample in candidates.items() if sample_id not in seen]
+    
+    def save_vibe_state(self, user_id: str, niche: str, goal: str, vibe_profile: Dict,
+                        stats: Dict, baseline: Dict, new_samples: List[str]):
+        """Save profile, sufficient statistics and newly folded samples in one transaction"""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO users (user_id, niche, goal, vibe_profile, vibe_stats, last_active)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                niche = excluded.niche, goal = excluded.goal,
+                vibe_profile = excluded.vibe_profile, vibe_stats = excluded.vibe_stats,
+                last_active = excluded.last_active
+        """, (
+            user_id, niche, goal, json.dumps(vibe_profile),
+            json.dumps({"stats": stats, "baseline": baseline}), datetime.now()
+        ))
+        cursor.executemany("""
+            INSERT OR IGNORE INTO content_samples (sample_id, user_id, content_text, content_type)
+            VALUES (?, ?, ?, 'vibe_sample')
+        """, [(content_sample_id(user_id, sample), user_id, sample) for sample in new_samples])
+        conn.commit()
+        conn.close()
+    
     def get_user_profile(self, user_id: str) -> Optional[Dict]:
         """Retrieve user profile"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
         row = cursor.fetchone()
@@ -144,7 +260,7 @@ class VibeDatabase:
     def save_generated_content(self, user_id: str, platform: str, content_data: Dict):
         """Save AI-generated content"""
         content_id = hashlib.md5(f"{user_id}{datetime.now()}".encode()).hexdigest()
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO generated_content 
@@ -163,7 +279,7 @@ class VibeDatabase:
 
     def get_recent_scripts(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Fetch recently generated scripts with engagement metrics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -207,7 +323,7 @@ class VibeDatabase:
     
     def get_user_analytics(self, user_id: str, days: int = 30) -> pd.DataFrame:
         """Get user analytics for dashboard"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect_sqlite(self.db_path)
         
         # Get content performance
         query = f"""
@@ -229,60 +345,41 @@ class VibeDatabase:
 
 # ==================== VIBE ANALYSIS UTILITIES ====================
 
+# Bump when the vibe analysis changes so cached profiles are not reused
+VIBE_CACHE_VERSION = "1"
+
+
+def _normalize_sample(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def content_sample_id(user_id: str, text: str) -> str:
+    """Stable ID for a user's content sample (whitespace/case-insensitive)"""
+    return hashlib.sha1(f"{user_id}:{_normalize_sample(text)}".encode("utf-8")).hexdigest()[:20]
+
+
+def vibe_samples_fingerprint(content_samples: List[str]) -> str:
+    """
+    Order-independent hash of a sample set, ignoring case, whitespace and
+    duplicates - the key for VibeDatabase's vibe profile cache
+    """
+    normalized = sorted({_normalize_sample(sample) for sample in content_samples if sample.strip()})
+    digest = hashlib.sha256(f"v{VIBE_CACHE_VERSION}".encode("utf-8"))
+    for sample in normalized:
+        digest.update(b"\x00")
+        digest.update(sample.encode("utf-8"))
+    return digest.hexdigest()
+
+
 def extract_vibe_markers(content_samples: List[str]) -> Dict[str, Any]:
     """
     Analyze content samples to extract unique vibe markers
     Returns tone, vocabulary patterns, humor style, and formatting preferences
-    """
-    
-    all_text = " ".join(content_samples)
-    
-    # Tone detection patterns
-    tone_markers = {
-        "sarcastic": len(re.findall(r'yeah right|sure thing|oh great|totally|obviously', all_text, re.I)),
-        "wholesome": len(re.findall(r'love|heart|blessed|grateful|amazing|beautiful', all_text, re.I)),
-        "edgy": len(re.findall(r'fuck|shit|damn|hell|wtf|bruh', all_text, re.I)),
-        "professional": len(re.findall(r'leverage|optimize|strategy|data-driven|ROI', all_text, re.I)),
-        "casual": len(re.findall(r"gonna|wanna|gotta|kinda|sorta|lol|lmao", all_text, re.I))
-    }
-    
-    # Emoji usage patterns
-    emoji_pattern = re.compile(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002702-\U000027B0\U000024C2-\U0001F251]+')
-    emoji_usage = len(emoji_pattern.findall(all_text))
     
-    # Punctuation style
-    exclamation_count = all_text.count('!')
-    question_count = all_text.count('?')
-    ellipsis_count = all_text.count('...')
-    
-    # Sentence length (complexity indicator)
-    sentences = re.split(r'[.!?]+', all_text)
-    avg_sentence_length = sum(len(s.split()) for s in sentences if s.strip()) / max(len([s for s in sentences if s.strip()]), 1)
-    
-    # Vocabulary extraction
-    words = re.findall(r'\b\w+\b', all_text.lower())
-    word_freq = Counter(words)
-    
-    # Remove common stop words
-    stop_words = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'it', 'that', 'this'])
-    unique_vocab = [word for word, count in word_freq.most_common(30) if word not in stop_words and len(word) > 3]
-    
-    # Determine dominant tone
-    dominant_tone = max(tone_markers, key=tone_markers.get) if max(tone_markers.values()) > 0 else "neutral"
-    
-    return {
-        "tone": dominant_tone,
-        "tone_scores": tone_markers,
-        "emoji_density": emoji_usage / max(len(all_text), 1) * 100,
-        "punctuation_style": {
-            "exclamation_ratio": exclamation_count / max(len(sentences), 1),
-            "question_ratio": question_count / max(len(sentences), 1),
-            "uses_ellipsis": ellipsis_count > 2
-        },
-        "avg_sentence_length": round(avg_sentence_length, 1),
-        "signature_words": unique_vocab[:15],
-        "complexity": "simple" if avg_sentence_length < 12 else "moderate" if avg_sentence_length < 20 else "complex"
-    }
+    Uses the single-pass engine in vibe_markers; see batch_vibe_markers there
+    for profiling many creators at once.
+    """
+    return vibe_markers(content_samples)
 
 
 def build_vibe_prompt(vibe_profile: Dict[str, Any]) -> str:
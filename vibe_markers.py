@@ -0,0 +1,284 @@
+"""
+VibeOS - Vibe Marker Engine
+Single-pass feature extraction for creator content samples. One compiled
+tokenizer sweep yields tone scores, emoji density, punctuation ratios,
+sentence stats and vocabulary counts, kept as mergeable sufficient
+statistics (VibeStats) so profiles can be combined and batched.
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Any, Iterable, Mapping
+
+import numpy as np
+
+# Tone lexicon: single words and two-word phrases (matched as whole words)
+TONE_LEXICON = {
+    "sarcastic": ["yeah right", "sure thing", "oh great", "totally", "obviously"],
+    "wholesome": ["love", "heart", "blessed", "grateful", "amazing", "beautiful"],
+    "edgy": ["fuck", "shit", "damn", "hell", "wtf", "bruh"],
+    "professional": ["leverage", "optimize", "strategy", "data driven", "roi"],
+    "casual": ["gonna", "wanna", "gotta", "kinda", "sorta", "lol", "lmao"],
+}
+TONES = tuple(TONE_LEXICON)
+
+# Profile drift (see profile_drift) above which the LLM analysis is re-run
+DRIFT_THRESHOLD = float(os.getenv("VIBE_DRIFT_THRESHOLD", "0.25"))
+
+STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+    'for', 'of', 'with', 'by', 'is', 'it', 'that', 'this'
+])
+
+_TONE_WORDS = {}
+_TONE_PHRASES = {}
+for _tone, _terms in TONE_LEXICON.items():
+    for _term in _terms:
+        _parts = tuple(_term.split())
+        if len(_parts) == 1:
+            _TONE_WORDS[_parts[0]] = _tone
+        else:
+            _TONE_PHRASES[_parts] = _tone
+
+# One tokenizer for the whole sweep: words, sentence terminators, emoji runs
+_EMOJI_CLASS = (
+    '\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF'
+    '\U0001F1E0-\U0001F1FF\U00002702-\U000027B0\U000024C2-\U0001F251'
+)
+_TOKEN_RE = re.compile(rf"(?P<word>\w+)|(?P<end>[.!?]+)|(?P<emoji>[{_EMOJI_CLASS}]+)")
+
+
+class VibeStats:
+    """
+    Sufficient statistics for a creator's samples.
+
+    Every field is a count or a sum, so two VibeStats merge by addition and
+    the profile of the combined samples can be derived without re-scanning.
+    """
+
+    COUNT_FIELDS = (
+        "samples", "chars", "emoji", "exclamations", "questions", "ellipses",
+        "terminators", "sentences", "sentence_words", "words"
+    )
+
+    def __init__(self):
+        for field in self.COUNT_FIELDS:
+            setattr(self, field, 0)
+        self.tones = Counter({tone: 0 for tone in TONES})
+        self.vocab = Counter()
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[str]) -> "VibeStats":
+        stats = cls()
+        for sample in samples:
+            stats.add_sample(sample)
+        return stats
+
+    def add_sample(self, text: str):
+        """Fold one sample into the statistics (one tokenizer pass)"""
+        self.samples += 1
+        self.chars += len(text)
+
+        tones = self.tones
+        vocab = self.vocab
+        previous = None
+        sentence_words = 0
+
+        for match in _TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            token = match.group()
+
+            if kind == "word":
+                word = token.lower()
+                vocab[word] += 1
+                self.words += 1
+                sentence_words += 1
+                tone = _TONE_WORDS.get(word) or _TONE_PHRASES.get((previous, word))
+                if tone:
+                    tones[tone] += 1
+                previous = word
+            elif kind == "end":
+                self.terminators += 1
+                self.exclamations += token.count('!')
+                self.questions += token.count('?')
+                self.ellipses += token.count('...')
+                if sentence_words:
+                    self.sentences += 1
+                    self.sentence_words += sentence_words
+                    sentence_words = 0
+                previous = None
+            else:
+                self.emoji += 1
+                previous = None
+
+        # Trailing text without a terminator still counts as a sentence
+        if sentence_words:
+            self.sentences += 1
+            self.sentence_words += sentence_words
+
+    def merge(self, other: "VibeStats") -> "VibeStats":
+        """Add another VibeStats into this one (in place) and return self"""
+        for field in self.COUNT_FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        self.tones.update(other.tones)
+        self.vocab.update(other.vocab)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {field: getattr(self, field) for field in self.COUNT_FIELDS}
+        data["tones"] = dict(self.tones)
+        data["vocab"] = dict(self.vocab)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "VibeStats":
+        stats = cls()
+        for field in cls.COUNT_FIELDS:
+            setattr(stats, field, int(data.get(field, 0)))
+        stats.tones.update(data.get("tones", {}))
+        stats.vocab.update(data.get("vocab", {}))
+        return stats
+
+    # Derived features - samples are treated as if joined with single spaces
+
+    @property
+    def text_length(self) -> int:
+        return self.chars + max(self.samples - 1, 0)
+
+    @property
+    def sentence_pieces(self) -> int:
+        # Same denominator as re.split(r'[.!?]+', text)
+        return self.terminators + 1
+
+    def profile(self) -> Dict[str, Any]:
+        """Quantitative vibe profile (the extract_vibe_markers format)"""
+        tone_scores = {tone: self.tones[tone] for tone in TONES}
+        top_score = max(tone_scores.values())
+        avg_sentence_length = self.sentence_words / max(self.sentences, 1)
+        pieces = self.sentence_pieces
+
+        return {
+            "tone": max(tone_scores, key=tone_scores.get) if top_score > 0 else "neutral",
+            "tone_scores": tone_scores,
+            "emoji_density": self.emoji / max(self.text_length, 1) * 100,
+            "punctuation_style": {
+                "exclamation_ratio": self.exclamations / pieces,
+                "question_ratio": self.questions / pieces,
+                "uses_ellipsis": self.ellipses > 2
+            },
+            "avg_sentence_length": round(avg_sentence_length, 1),
+            "signature_words": signature_words(self.vocab),
+            "complexity": _complexity(avg_sentence_length)
+        }
+
+
+def _complexity(avg_sentence_length: float) -> str:
+    return "simple" if avg_sentence_length < 12 else "moderate" if avg_sentence_length < 20 else "complex"
+
+
+def signature_words(vocab: Counter, top: int = 30, limit: int = 15) -> List[str]:
+    """Most frequent non-stop-words longer than three letters"""
+    return [
+        word for word, _ in vocab.most_common(top)
+        if word not in STOP_WORDS and len(word) > 3
+    ][:limit]
+
+
+def vibe_markers(content_samples: List[str]) -> Dict[str, Any]:
+    """Quantitative vibe profile for one creator's samples"""
+    return VibeStats.from_samples(content_samples).profile()
+
+
+def batch_vibe_markers(corpora: Mapping[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Profile many creators at once.
+
+    Each creator's samples are swept once into VibeStats; the numeric
+    features for all creators are then derived together as NumPy arrays.
+
+    Args:
+        corpora: creator_id -> list of content samples
+
+    Returns:
+        creator_id -> profile (same format as vibe_markers)
+    """
+    creator_ids = list(corpora)
+    if not creator_ids:
+        return {}
+    all_stats = [VibeStats.from_samples(corpora[creator_id]) for creator_id in creator_ids]
+
+    def column(field: str) -> "np.ndarray":
+        return np.fromiter((getattr(s, field) for s in all_stats), dtype=np.float64, count=len(all_stats))
+
+    tone_matrix = np.array([[s.tones[tone] for tone in TONES] for s in all_stats], dtype=np.int64)
+    dominant = tone_matrix.argmax(axis=1)
+    has_tone = tone_matrix.max(axis=1) > 0
+
+    pieces = column("terminators") + 1
+    text_length = np.maximum(column("chars") + np.maximum(column("samples") - 1, 0), 1)
+    emoji_density = column("emoji") / text_length * 100
+    exclamation_ratio = column("exclamations") / pieces
+    question_ratio = column("questions") / pieces
+    avg_sentence_length = column("sentence_words") / np.maximum(column("sentences"), 1)
+    complexity = np.select(
+        [avg_sentence_length < 12, avg_sentence_length < 20], ["simple", "moderate"], default="complex"
+    )
+
+    profiles = {}
+    for i, (creator_id, stats) in enumerate(zip(creator_ids, all_stats)):
+        profiles[creator_id] = {
+            "tone": TONES[dominant[i]] if has_tone[i] else "neutral",
+            "tone_scores": dict(zip(TONES, tone_matrix[i].tolist())),
+            "emoji_density": float(emoji_density[i]),
+            "punctuation_style": {
+                "exclamation_ratio": float(exclamation_ratio[i]),
+                "question_ratio": float(question_ratio[i]),
+                "uses_ellipsis": stats.ellipses > 2
+            },
+            "avg_sentence_length": round(float(avg_sentence_length[i]), 1),
+            "signature_words": signature_words(stats.vocab),
+            "complexity": str(complexity[i])
+        }
+    return profiles
+
+
+def _relative_change(old: float, new: float, floor: float = 1.0) -> float:
+    return abs(new - old) / max(abs(old), abs(new), floor)
+
+
+def profile_drift(baseline: Mapping[str, Any], current: Mapping[str, Any]) -> float:
+    """
+    How far a quantitative profile has moved from a baseline (0 = same, 1 = very different).
+
+    Takes the largest of: total-variation distance between tone distributions,
+    relative change in sentence length and emoji density, and the shift in
+    exclamation/question ratios.
+    """
+    if not baseline:
+        return 1.0
+
+    def tone_distribution(profile: Mapping[str, Any]) -> List[float]:
+        scores = profile.get("tone_scores") or {}
+        total = sum(scores.get(tone, 0) for tone in TONES)
+        return [scores.get(tone, 0) / total if total else 0.0 for tone in TONES]
+
+    old_tones, new_tones = tone_distribution(baseline), tone_distribution(current)
+    tone_drift = 0.5 * sum(abs(a - b) for a, b in zip(old_tones, new_tones))
+    if any(old_tones) != any(new_tones):
+        tone_drift = 1.0
+
+    old_punct = baseline.get("punctuation_style") or {}
+    new_punct = current.get("punctuation_style") or {}
+    punctuation_drift = min(
+        abs(old_punct.get("exclamation_ratio", 0) - new_punct.get("exclamation_ratio", 0))
+        + abs(old_punct.get("question_ratio", 0) - new_punct.get("question_ratio", 0)),
+        1.0
+    )
+
+    return max(
+        tone_drift,
+        _relative_change(baseline.get("avg_sentence_length", 0), current.get("avg_sentence_length", 0)),
+        _relative_change(baseline.get("emoji_density", 0), current.get("emoji_density", 0)),
+        punctuation_drift
+    )
@@ -27,7 +27,8 @@ from tools import (
     EmailSender,
     AnalyticsTracker
 )
-from utils import VibeDatabase, generate_sample_user_id
+from utils import VibeDatabase, generate_sample_user_id, vibe_samples_fingerprint
+from llm_ledger import ledger_run
 
 
 # ==================== STATE DEFINITION ====================
@@ -52,6 +53,7 @@ class VibeOSState(TypedDict):
     
     # Generated content
     generated_content: Dict[str, Any]
+    content_variants: Dict[str, Dict[str, Any]]  # per-platform variants
     
     # Publishing results
     post_results: List[Dict[str, Any]]
@@ -77,18 +79,41 @@ def analyze_vibe_node(state: VibeOSState) -> Dict:
     """
     print("📊 Analyzing your vibe...")
     
-    analyzer = agent_vibe()
-    vibe_profile = analyzer.analyze_vibe(state['content_samples'])
+    db = VibeDatabase()
+    previous = db.get_vibe_state(state['user_id'])
+    has_stats = bool(previous and previous.get('stats'))
+    
+    # Users without stored statistics can reuse the analysis of an identical sample set
+    fingerprint = vibe_samples_fingerprint(state['content_samples'])
+    cached = None if has_stats else db.get_cached_vibe(fingerprint)
+    
+    if cached:
+        result = {**cached, "new_samples": state['content_samples'], "drift": 0.0, "reanalyzed": False}
+    else:
+        # Fold only unseen samples into the stored statistics; the LLM re-runs on drift
+        new_samples = db.filter_new_samples(state['user_id'], state['content_samples'])
+        analyzer = agent_vibe()
+        result = analyzer.update_vibe(state['content_samples'], new_samples, previous)
+        if not has_stats and result['reanalyzed']:
+            db.cache_vibe(fingerprint, result['vibe_profile'], result['stats'], result['baseline'])
+    vibe_profile = result['vibe_profile']
     
     # Save to database
-    db = VibeDatabase()
-    db.save_user_profile(
+    db.save_vibe_state(
         user_id=state['user_id'],
         niche=state['niche'],
         goal=state['goal'],
-        vibe_profile=vibe_profile
+        vibe_profile=vibe_profile,
+        stats=result['stats'],
+        baseline=result['baseline'],
+        new_samples=result['new_samples']
     )
     
+    if cached:
+        print("   ♻️  Reused cached vibe analysis for these samples")
+    elif not result['reanalyzed']:
+        print(f"   ♻️  Reused stored vibe analysis (drift {result['drift']:.2f})")
+    
     return {
         "vibe_profile": vibe_profile,
         "messages": [f"✅ Vibe analyzed: {vibe_profile.get('tone', 'unique')} tone, {vibe_profile.get('humor_style', 'authentic')} humor"],
@@ -128,33 +153,42 @@ def hunt_trends_node(state: VibeOSState) -> Dict:
 def generate_content_node(state: VibeOSState) -> Dict:
     """
     Node 3: Generate viral content in user's voice
+    
+    All requested platforms are generated in a single LLM call; the first
+    platform's variant is the primary generated_content.
     """
     print("✨ Generating content in your voice...")
     
     generator = agent_script(state['vibe_profile'])
     
-    # Generate for primary platform (or first in list)
-    primary_platform = state['platforms'][0] if state['platforms'] else "tiktok"
-    content = generator.generate_content(state['selected_trend'], platform=primary_platform)
-    
-    # Convert to dict for state
-    content_dict = {
-        "script": content.script,
-        "caption": content.caption,
-        "hashtags": content.hashtags,
-        "thumbnail_prompt": content.thumbnail_prompt,
-        "hook": content.hook,
-        "platform": primary_platform,
-        "trend_source": state['selected_trend'].get('title', 'Trending topic')
-    }
+    platforms = [p.lower() for p in state['platforms']] or ["tiktok"]
+    primary_platform = platforms[0]
+    variants = generator.generate_content_batch(state['selected_trend'], platforms)
     
-    # Save to database
     db = VibeDatabase()
-    db.save_generated_content(state['user_id'], primary_platform, content_dict)
+    content_variants = {}
+    for platform, content in variants.items():
+        # Convert to dict for state
+        content_dict = {
+            "script": content.script,
+            "caption": content.caption,
+            "hashtags": content.hashtags,
+            "thumbnail_prompt": content.thumbnail_prompt,
+            "hook": content.hook,
+            "platform": platform,
+            "trend_source": state['selected_trend'].get('title', 'Trending topic')
+        }
+        content_variants[platform] = content_dict
+        
+        # Save to database
+        db.save_generated_content(state['user_id'], platform, content_dict)
+    
+    content_dict = content_variants[primary_platform]
     
     return {
         "generated_content": content_dict,
-        "messages": [f"📝 Content created! Hook: '{content.hook[:60]}...'"],
+        "content_variants": content_variants,
+        "messages": [f"📝 Content created for {len(content_variants)} platform(s)! Hook: '{content_dict['hook'][:60]}...'"],
         "status": "content_generated"
     }
 
@@ -168,22 +202,25 @@ def publish_content_node(state: VibeOSState) -> Dict:
     poster = SocialMediaPoster()
     results = []
     
-    # Publish to each platform
+    # Publish to each platform (using that platform's variant when available)
+    variants = state.get('content_variants') or {}
     for platform in state['platforms']:
+        content = variants.get(platform.lower(), state['generated_content'])
+        
         if platform.lower() == "twitter":
             # Post to Twitter
-            full_post = f"{state['generated_content']['caption']}\n\n#{' #'.join(state['generated_content']['hashtags'][:3])}"
+            full_post = f"{content['caption']}\n\n#{' #'.join(content['hashtags'][:3])}"
             result = poster.post_to_twitter(full_post)
             results.append(result)
         
         elif platform.lower() == "tiktok":
             # TikTok posting (simulated for MVP)
-            result = poster.post_to_tiktok("", state['generated_content']['caption'], state['generated_content']['hashtags'])
+            result = poster.post_to_tiktok("", content['caption'], content['hashtags'])
             results.append(result)
         
         elif platform.lower() == "instagram":
             # Instagram posting (simulated for MVP)
-            result = poster.post_to_instagram("", state['generated_content']['caption'])
+            result = poster.post_to_instagram("", content['caption'])
             results.append(result)
     
     success_count = sum(1 for r in results if r.get('status') in ['success', 'simulated'])
@@ -446,6 +483,7 @@ def run_vibeos_workflow(
         "trends": [],
         "selected_trend": {},
         "generated_content": {},
+        "content_variants": {},
         "post_results": [],
         "sponsors": [],
         "deal_plan": [],
@@ -462,8 +500,9 @@ def run_vibeos_workflow(
     print("🚀 VIBEOS WORKFLOW STARTING")
     print("="*60 + "\n")
     
-    # Execute workflow
-    final_state = workflow.invoke(initial_state)
+    # Execute workflow (LLM usage is tagged with this user and niche)
+    with ledger_run(user_id=user_id, niche=niche):
+        final_state = workflow.invoke(initial_state)
     
     print("\n" + "="*60)
     print("✅ WORKFLOW COMPLETE")